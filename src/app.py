@@ -1,50 +1,69 @@
 # src/app.py
-from fastapi import FastAPI, HTTPException, Query
-from fastapi.responses import HTMLResponse
-from pathlib import Path
+import asyncio, functools, hmac
+from fastapi import FastAPI, Header, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import HTMLResponse, PlainTextResponse
 from pydantic import BaseModel
 
 # --- 내부 모듈 ---
-from .deps import get_engine
-from .prompts import FEW_SHOT_PROMPT_TEMPLATE, FINANCIAL_KNOWLEDGE
-from .services import guardrails, hyperclova_client
-from .services.emo_metrics import EmoMeter, intervention_text
-from .services.portfolio import (
-    load_user_assets,
-    enrich_capm,
-    attach_live_values,
-    maturity_projection,
-)
-from .services.isa_tax import (
-    run_isa_tax_calculation,
-    merge_with_investment,
-    summarize_overall,
-    build_prompt,
-)
+from .deps import get_db, SNAPSHOT_REFRESH_SEC, SUMMARY_CACHE_MAX_AGE_SEC, PROFILE_ENABLED, ADMIN_TOKEN, GZIP_MIN_SIZE
+from .services import empathy, guardrails, hyperclova_client
+from .services.bulkhead import BulkheadFull, all_metrics as bulkhead_metrics
+from .services.emo_metrics import intervention_text
+from .services.history import ConversationHistory
+from .services.session import ChatSession, sessions
+from .services.portfolio import lookup_user_id
+from .services.portfolio_model import get_model, peek_model
+from .services.http_cache import make_etag, etag_matches, not_modified, json_response
+from .services.price_feed import price_feed
+from .services.capm import price_provider, beta_provider
+from .services.prefetch import prefetcher
+from .services.turn_log import turn_log
+from .services.profiler import profiler, profiled, profile_middleware
+from .services.static_assets import AssetBundle, respond
+from .services.snapshot import summary_payload, snapshot_row, write_snapshots, read_snapshot, refresh_snapshots
 
 import pandas as pd
-from sqlalchemy import text  # ✅ 이름 존재 여부 체크용
 
 app = FastAPI(title="ISA Psy Finance API")
+if PROFILE_ENABLED:
+    app.middleware("http")(profile_middleware)
+# JSON 응답 압축 (정적 파일은 미리 압축해 Content-Encoding 을 달아 보내므로 건너뜀)
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MIN_SIZE)
 
-# === 상태 ===
-meter = EmoMeter()
-conversation_log: list[dict] = []
-
-# 세션 상태: 처음엔 이름을 먼저 받는다
-session_state = {
-    "await_name": True,
-    "name": None,
-}
+# UI 정적 파일은 시작 시 한 번 읽고 압축해 둔다
+try:
+    assets = AssetBundle()
+except FileNotFoundError:
+    assets = None
 
-# 포트폴리오 컨텍스트(선택지 프롬프트 캐시)
-last_portfolio = {
-    "name": None,               # 마지막으로 조회한 사용자 이름
-    "prompts": None,            # {"current": "...", "maturity": "..."}
-}
+# === 상태 ===
+# 감정 메터/대화 기록/이름·포트폴리오 흐름은 세션별로 services.session 에 보관
+# (session_id 없이 오면 기본 세션 하나를 공유 — 기존 동작)
 
 class ChatIn(BaseModel):
     text: str
+    session_id: str | None = None
+
+class ScenarioSummaryOut(BaseModel):
+    scenario: str
+    user_id: int
+    user_name: str
+    total_invested: float | None
+    total_after_tax_profit: float | None
+    overall_profit_rate: float | None
+
+class PortfolioSummaryOut(BaseModel):
+    user_name: str
+    source: str                 # live | snapshot
+    priced_at: str | None       # UTC ISO8601
+    years_left: float
+    current_total: float
+    forecast_total: float
+    mix_rm_msg: str
+    report_prompts: dict[str, str]
+    overall_cur: list[ScenarioSummaryOut]
+    overall_mat: list[ScenarioSummaryOut]
 
 # ===== 공용 유틸 =====
 def is_portfolio_intent(txt: str) -> bool:
@@ -59,55 +78,40 @@ def is_select_maturity(txt: str) -> bool:
     t = txt.replace(" ", "")
     return any(k in t for k in ("3년유지", "3년", "유지", "만기", "만기유지"))
 
-def build_portfolio_for_user(user_name: str):
+def build_portfolio_for_user(user_name: str, user_id: int | None = None):
     """
     DB에서 사용자의 자산 불러와 CAPM/실시간/만기 예측/세제까지 계산하고
     '현재 해지' / '3년 유지' 각각의 설명용 프롬프트를 만들어 반환.
+    가격과 무관한 단계는 사용자별 모델에 캐시되고, 시세가 바뀐 종목만 다시 계산한다.
     """
-    engine = get_engine()
-
-    # 1) 사용자 및 자산 로드
-    user_id, account_date, df = load_user_assets(engine, user_name)
-
-    # 2) CAPM 보강 + 실시간 가격
-    df = enrich_capm(engine, df)
-    df = attach_live_values(df)
-
-    # 3) 만기 예측
-    df, years_left, current_total, forecast_total, mix_rm_msg = maturity_projection(df, account_date)
-
-    # 4) 세제 계산을 위해 users 테이블/현재/만기 수익금 dict 준비
-    df_users = pd.read_sql("SELECT * FROM users", engine)
-    current_profit_dict = df.set_index('name')['현재 수익금(원)'].to_dict()
-    maturity_profit_dict = df.set_index('name')['만기 수익금(원,원금대비)'].to_dict()
-
-    # 5) ISA 세금 케이스: 현재 해지 vs 3년 유지
-    df_cur, df_mat = run_isa_tax_calculation(
-        df=df, df_users=df_users,
-        current_profit_dict=current_profit_dict,
-        maturity_profit_dict=maturity_profit_dict,
-        is_current_period_met=False,
-        is_maturity_period_met=True
-    )
-    df_cur = merge_with_investment(df_cur, df)
-    df_mat = merge_with_investment(df_mat, df)
-    overall_cur = summarize_overall(df_cur, "현재 해지(중도)")
-    overall_mat = summarize_overall(df_mat, "3년 만기(유지)")
-
-    # 6) 설명용 프롬프트 생성
-    user_state_stub = {}  # 감정/성향을 아직 안 쓰면 빈 dict로도 build_prompt 동작
-    prompt_cur = build_prompt(df_cur, overall_cur, "현재 해지(중도)", user_state_stub)
-    prompt_mat = build_prompt(df_mat, overall_mat, "3년 만기(유지)", user_state_stub)
+    model = get_model(get_db(), user_name, user_id=user_id)
+    return model.refresh()
 
-    return {
-        "mix_rm_msg": mix_rm_msg,
-        "years_left": years_left,
-        "current_total": current_total,
-        "forecast_total": forecast_total,
-        "report_prompts": {"current": prompt_cur, "maturity": prompt_mat},
-        "overall_cur": overall_cur,
-        "overall_mat": overall_mat,
-    }
+REPORT_SYSTEM = "당신은 수치 근거로 간결하게 말하는 금융 상담가입니다."
+REPORT_FALLBACK = {
+    "current": "현재 해지 리포트를 생성하지 못했습니다.",
+    "maturity": "3년 유지 리포트를 생성하지 못했습니다.",
+}
+
+def generate_report(kind: str, prompt: str) -> str | None:
+    try:
+        return hyperclova_client.chat([
+            {"role": "system", "content": REPORT_SYSTEM},
+            {"role": "user", "content": prompt},
+        ], task="report") or None
+    except Exception:
+        return None
+
+def portfolio_for_session(sess: ChatSession, user_name: str):
+    """로그인 때 시작한 선계산 결과가 있으면 재사용 (계산 중이면 기다림), 없으면 직접 계산"""
+    spec = sess.speculation
+    result = spec.result(user_name) if spec is not None else None
+    return result if result is not None else build_portfolio_for_user(user_name, sess.state.get("user_id"))
+
+def report_for_session(sess: ChatSession, kind: str, prompt: str) -> str:
+    spec = sess.speculation
+    cached = spec.report(kind, prompt) if spec is not None else None
+    return cached or generate_report(kind, prompt) or REPORT_FALLBACK[kind]
 
 def _diff_and_text(overall_cur, overall_mat):
     """세후수익 차이(diff)와 비교 문구를 동시에 반환"""
@@ -126,16 +130,19 @@ def _diff_and_text(overall_cur, overall_mat):
         return None, "두 시나리오 비교 데이터를 불러오지 못했습니다."
 
 # --- 세션 요약용: 대화 로그로 감정/성향 뽑아내기 ---
-def finalize_profile_from_log(conv_log: list[str] | list[dict]) -> tuple[str | None, str | None]:
-    # compact history
-    history_lines = []
-    for turn in conv_log[-60:]:
-        if isinstance(turn, dict):
-            prefix = "유저" if turn.get("role") == "user" else "상담사"
-            history_lines.append(f"{prefix}: {turn.get('content','')}")
-        else:
-            history_lines.append(str(turn))
-    history_text = "\n".join(history_lines)
+def finalize_profile_from_log(conv_log: ConversationHistory | list[str] | list[dict]) -> tuple[str | None, str | None]:
+    # compact history: 세션 기록은 요약 + 최근 원문으로 길이가 고정된다
+    if isinstance(conv_log, ConversationHistory):
+        history_text = conv_log.render()
+    else:
+        history_lines = []
+        for turn in conv_log[-60:]:
+            if isinstance(turn, dict):
+                prefix = "유저" if turn.get("role") == "user" else "상담사"
+                history_lines.append(f"{prefix}: {turn.get('content','')}")
+            else:
+                history_lines.append(str(turn))
+        history_text = "\n".join(history_lines)
 
     prompt = f"""
 아래는 유저와 상담사의 대화 기록입니다. 이 기록만을 근거로 유저의 현재 감정과 투자 성향을 간결하게 추정하세요.
@@ -157,7 +164,7 @@ def finalize_profile_from_log(conv_log: list[str] | list[dict]) -> tuple[str | N
         content = hyperclova_client.chat([
             {"role": "system", "content": "너는 대화 로그로부터 사용자의 감정과 투자 성향을 한 번에 추정하여 JSON만 반환하는 분석기다."},
             {"role": "user", "content": prompt},
-        ])
+        ], task="profile")
     except Exception:
         return None, None
 
@@ -172,8 +179,9 @@ def finalize_profile_from_log(conv_log: list[str] | list[dict]) -> tuple[str | N
             data = {}
     return data.get("감정"), data.get("성향")
 
-def build_session_summary():
-    emotion, tendency = finalize_profile_from_log(conversation_log)
+def build_session_summary(sess: ChatSession):
+    meter = sess.meter
+    emotion, tendency = finalize_profile_from_log(sess.history)
     return {
         "감정": emotion,
         "성향": tendency,
@@ -239,39 +247,213 @@ def health():
     return {"ok": True}
 
 @app.get("/", response_class=HTMLResponse)
-def root_page():
-    html_path = Path(__file__).parent / "templates" / "chat.html"
-    if not html_path.exists():
+def root_page(if_none_match: str | None = Header(None), accept_encoding: str | None = Header(None)):
+    if assets is None:
         return HTMLResponse("<h1>chat.html 파일이 없습니다.</h1>", status_code=500)
-    return HTMLResponse(html_path.read_text(encoding="utf-8"))
+    return respond(assets.page, if_none_match, accept_encoding)
+
+@app.get("/static/{name}")
+def static_file(name: str, if_none_match: str | None = Header(None), accept_encoding: str | None = Header(None)):
+    asset = assets.get(name) if assets is not None else None
+    if asset is None:
+        raise HTTPException(404, "Not Found")
+    return respond(asset, if_none_match, accept_encoding)
+
+@app.get("/metrics/bulkheads")
+def bulkheads():
+    # 격벽별 동시 실행/대기열 깊이/대기 시간 + 선계산 현황
+    return {**bulkhead_metrics(), "prefetch": prefetcher.stats(), "turn_log": turn_log.stats(),
+            "db_routing": get_db().stats(),
+            "empathy": dict(empathy.stats), "llm_routing": hyperclova_client.latency.stats(),
+            "providers": {p.name: p.stats() for p in (price_provider, beta_provider)}}
+
+def _require_admin(token: str | None):
+    if not ADMIN_TOKEN:
+        raise HTTPException(404)
+    if not token or not hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode()):   # bytes: 비ASCII 헤더도 403
+        raise HTTPException(403)
+
+@app.get("/admin/profiles")
+def admin_profiles(x_admin_token: str | None = Header(None)):
+    # 보관 중인 요청 프로파일 목록 (최신 순)
+    _require_admin(x_admin_token)
+    return {"enabled": PROFILE_ENABLED, "profiles": profiler.list()}
+
+@app.get("/admin/profiles/{profile_id}", response_class=PlainTextResponse)
+def admin_profile(profile_id: int, x_admin_token: str | None = Header(None)):
+    # collapsed stack 형식: flamegraph.pl / speedscope 로 바로 열 수 있음
+    _require_admin(x_admin_token)
+    cap = profiler.get(profile_id)
+    if cap is None:
+        raise HTTPException(404, "profile not found")
+    return PlainTextResponse(cap.collapsed())
+
+def _validated_summary(payload: dict) -> dict:
+    # Response 를 직접 돌려주면 FastAPI 가 response_model 검증을 건너뛰므로 여기서 스키마를 강제한다
+    return PortfolioSummaryOut.model_validate(payload).model_dump()
+
+def _model_etag(model) -> str:
+    return make_etag(model.user_name, model.asset_version, model.priced_at)
+
+@app.get("/portfolio/summary", response_model=PortfolioSummaryOut)
+@profiled
+def portfolio_summary(
+    request: Request,
+    user_name: str = Query(..., description="예: 이현주"),
+    max_age: int | None = Query(None, ge=0, description="허용할 스냅샷 나이(초). 지정하면 이보다 새 스냅샷을 바로 반환"),
+):
+    inm = request.headers.get("if-none-match")
+    cache_age = SUMMARY_CACHE_MAX_AGE_SEC
+
+    # 조건부 요청: 캐시된 모델의 시세가 아직 유효하면 재계산 없이 304
+    model = peek_model(user_name)
+    if inm and model is not None and model.fresh(cache_age) and etag_matches(inm, _model_etag(model)):
+        return not_modified(_model_etag(model), model.priced_at, cache_age)
+
+    engine = get_db()
+    if max_age:
+        try:
+            snap = read_snapshot(engine, user_name, max_age)
+        except Exception:
+            snap = None   # 스냅샷 테이블 문제는 실시간 계산으로 대체
+        if snap is not None:
+            tag = make_etag(user_name, "snapshot", snap["priced_at"])
+            priced_ts = pd.Timestamp(snap["priced_at"]).timestamp()
+            if etag_matches(inm, tag):
+                return not_modified(tag, priced_ts, cache_age)
+            return json_response(_validated_summary(snap), tag, priced_ts, cache_age)
 
-@app.get("/portfolio/summary")
-def portfolio_summary(user_name: str = Query(..., description="예: 이현주")):
     try:
-        result = build_portfolio_for_user(user_name)
+        model = get_model(engine, user_name)
+        result = model.current(cache_age)
     except ValueError as e:
         raise HTTPException(404, str(e))
-    return result
+    except BulkheadFull:
+        raise HTTPException(503, "요청이 많아 잠시 후 다시 시도해 주세요.", headers={"Retry-After": "1"})
+
+    if max_age:
+        # 스냅샷이 오래돼 실시간으로 계산했으면 다음 조회를 위해 갱신해 둔다
+        try:
+            write_snapshots(engine, [snapshot_row(user_name, result, model.checked_at)])
+        except Exception:
+            pass
+    tag = _model_etag(model)
+    if etag_matches(inm, tag):
+        return not_modified(tag, model.priced_at, cache_age)
+    return json_response(_validated_summary(summary_payload(user_name, result)), tag, model.priced_at, cache_age)
+
+async def _snapshot_loop():
+    while True:
+        try:
+            await asyncio.to_thread(refresh_snapshots, get_db())
+        except Exception:
+            pass
+        await asyncio.sleep(SNAPSHOT_REFRESH_SEC)
+
+@app.on_event("startup")
+async def start_snapshot_job():
+    if SNAPSHOT_REFRESH_SEC > 0:
+        app.state.snapshot_task = asyncio.create_task(_snapshot_loop())
+
+@app.on_event("shutdown")
+async def flush_turn_log():
+    # 버퍼에 남은 대화 턴을 모두 기록하고 종료
+    await asyncio.to_thread(turn_log.close)
+
+def live_payload(model, result, tickers=None) -> dict:
+    """WebSocket 증분 메시지: 바뀐 종목의 실시간 평가 + 현재/만기 세후 차이"""
+    diff, diff_text = _diff_and_text(result["overall_cur"], result["overall_mat"])
+    return {
+        "type": "valuation",
+        "version": model.version,
+        "assets": model.live_rows(tickers),
+        "current_total": result["current_total"],
+        "forecast_total": result["forecast_total"],
+        "diff": diff,
+        "comparison": diff_text,
+    }
+
+@app.websocket("/ws/portfolio")
+async def portfolio_ws(ws: WebSocket, user_name: str = Query(...)):
+    await ws.accept()
+    try:
+        model = await asyncio.to_thread(get_model, get_db(), user_name)
+        # 전 종목 시세로 한 번 평가해 둔다 → 이후 피드는 바뀐 종목만 재평가
+        result = await asyncio.to_thread(model.current, SUMMARY_CACHE_MAX_AGE_SEC)
+    except Exception as e:
+        await ws.send_json({"type": "error", "message": str(e)})
+        await ws.close()
+        return
+
+    # 시세는 ticker별 공유 피드에서 받는다 (클라이언트별 폴링 없음)
+    sub = price_feed.subscribe(model.tickers)
+    recv = asyncio.create_task(ws.receive_text())
+    try:
+        await ws.send_json(live_payload(model, result))
+        while True:
+            nxt = asyncio.create_task(sub.next())
+            done, _ = await asyncio.wait({nxt, recv}, return_when=asyncio.FIRST_COMPLETED)
+            if recv in done:
+                nxt.cancel()
+                recv.result()  # 연결 종료면 WebSocketDisconnect
+                recv = asyncio.create_task(ws.receive_text())  # 클라이언트 ping 등은 무시
+                continue
+            prices = nxt.result()
+            if model.expired():
+                # 모델 TTL 이 지나면 다시 적재 (보유 종목 변경 반영) → 종목이 바뀌었으면 재구독, 전체 평가를 다시 보낸다
+                try:
+                    model = await asyncio.to_thread(get_model, get_db(), user_name)
+                except BulkheadFull:
+                    pass                       # 이번 틱은 기존 모델로, 다음 틱에 다시 시도
+                except ValueError as e:
+                    await ws.send_json({"type": "error", "message": str(e)})
+                    await ws.close()
+                    return
+                if not model.expired():
+                    if set(model.tickers) != sub.tickers:
+                        price_feed.unsubscribe(sub)
+                        sub = price_feed.subscribe(model.tickers)
+                    result = await asyncio.to_thread(model.current, SUMMARY_CACHE_MAX_AGE_SEC)
+                    await ws.send_json(live_payload(model, result))
+                    continue
+            result = await asyncio.to_thread(model.reprice, prices)
+            await ws.send_json(live_payload(model, result, list(prices)))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        recv.cancel()
+        price_feed.unsubscribe(sub)
 
 @app.post("/chat")
+@profiled
 def chat(in_: ChatIn):
     txt = in_.text.strip()
+    sess = sessions.get(in_.session_id)
+    meter, conversation_log = sess.meter, sess.history
+    session_state, last_portfolio = sess.state, sess.portfolio
     meter.tick()
 
     # 0) 세션 시작: '첫 메시지 = 이름' (✅ 존재 검증 추가)
     if session_state["await_name"]:
         name_try = txt
-        engine = get_engine()
-        exists = False
+        user_id = None
         try:
-            with engine.begin() as conn:
-                row = conn.execute(text("SELECT 1 FROM users WHERE name=:n LIMIT 1"), {"n": name_try}).fetchone()
-                exists = row is not None
+            user_id = lookup_user_id(get_db(), name_try)
+        except BulkheadFull:
+            # 과부하: '이름 없음'이 아니므로 이름 대기 상태 그대로 두고 빠르게 응답
+            reply = "요청이 많아 성함을 확인하지 못했어요. 잠시 뒤 다시 입력해 주세요."
+            conversation_log.extend([
+                {"role": "user", "content": txt},
+                {"role": "assistant", "content": reply},
+            ])
+            return {"reply": reply, "metrics": {"anxiety": meter.anxiety, "loss_aversion": meter.loss_aversion}}
         except Exception:
             # DB 오류 시에도 안전하게 이름 재요청
-            exists = False
+            user_id = None
+        exists = user_id is not None
 
         if not exists:
+            sess.cancel_speculation()
             reply = f"'{name_try}'라는 이름을 찾지 못했어요. 등록된 성함으로 다시 입력해 주세요."
             conversation_log.extend([
                 {"role": "user", "content": txt},
@@ -280,15 +462,20 @@ def chat(in_: ChatIn):
             # 계속 이름 대기 상태 유지
             session_state["await_name"] = True
             session_state["name"] = None
+            session_state["user_id"] = None
             last_portfolio["name"] = None
             last_portfolio["prompts"] = None
             return {"reply": reply, "metrics": {"anxiety": meter.anxiety, "loss_aversion": meter.loss_aversion}}
 
         # 존재하는 이름 → 세션 확정
         session_state["name"] = name_try
+        session_state["user_id"] = user_id          # 이후 자산 조회는 PK로
         session_state["await_name"] = False
         last_portfolio["name"] = name_try
         last_portfolio["prompts"] = None
+        # 다음 턴('포트폴리오')을 기다리지 않고 미리 계산 시작 (부하가 높으면 건너뜀)
+        sess.set_speculation(prefetcher.start(
+            name_try, functools.partial(build_portfolio_for_user, user_id=user_id), generate_report))
 
         reply = (
             f"{name_try} 고객님, 반갑습니다. 어떤 것을 도와드릴까요? "
@@ -299,11 +486,11 @@ def chat(in_: ChatIn):
             {"role": "user", "content": txt},
             {"role": "assistant", "content": reply},
         ])
-        return {"reply": reply, "metrics": {"anxiety": meter.anxiety, "loss_aversion": meter.loss_aversion}}
+        return {"reply": reply, "metrics": {"anxiety": meter.anxiety, "loss_aversion": meter.loss_aversion}, "user_name": name_try}
 
     # === 종료 분기 ===
     if txt in ("종료", "그만", "quit", "exit"):
-        summary = build_session_summary()
+        summary = build_session_summary(sess)
 
         # 세션 이름이 있으면 시뮬도 함께 반환
         sim = None
@@ -312,7 +499,7 @@ def chat(in_: ChatIn):
         diff_profit = None 
         if session_state["name"]:
             try:
-                result = build_portfolio_for_user(session_state["name"])
+                result = portfolio_for_session(sess, session_state["name"])
                 last_portfolio["prompts"] = result["report_prompts"]
                 sim = {
                     "name": session_state["name"],
@@ -332,21 +519,8 @@ def chat(in_: ChatIn):
                 pc = result["report_prompts"]["current"]
                 pm = result["report_prompts"]["maturity"]
 
-                try:
-                    current_report = hyperclova_client.chat([
-                        {"role": "system", "content": "당신은 수치 근거로 간결하게 말하는 금융 상담가입니다."},
-                        {"role": "user", "content": pc},
-                    ])
-                except Exception:
-                    current_report = "현재 해지 리포트를 생성하지 못했습니다."
-
-                try:
-                    maturity_report = hyperclova_client.chat([
-                        {"role": "system", "content": "당신은 수치 근거로 간결하게 말하는 금융 상담가입니다."},
-                        {"role": "user", "content": pm},
-                    ])
-                except Exception:
-                    maturity_report = "3년 유지 리포트를 생성하지 못했습니다."
+                current_report = report_for_session(sess, "current", pc)
+                maturity_report = report_for_session(sess, "maturity", pm)
 
                 reports = {
                     "current": current_report,
@@ -374,7 +548,8 @@ def chat(in_: ChatIn):
             if hasattr(meter, "last_ts"):
                 meter.last_ts = None
 
-        # 포트폴리오 흐름/로그 초기화
+        # 포트폴리오 흐름/로그 초기화 (진행 중인 선계산도 취소)
+        sess.cancel_speculation()
         last_portfolio["name"] = None
         last_portfolio["prompts"] = None
         conversation_log.clear()
@@ -382,6 +557,7 @@ def chat(in_: ChatIn):
         # 다음 세션을 위해 이름 재요청 모드로 복귀
         session_state["await_name"] = True
         session_state["name"] = None
+        session_state["user_id"] = None
 
         return {
             "reply": reply,
@@ -408,11 +584,12 @@ def chat(in_: ChatIn):
             return {"reply": reply, "metrics": {"anxiety": meter.anxiety, "loss_aversion": meter.loss_aversion}}
 
         try:
-            result = build_portfolio_for_user(name)
+            result = portfolio_for_session(sess, name)
         except ValueError:
             # DB에 이름이 없으면 재요청
             session_state["await_name"] = True
             session_state["name"] = None
+            session_state["user_id"] = None
             last_portfolio["name"] = None
             last_portfolio["prompts"] = None
             reply = f"'{name}' 사용자를 찾지 못했어요. 성함을 다시 알려주시면 재시도할게요."
@@ -421,6 +598,14 @@ def chat(in_: ChatIn):
                 {"role": "assistant", "content": reply},
             ])
             return {"reply": reply, "metrics": {"anxiety": meter.anxiety, "loss_aversion": meter.loss_aversion}}
+        except BulkheadFull:
+            # 과부하: 세션은 유지하고 빠르게 대체 문구로 응답
+            reply = "요약을 불러오지 못했어요. 잠시 뒤 다시 시도해 주세요."
+            conversation_log.extend([
+                {"role": "user", "content": txt},
+                {"role": "assistant", "content": reply},
+            ])
+            return {"reply": reply, "metrics": {"anxiety": meter.anxiety, "loss_aversion": meter.loss_aversion}}
 
         # 성공: 선택지 프롬프트 캐시
         last_portfolio["name"] = name
@@ -447,7 +632,7 @@ def chat(in_: ChatIn):
 
         # 최신 포트폴리오/프롬프트/비교 데이터 로드
         try:
-            result = build_portfolio_for_user(name)
+            result = portfolio_for_session(sess, name)
         except Exception:
             reply = "요약을 불러오지 못했어요. 잠시 뒤 다시 시도해 주세요."
             conversation_log.extend([
@@ -462,19 +647,13 @@ def chat(in_: ChatIn):
         # 비교(차액 + 문구)
         diff_profit, comparison_text = _diff_and_text(result["overall_cur"], result["overall_mat"])
         # 세션 요약(감정/성향) 기반 응원
-        session_summary = build_session_summary()
+        session_summary = build_session_summary(sess)
         encouragement = build_encouragement(session_summary, diff_profit)
 
         # 선택지: 현재해지
         if is_select_current(txt):
             pc = result["report_prompts"]["current"]
-            try:
-                current_report = hyperclova_client.chat([
-                    {"role": "system", "content": "당신은 수치 근거로 간결하게 말하는 금융 상담가입니다."},
-                    {"role": "user", "content": pc},
-                ])
-            except Exception:
-                current_report = "현재 해지 리포트를 생성하지 못했습니다."
+            current_report = report_for_session(sess, "current", pc)
 
             reply = f"'{name}'님의 현재 해지 리포트를 정리했어요."
             conversation_log.extend([
@@ -490,13 +669,7 @@ def chat(in_: ChatIn):
         # 선택지: 3년유지
         if is_select_maturity(txt):
             pm = result["report_prompts"]["maturity"]
-            try:
-                maturity_report = hyperclova_client.chat([
-                    {"role": "system", "content": "당신은 수치 근거로 간결하게 말하는 금융 상담가입니다."},
-                    {"role": "user", "content": pm},
-                ])
-            except Exception:
-                maturity_report = "3년 유지 리포트를 생성하지 못했습니다."
+            maturity_report = report_for_session(sess, "maturity", pm)
 
             reply = f"'{name}'님의 3년 유지 리포트를 정리했어요."
             conversation_log.extend([
@@ -513,22 +686,11 @@ def chat(in_: ChatIn):
     if guardrails.triggered(txt):
         reply = guardrails.reply()
     else:
-        fewshot = FEW_SHOT_PROMPT_TEMPLATE.format(
-            financial_knowledge=FINANCIAL_KNOWLEDGE,
-            user_input=txt,
-        )
-        messages = [
-            {"role": "system", "content": "당신은 투자자들의 감정과 금융 상황을 함께 이해하고 공감해주는 금융 심리 상담사입니다."},
-            {"role": "user", "content": fewshot},
-        ]
-
         # 감정 메트릭 업데이트
         meter.update(txt)
 
-        try:
-            reply = hyperclova_client.chat(messages) or "연결이 잠시 불안정하네요. 한 단어로 지금 감정을 표현해주실 수 있을까요?"
-        except Exception:
-            reply = "연결이 잠시 불안정하네요. 한 단어로 지금 감정을 표현해주실 수 있을까요?"
+        # 마감 시간 안에 LLM 답이 없으면 감정/신호 기반 로컬 응답 (늦은 답은 캐시)
+        reply, _ = empathy.reply(txt)
 
     # 필요 시 1회 개입 문구 부착
     if meter.need_intervention():
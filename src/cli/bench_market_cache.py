@@ -0,0 +1,102 @@
+# src/cli/bench_market_cache.py
+"""
+공유 mmap 시세 캐시 vs 워커별(프로세스 로컬) 캐시 비교.
+
+    python -m src.cli.bench_market_cache --workers 4 --tickers 500 --reads 200000
+
+- 읽기 지연: MarketCache.get (seqlock, 무복사) vs 락으로 보호한 dict
+- upstream 호출/메모리: 워커 프로세스를 실제로 띄워 갱신 1회를 돌리고 측정한다.
+  · upstream 호출: 프로세스 간 공유 카운터로 센 조회 수 (시세 조회는 카운터만 올리는 스텁)
+  · 상태 바이트: 공유는 캐시 파일 크기(페이지 캐시 1벌) + 워커별 사설 힙, 로컬은 워커별 사설 힙 합계
+    (사설 힙 = 각 프로세스에서 tracemalloc 으로 잰 상태 구성 중 할당량)
+"""
+import argparse, multiprocessing as mp, os, random, tempfile, threading, time, tracemalloc
+from ..services.market_cache import MarketCache
+
+def _bench(fn, keys, n) -> float:
+    t0 = time.perf_counter()
+    for i in range(n):
+        fn(keys[i % len(keys)])
+    return (time.perf_counter() - t0) / n * 1e6
+
+def _fetch(calls, ticker):
+    """upstream 스텁: 호출 수만 센다"""
+    with calls.get_lock():
+        calls.value += 1
+    return random.uniform(1e3, 1e5), random.uniform(0.5, 1.5)
+
+def _local_worker(tickers, calls, out):
+    # 워커마다 자기 dict 를 채운다 (프로세스 로컬 캐시의 갱신 1회)
+    tracemalloc.start()
+    now = time.time()
+    state = {t: (*_fetch(calls, t), now, now) for t in tickers}
+    out.put(tracemalloc.get_traced_memory()[0])
+    del state
+
+def _shared_refresher(path, slots, tickers, calls):
+    cache = MarketCache(path, slots=slots, writable=True)
+    for t in tickers:
+        price, beta = _fetch(calls, t)
+        cache.put(t, price=price, beta=beta)
+    cache.flush()
+
+def _shared_worker(path, tickers, out):
+    # 워커는 파일을 읽기만 한다 (사설 힙에는 ticker→슬롯 맵 정도만 남음)
+    tracemalloc.start()
+    reader = MarketCache(path)
+    for t in tickers:
+        reader.get(t)
+    out.put(tracemalloc.get_traced_memory()[0])
+
+def _run(procs):
+    for p in procs: p.start()
+    for p in procs: p.join()
+
+def measure_refresh(tickers: list[str], workers: int, path: str, slots: int) -> dict:
+    ctx = mp.get_context("fork" if "fork" in mp.get_all_start_methods() else "spawn")
+    shared_calls, local_calls = ctx.Value("q", 0), ctx.Value("q", 0)
+    shared_out, local_out = ctx.Queue(), ctx.Queue()
+
+    _run([ctx.Process(target=_shared_refresher, args=(path, slots, tickers, shared_calls))])
+    _run([ctx.Process(target=_shared_worker, args=(path, tickers, shared_out)) for _ in range(workers)])
+    _run([ctx.Process(target=_local_worker, args=(tickers, local_calls, local_out)) for _ in range(workers)])
+    return {
+        "shared_calls": shared_calls.value,
+        "local_calls": local_calls.value,
+        "shared_file_bytes": os.path.getsize(path),
+        "shared_private_bytes": sum(shared_out.get() for _ in range(workers)),
+        "local_private_bytes": sum(local_out.get() for _ in range(workers)),
+    }
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--tickers", type=int, default=500)
+    ap.add_argument("--reads", type=int, default=200_000)
+    args = ap.parse_args()
+
+    tickers = [f"T{i:05d}.KS" for i in range(args.tickers)]
+    keys = tickers[:]; random.shuffle(keys)
+
+    slots = max(64, args.tickers*2)
+    path = os.path.join(tempfile.mkdtemp(), "market.cache")
+    m = measure_refresh(tickers, args.workers, path, slots)
+    reader = MarketCache(path)
+
+    local: dict[str, tuple] = {t: (1.0, 1.0, time.time(), time.time()) for t in tickers}
+    lock = threading.Lock()
+    def local_get(t):
+        with lock:
+            return local.get(t)
+
+    shared_us = _bench(reader.get, keys, args.reads)
+    local_us = _bench(local_get, keys, args.reads)
+
+    print(f"read latency   shared mmap: {shared_us:.2f} us/op | per-process dict: {local_us:.2f} us/op")
+    print(f"upstream calls per refresh (measured, {args.workers} workers)   "
+          f"shared: {m['shared_calls']} | per-process: {m['local_calls']}")
+    print(f"quote state bytes (measured)   shared: {m['shared_file_bytes']:,} file (1 page-cache copy) "
+          f"+ {m['shared_private_bytes']:,} private | per-process: {m['local_private_bytes']:,} private")
+
+if __name__ == "__main__":
+    main()
@@ -1,33 +1,174 @@
-from ..prompts import FEW_SHOT_PROMPT_TEMPLATE, FINANCIAL_KNOWLEDGE
-from ..services import hyperclova_client, guardrails
-from ..services.emo_metrics import EmoMeter, intervention_text
+# src/cli/run_console.py
+"""
+콘솔 클라이언트 — API와 같은 채팅 엔진(app.chat: 세션/이름 확인/포트폴리오/감정 메터)을 그대로 쓴다.
 
-def main():
-    meter = EmoMeter()
-    print("안녕하세요, 금융 심리 상담사입니다. 어떤 점이 고민이신가요? (종료하려면 '종료')")
+    python -m src.cli.run_console                                   # 대화형
+    python -m src.cli.run_console --replay scripts.jsonl --stub-llm # 스크립트 재생 (처리량/회귀)
+    python -m src.cli.run_console --synth 2000 --stub-llm           # 합성 스크립트로 재생
 
-    while True:
-        user_text = input("🙂 사용자: ").strip()
-        meter.tick()
+재생 스크립트(JSONL, 한 줄에 하나):
+    {"id": "s1", "user": "이현주", "turns": ["포트폴리오", {"text": "불안해요", "expect": {"anxiety": 0.44}}]}
+- user 가 있으면 첫 발화로 이름을 보내 로그인한다(DB 필요). 없으면 게스트로 바로 공감 대화.
+- expect(anxiety / loss_aversion / intervened)가 있으면 응답과 비교해 불일치를 보고한다.
+- 게스트 발화가 이름 요청 단계로 빠지면(포트폴리오 키워드 등) 오류로 센다.
+- 재생 중에는 대화 기록(turn_log)과 포트폴리오 선계산(prefetch)을 끈다 — DB 쓰기/백그라운드 작업이 측정을 흐리지 않게.
+- --record 로 관측값을 expect 로 채운 스크립트를 저장하면 다음 실행의 기준(golden)이 된다.
+"""
+import argparse, asyncio, json, random, sys, time
+from concurrent.futures import ThreadPoolExecutor
+from .. import app as chat_app
+from ..services import hyperclova_client, session as session_mod
+from ..services.prefetch import prefetcher
+from ..services.emo_metrics import intervention_text
+
+EXIT_WORDS = ("종료", "그만", "quit", "exit")
+_TOL = 1e-6
+
+# ---- 로컬 LLM 스텁 ----
+def make_stub_llm(latency_ms: float = 0.0):
+    """결정적 응답 + 고정 지연. 프로필 추정 요청에는 JSON으로 답한다."""
+    def chat(messages, **kwargs):
+        if latency_ms: time.sleep(latency_ms / 1000)
+        system = messages[0]["content"] if messages else ""
+        if "JSON" in system:
+            return '{"감정": "중립", "성향": "중립적"}'
+        return f"[stub] {len(messages[-1]['content'])}자 입력에 대한 답변입니다."
+    return chat
+
+# ---- 대화형 ----
+def _print_extras(out: dict):
+    for key in ("summary", "simulation", "comparison", "encouragement"):
+        if out.get(key): print(f"   · {key}: {out[key]}")
+    for kind, text in (out.get("reports") or {}).items():
+        print(f"   · report[{kind}]: {text}")
 
-        if user_text.lower() == "종료":
-            print("상담을 종료하겠습니다. 오늘 대화가 마음을 조금이라도 가볍게 했길 바라요.")
+async def interactive(session_id: str):
+    print("안녕하세요, 금융 심리 상담사입니다. 먼저 성함을 입력해 주세요. (종료하려면 '종료')")
+    while True:
+        user_text = (await asyncio.to_thread(input, "🙂 사용자: ")).strip()
+        if not user_text: continue
+        out = await asyncio.to_thread(chat_app.chat, chat_app.ChatIn(text=user_text, session_id=session_id))
+        print(f"🤖 챗봇: {out['reply']}")
+        _print_extras(out)
+        if user_text in EXIT_WORDS and chat_app.sessions.get(session_id).state["await_name"]:
             break
 
-        if guardrails.triggered(user_text):
-            bot = guardrails.reply()
-        else:
-            fewshot = FEW_SHOT_PROMPT_TEMPLATE.format(financial_knowledge=FINANCIAL_KNOWLEDGE, user_input=user_text)
-            messages=[{"role":"system","content":"당신은 투자자들의 감정과 금융 상황을 함께 이해하고 공감해주는 금융 심리 상담사입니다."},
-                      {"role":"user","content": fewshot}]
-            meter.update(user_text)
-            bot = hyperclova_client.chat(messages) or "연결이 잠시 불안정하네요. 한 단어로 지금 감정을 표현해주실 수 있을까요?"
+# ---- 재생 ----
+def _turn(t) -> tuple[str, dict | None]:
+    return (t, None) if isinstance(t, str) else (t["text"], t.get("expect"))
+
+def _check(expect: dict | None, obs: dict) -> list[str]:
+    if not expect: return []
+    bad = []
+    for k in ("anxiety", "loss_aversion"):
+        if k in expect and abs(float(expect[k]) - obs[k]) > _TOL:
+            bad.append(f"{k}: expected {expect[k]}, got {obs[k]}")
+    if "intervened" in expect and bool(expect["intervened"]) != obs["intervened"]:
+        bad.append(f"intervened: expected {expect['intervened']}, got {obs['intervened']}")
+    return bad
+
+def run_script(script: dict, idx: int) -> dict:
+    """스크립트 하나를 독립 세션으로 실행 (스레드에서 호출)"""
+    sid = f"replay-{script.get('id', idx)}-{idx}"
+    sess = chat_app.sessions.get(sid)
+    if not script.get("user"):
+        sess.state.update(await_name=False, name=None)       # 게스트: 이름 단계 생략
+    turns = ([script["user"]] if script.get("user") else []) + list(script.get("turns", []))
+
+    latencies, mismatches, observed, errors = [], [], [], 0
+    for n, t in enumerate(turns):
+        text, expect = _turn(t)
+        t0 = time.perf_counter()
+        try:
+            out = chat_app.chat(chat_app.ChatIn(text=text, session_id=sid))
+        except Exception as e:
+            errors += 1
+            observed.append({"text": text, "error": repr(e)})
+            continue
+        latencies.append(time.perf_counter() - t0)
+        if not script.get("user") and sess.state["await_name"] and text not in EXIT_WORDS:
+            errors += 1                                  # 게스트가 이름 요청으로 빠짐 → 이후 턴은 의미 없음
+            observed.append({"text": text, "error": "guest fell back to name prompt"})
+            sess.state.update(await_name=False, name=None)
+            continue
+        m = out.get("metrics") or {}
+        obs = {"anxiety": round(float(m.get("anxiety", 0.0)), 6),
+               "loss_aversion": round(float(m.get("loss_aversion", 0.0)), 6),
+               "intervened": intervention_text() in out.get("reply", "")}
+        observed.append({"text": text, "expect": obs})
+        mismatches += [f"{sid} turn {n}: {b}" for b in _check(expect, obs)]
+    chat_app.sessions.drop(sid)
+    return {"latencies": latencies, "mismatches": mismatches, "errors": errors,
+            "recorded": {**{k: v for k, v in script.items() if k != "turns"},
+                         "turns": observed[1:] if script.get("user") else observed}}
+
+def _pct(xs: list[float], p: float) -> float:
+    return round(xs[min(len(xs)-1, int(p*len(xs)))]*1000, 2) if xs else 0.0
+
+async def replay(scripts: list[dict], concurrency: int) -> dict:
+    session_mod.TURN_LOG_ENABLED = False
+    prefetcher.max_pending = 0
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="replay"))
+    t0 = time.perf_counter()
+    results = await asyncio.gather(*(asyncio.to_thread(run_script, s, i) for i, s in enumerate(scripts)))
+    wall = time.perf_counter() - t0
+
+    lat = sorted(x for r in results for x in r["latencies"])
+    mismatches = [m for r in results for m in r["mismatches"]]
+    report = {
+        "scripts": len(scripts),
+        "turns": len(lat),
+        "errors": sum(r["errors"] for r in results),
+        "wall_sec": round(wall, 3),
+        "turns_per_sec": round(len(lat) / wall, 1) if wall else 0.0,
+        "latency_ms": {"p50": _pct(lat, 0.50), "p95": _pct(lat, 0.95), "p99": _pct(lat, 0.99),
+                       "max": round(lat[-1]*1000, 2) if lat else 0.0},
+        "emotion_mismatches": len(mismatches),
+        "mismatch_samples": mismatches[:20],
+        "bulkheads": chat_app.bulkhead_metrics(),
+    }
+    return report, [r["recorded"] for r in results]
+
+def synth_scripts(n: int, turns: int = 8, seed: int = 0) -> list[dict]:
+    """게스트 대화 스크립트 합성 (감정/신호 키워드를 섞은 발화, 포트폴리오 키워드는 넣지 않는다)"""
+    rng = random.Random(seed)
+    pool = ["요즘 시장이 너무 불안해요", "전액 해지할까 고민돼요", "후회가 커요", "헷갈려서 모르겠어요",
+            "조금 기대돼요", "물타기 해야 할까요", "오늘은 괜찮아요", "계속 들고 가는 게 맞을까요",
+            "손절하고 싶어요", "잠이 안 와요"]
+    return [{"id": f"synth{i}", "turns": [rng.choice(pool) for _ in range(turns)]} for i in range(n)]
+
+def load_scripts(path: str) -> list[dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def main():
+    ap = argparse.ArgumentParser(description="ISA 심리 상담 콘솔 / 스크립트 재생")
+    ap.add_argument("--session", default="console")
+    ap.add_argument("--replay", help="재생할 JSONL 스크립트 경로")
+    ap.add_argument("--synth", type=int, default=0, help="합성 스크립트 N개로 재생")
+    ap.add_argument("--concurrency", type=int, default=64)
+    ap.add_argument("--stub-llm", action="store_true", help="HyperCLOVA 대신 로컬 스텁 사용")
+    ap.add_argument("--stub-latency-ms", type=float, default=0.0)
+    ap.add_argument("--record", help="관측값을 expect 로 채운 스크립트를 저장할 경로")
+    args = ap.parse_args()
+
+    if args.stub_llm:
+        hyperclova_client.chat = make_stub_llm(args.stub_latency_ms)
 
-        if meter.need_intervention():
-            bot = f"{bot} {intervention_text()}"
-            meter.start_cooldown()
+    if not (args.replay or args.synth):
+        asyncio.run(interactive(args.session))
+        return
 
-        print(f"🤖 챗봇: {bot}")
+    scripts = load_scripts(args.replay) if args.replay else synth_scripts(args.synth)
+    report, recorded = asyncio.run(replay(scripts, args.concurrency))
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if args.record:
+        with open(args.record, "w", encoding="utf-8") as f:
+            for s in recorded:
+                f.write(json.dumps(s, ensure_ascii=False) + "\n")
+    if report["errors"] or report["emotion_mismatches"]:
+        sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
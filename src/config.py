@@ -7,6 +7,7 @@ load_dotenv()
 class Settings(BaseModel):
     HCX_API_KEY: str
     HCX_MODEL_NAME: str = "HCX-005"
+    HCX_LIGHT_MODEL_NAME: str = "HCX-DASH-002"   # 짧은 응답/JSON 추출, 지연 예산 초과 시 우회용
 
     DB_HOST: str
     DB_PORT: int
@@ -18,11 +19,83 @@ class Settings(BaseModel):
     RM_DOMESTIC: float = 0.050
     RM_GLOBAL: float = 0.070
     BETA_TTL_DAYS: int = 7
+    BETA_SOURCE: str = "yahoo"             # yahoo: 종목별 조회(기존) / local: 가격 이력으로 추정 (price_history 동기화 필요)
+    BETA_WINDOW_WEEKS: int = 104
+    BETA_MIN_WEEKS: int = 26
+    PRICE_STORE_PATH: str = "data/price_history.sqlite"
+    MARKET_CACHE_PATH: str = ""            # 비우면 워커 간 공유 시세 캐시 사용 안 함
+    MARKET_CACHE_SLOTS: int = 4096
+    MARKET_CACHE_MAX_AGE_SEC: float = 60.0
+    PORTFOLIO_MODEL_TTL_SEC: int = 600
+    PORTFOLIO_MODEL_MAX: int = 500         # 메모리에 둘 사용자 모델 수 (최근 사용 순 LRU)
+    PRICE_FEED_INTERVAL_SEC: float = 15.0
+    SNAPSHOT_REFRESH_SEC: int = 0          # 0이면 백그라운드 스냅샷 갱신 끔
+    SUMMARY_CACHE_MAX_AGE_SEC: int = 15    # /portfolio/summary Cache-Control max-age 겸 시세 재확인 주기
+
+    # 세션/대화 기록 상한
+    SESSION_MAX: int = 1000
+    SESSION_IDLE_SEC: int = 3600
+    HISTORY_MAX_TURNS: int = 60
+    HISTORY_TURN_CHARS: int = 500
+    HISTORY_SUMMARY_CHARS: int = 600
+
+    # upstream 격벽: 동시 실행 수 / 대기열 길이 / 최대 대기(초)
+    LLM_MAX_CONCURRENCY: int = 8
+    LLM_MAX_QUEUE: int = 32
+    LLM_MAX_WAIT_SEC: float = 2.0
+    QUOTE_MAX_CONCURRENCY: int = 16
+    QUOTE_MAX_QUEUE: int = 64
+    QUOTE_MAX_WAIT_SEC: float = 1.0
+    DB_MAX_CONCURRENCY: int = 10
+    DB_MAX_QUEUE: int = 50
+    DB_MAX_WAIT_SEC: float = 1.0
+
+    # 읽기 전용 복제본 (비우면 모든 쿼리를 기본 DB로). 계정/DB 이름은 기본 DB와 같다
+    REPLICA_DB_HOST: str = ""
+    REPLICA_DB_PORT: int = 0               # 0이면 DB_PORT
+    REPLICA_MAX_LAG_SEC: float = 5.0       # 복제 지연이 이보다 크면 읽기도 기본 DB로
+    REPLICA_CHECK_SEC: float = 5.0         # 지연 재확인 주기
+    REPLICA_RETRY_SEC: float = 30.0        # 연결 오류 후 복제본을 다시 시도하기까지
+
+    # 시세/베타 공급원별 지연 예산(초). 1순위가 p95 안에 답하지 않으면 2순위를 동시에 띄운다
+    QUOTE_FAST_BUDGET_SEC: float = 1.5
+    QUOTE_HISTORY_BUDGET_SEC: float = 4.0
+    BETA_INFO_BUDGET_SEC: float = 4.0
+    BETA_SCRAPE_BUDGET_SEC: float = 8.0
+    NEGATIVE_CACHE_TTL_SEC: int = 900      # 어느 공급원에도 없는 ticker 재조회 간격
+
+    # 일반 공감 턴: LLM 마감 시간(초)과 늦은 답 캐시 크기/유효 시간(초)
+    EMPATHY_DEADLINE_SEC: float = 4.0
+    EMPATHY_CACHE_SIZE: int = 2048
+    EMPATHY_CACHE_TTL_SEC: int = 600
+
+    # 대화 턴 write-behind 저장 (conversation_turns)
+    TURN_LOG_ENABLED: bool = True
+    TURN_LOG_BATCH: int = 200
+    TURN_LOG_FLUSH_SEC: float = 2.0
+    TURN_LOG_MAX_BUFFER: int = 20000
+
+    # 로그인 직후 포트폴리오 선계산
+    PREFETCH_MAX_WORKERS: int = 4
+    PREFETCH_MAX_PENDING: int = 8          # 동시 선계산 상한 (0이면 끔)
+    PREFETCH_REPORTS: bool = False         # 두 시나리오 리포트(LLM)까지 미리 생성
+    PREFETCH_TTL_SEC: int = 60
+
+    # 요청 프로파일링 (PROFILE_ENABLED=0 이면 미들웨어 자체를 달지 않음)
+    PROFILE_ENABLED: bool = False
+    PROFILE_SAMPLE_RATE: float = 0.0       # 무작위로 프로파일할 요청 비율
+    PROFILE_SLOW_MS: int = 0               # 이 시간을 넘긴 요청은 넘긴 시점부터 샘플링해 보관 (0: 끔)
+    PROFILE_INTERVAL_MS: float = 5.0
+    PROFILE_KEEP: int = 20
+
+    GZIP_MIN_SIZE: int = 1024              # 이보다 작은 JSON 응답은 압축하지 않음
+    ADMIN_TOKEN: str = ""                  # 비우면 /admin 엔드포인트 비활성
 
 def get_settings() -> Settings:
     return Settings(
         HCX_API_KEY=os.getenv("HCX_API_KEY", ""),
         HCX_MODEL_NAME=os.getenv("HCX_MODEL_NAME", "HCX-005"),
+        HCX_LIGHT_MODEL_NAME=os.getenv("HCX_LIGHT_MODEL_NAME", "HCX-DASH-002"),
         DB_HOST=os.getenv("DB_HOST", "localhost"),
         DB_PORT=int(os.getenv("DB_PORT", "3306")),
         DB_NAME=os.getenv("DB_NAME", "mdg"),
@@ -32,4 +105,58 @@ def get_settings() -> Settings:
         RM_DOMESTIC=float(os.getenv("RM_DOMESTIC", "0.050")),
         RM_GLOBAL=float(os.getenv("RM_GLOBAL", "0.070")),
         BETA_TTL_DAYS=int(os.getenv("BETA_TTL_DAYS", "7")),
+        BETA_SOURCE=os.getenv("BETA_SOURCE", "yahoo"),
+        BETA_WINDOW_WEEKS=int(os.getenv("BETA_WINDOW_WEEKS", "104")),
+        BETA_MIN_WEEKS=int(os.getenv("BETA_MIN_WEEKS", "26")),
+        PRICE_STORE_PATH=os.getenv("PRICE_STORE_PATH", "data/price_history.sqlite"),
+        MARKET_CACHE_PATH=os.getenv("MARKET_CACHE_PATH", ""),
+        MARKET_CACHE_SLOTS=int(os.getenv("MARKET_CACHE_SLOTS", "4096")),
+        MARKET_CACHE_MAX_AGE_SEC=float(os.getenv("MARKET_CACHE_MAX_AGE_SEC", "60")),
+        PORTFOLIO_MODEL_TTL_SEC=int(os.getenv("PORTFOLIO_MODEL_TTL_SEC", "600")),
+        PORTFOLIO_MODEL_MAX=int(os.getenv("PORTFOLIO_MODEL_MAX", "500")),
+        PRICE_FEED_INTERVAL_SEC=float(os.getenv("PRICE_FEED_INTERVAL_SEC", "15")),
+        SNAPSHOT_REFRESH_SEC=int(os.getenv("SNAPSHOT_REFRESH_SEC", "0")),
+        SUMMARY_CACHE_MAX_AGE_SEC=int(os.getenv("SUMMARY_CACHE_MAX_AGE_SEC", "15")),
+        SESSION_MAX=int(os.getenv("SESSION_MAX", "1000")),
+        SESSION_IDLE_SEC=int(os.getenv("SESSION_IDLE_SEC", "3600")),
+        HISTORY_MAX_TURNS=int(os.getenv("HISTORY_MAX_TURNS", "60")),
+        HISTORY_TURN_CHARS=int(os.getenv("HISTORY_TURN_CHARS", "500")),
+        HISTORY_SUMMARY_CHARS=int(os.getenv("HISTORY_SUMMARY_CHARS", "600")),
+        LLM_MAX_CONCURRENCY=int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+        LLM_MAX_QUEUE=int(os.getenv("LLM_MAX_QUEUE", "32")),
+        LLM_MAX_WAIT_SEC=float(os.getenv("LLM_MAX_WAIT_SEC", "2.0")),
+        QUOTE_MAX_CONCURRENCY=int(os.getenv("QUOTE_MAX_CONCURRENCY", "16")),
+        QUOTE_MAX_QUEUE=int(os.getenv("QUOTE_MAX_QUEUE", "64")),
+        QUOTE_MAX_WAIT_SEC=float(os.getenv("QUOTE_MAX_WAIT_SEC", "1.0")),
+        DB_MAX_CONCURRENCY=int(os.getenv("DB_MAX_CONCURRENCY", "10")),
+        DB_MAX_QUEUE=int(os.getenv("DB_MAX_QUEUE", "50")),
+        DB_MAX_WAIT_SEC=float(os.getenv("DB_MAX_WAIT_SEC", "1.0")),
+        REPLICA_DB_HOST=os.getenv("REPLICA_DB_HOST", ""),
+        REPLICA_DB_PORT=int(os.getenv("REPLICA_DB_PORT", "0")),
+        REPLICA_MAX_LAG_SEC=float(os.getenv("REPLICA_MAX_LAG_SEC", "5.0")),
+        REPLICA_CHECK_SEC=float(os.getenv("REPLICA_CHECK_SEC", "5.0")),
+        REPLICA_RETRY_SEC=float(os.getenv("REPLICA_RETRY_SEC", "30.0")),
+        QUOTE_FAST_BUDGET_SEC=float(os.getenv("QUOTE_FAST_BUDGET_SEC", "1.5")),
+        QUOTE_HISTORY_BUDGET_SEC=float(os.getenv("QUOTE_HISTORY_BUDGET_SEC", "4.0")),
+        BETA_INFO_BUDGET_SEC=float(os.getenv("BETA_INFO_BUDGET_SEC", "4.0")),
+        BETA_SCRAPE_BUDGET_SEC=float(os.getenv("BETA_SCRAPE_BUDGET_SEC", "8.0")),
+        NEGATIVE_CACHE_TTL_SEC=int(os.getenv("NEGATIVE_CACHE_TTL_SEC", "900")),
+        EMPATHY_DEADLINE_SEC=float(os.getenv("EMPATHY_DEADLINE_SEC", "4.0")),
+        EMPATHY_CACHE_SIZE=int(os.getenv("EMPATHY_CACHE_SIZE", "2048")),
+        EMPATHY_CACHE_TTL_SEC=int(os.getenv("EMPATHY_CACHE_TTL_SEC", "600")),
+        TURN_LOG_ENABLED=os.getenv("TURN_LOG_ENABLED", "1").lower() in ("1", "true", "yes"),
+        TURN_LOG_BATCH=int(os.getenv("TURN_LOG_BATCH", "200")),
+        TURN_LOG_FLUSH_SEC=float(os.getenv("TURN_LOG_FLUSH_SEC", "2.0")),
+        TURN_LOG_MAX_BUFFER=int(os.getenv("TURN_LOG_MAX_BUFFER", "20000")),
+        PREFETCH_MAX_WORKERS=int(os.getenv("PREFETCH_MAX_WORKERS", "4")),
+        PREFETCH_MAX_PENDING=int(os.getenv("PREFETCH_MAX_PENDING", "8")),
+        PREFETCH_REPORTS=os.getenv("PREFETCH_REPORTS", "0").lower() in ("1", "true", "yes"),
+        PREFETCH_TTL_SEC=int(os.getenv("PREFETCH_TTL_SEC", "60")),
+        PROFILE_ENABLED=os.getenv("PROFILE_ENABLED", "0").lower() in ("1", "true", "yes"),
+        PROFILE_SAMPLE_RATE=float(os.getenv("PROFILE_SAMPLE_RATE", "0")),
+        PROFILE_SLOW_MS=int(os.getenv("PROFILE_SLOW_MS", "0")),
+        PROFILE_INTERVAL_MS=float(os.getenv("PROFILE_INTERVAL_MS", "5")),
+        PROFILE_KEEP=int(os.getenv("PROFILE_KEEP", "20")),
+        GZIP_MIN_SIZE=int(os.getenv("GZIP_MIN_SIZE", "1024")),
+        ADMIN_TOKEN=os.getenv("ADMIN_TOKEN", ""),
     )
\ No newline at end of file
@@ -0,0 +1,40 @@
+# src/db/migrate.py
+"""
+src/db/migrations/*.sql 을 파일명 순서대로 한 번씩 적용한다.
+적용 이력은 schema_migrations 테이블에 남긴다.
+
+    python -m src.db.migrate
+"""
+from pathlib import Path
+from sqlalchemy import text
+
+MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+
+def _statements(sql: str) -> list[str]:
+    lines = [l for l in sql.splitlines() if not l.strip().startswith("--")]
+    return [s.strip() for s in "\n".join(lines).split(";") if s.strip()]
+
+def apply_migrations(engine) -> list[str]:
+    with engine.begin() as conn:
+        conn.execute(text("""
+          CREATE TABLE IF NOT EXISTS schema_migrations (
+            version VARCHAR(128) PRIMARY KEY,
+            applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+          )
+        """))
+        done = {r[0] for r in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+    applied = []
+    for path in sorted(MIGRATIONS_DIR.glob("*.sql")):
+        if path.stem in done: continue
+        with engine.begin() as conn:
+            for stmt in _statements(path.read_text(encoding="utf-8")):
+                conn.execute(text(stmt))
+            conn.execute(text("INSERT INTO schema_migrations (version) VALUES (:v)"), {"v": path.stem})
+        applied.append(path.stem)
+    return applied
+
+if __name__ == "__main__":
+    from ..deps import get_engine
+    for v in apply_migrations(get_engine()):
+        print(f"applied {v}")
@@ -0,0 +1,16 @@
+-- 사용자별 최신 포트폴리오 평가 스냅샷
+CREATE TABLE IF NOT EXISTS portfolio_snapshot (
+  user_id INT PRIMARY KEY,
+  user_name VARCHAR(64) NOT NULL,
+  priced_at TIMESTAMP NOT NULL,
+  years_left DOUBLE,
+  current_total DOUBLE,
+  forecast_total DOUBLE,
+  mix_rm_msg VARCHAR(255),
+  overall_cur JSON,
+  overall_mat JSON,
+  report_prompts JSON,
+  updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  KEY idx_snapshot_user_name (user_name, priced_at),
+  KEY idx_snapshot_priced_at (priced_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
@@ -0,0 +1,3 @@
+-- 로그인 이름 확인(users.name)과 users JOIN assets 적재(assets.user_id)용 인덱스
+CREATE INDEX idx_users_name ON users (name);
+CREATE INDEX idx_assets_user_id ON assets (user_id);
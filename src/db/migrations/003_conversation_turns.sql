@@ -0,0 +1,14 @@
+-- 대화 턴 + 감정 지표 (write-behind 일괄 기록, 감사/분석용)
+CREATE TABLE IF NOT EXISTS conversation_turns (
+  id BIGINT AUTO_INCREMENT PRIMARY KEY,
+  session_id VARCHAR(64) NOT NULL,
+  user_name VARCHAR(64) NULL,
+  turn_no INT,
+  role VARCHAR(16) NOT NULL,
+  content TEXT NOT NULL,
+  anxiety DOUBLE,
+  loss_aversion DOUBLE,
+  created_at DATETIME(3) NOT NULL,
+  KEY idx_turns_session (session_id, id),
+  KEY idx_turns_user_created (user_name, created_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
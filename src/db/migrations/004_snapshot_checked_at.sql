@@ -0,0 +1,4 @@
+-- priced_at(값이 바뀐 시각)과 별도로 마지막 시세 확인 시각을 저장 (스냅샷 신선도 판단용)
+ALTER TABLE portfolio_snapshot ADD COLUMN checked_at TIMESTAMP NULL AFTER priced_at;
+UPDATE portfolio_snapshot SET checked_at = priced_at WHERE checked_at IS NULL;
+CREATE INDEX idx_snapshot_user_checked ON portfolio_snapshot (user_name, checked_at);
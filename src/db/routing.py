@@ -0,0 +1,99 @@
+# src/db/routing.py
+"""
+읽기/쓰기 DB 라우팅.
+
+- 쓰기(beta upsert, 스냅샷 저장 등)는 항상 기본 DB(primary)로 보낸다.
+- 읽기는 복제본(replica)의 복제 지연이 max_lag_sec 이하일 때만 복제본으로 보낸다.
+  지연은 check_sec 마다 한 스레드만 확인하고, 확인 실패/복제 중단이면 기본 DB로 읽는다.
+- 복제본 읽기가 연결 오류로 실패하면 같은 읽기를 기본 DB로 다시 하고,
+  retry_sec 동안 복제본을 쓰지 않는다.
+
+서비스 함수는 engine 인자로 Engine 또는 DBRouter 를 모두 받는다:
+    read(engine, lambda e: pd.read_sql(q, e))     # 읽기
+    with writer(engine).begin() as conn: ...      # 쓰기
+"""
+import threading, time
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+
+def mysql_replica_lag(engine: Engine) -> float | None:
+    """복제 지연(초). 복제 중단/확인 불가면 None, 복제 설정이 없는 단독 서버면 0."""
+    with engine.connect() as conn:
+        for stmt in ("SHOW REPLICA STATUS", "SHOW SLAVE STATUS"):   # 8.0.22+ / 이전 버전
+            try:
+                row = conn.execute(text(stmt)).mappings().fetchone()
+            except DBAPIError:
+                continue
+            if row is None: return 0.0
+            lag = row.get("Seconds_Behind_Source", row.get("Seconds_Behind_Master"))
+            return None if lag is None else float(lag)
+    return None
+
+class DBRouter:
+    def __init__(self, primary: Engine, replica: Engine | None = None, max_lag_sec: float = 5.0,
+                 check_sec: float = 5.0, retry_sec: float = 30.0, lag_probe=mysql_replica_lag):
+        self.primary = primary
+        self.replica = replica
+        self.max_lag_sec = max_lag_sec
+        self.check_sec = check_sec
+        self.retry_sec = retry_sec
+        self._probe = lag_probe
+        self._lock = threading.Lock()
+        self._next_check = 0.0
+        self._replica_ok = False
+        self.lag_sec: float | None = None
+        self.replica_reads = self.primary_reads = self.fallbacks = 0
+
+    def _check(self):
+        try:
+            self.lag_sec = self._probe(self.replica)
+        except Exception:
+            self.lag_sec = None
+        self._replica_ok = self.lag_sec is not None and self.lag_sec <= self.max_lag_sec
+
+    def reader(self) -> Engine:
+        """지금 읽기에 쓸 엔진 (복제본이 없거나 늦으면 기본 DB)"""
+        if self.replica is None: return self.primary
+        if time.monotonic() >= self._next_check and self._lock.acquire(blocking=False):
+            try:
+                if time.monotonic() >= self._next_check:
+                    self._next_check = time.monotonic() + self.check_sec
+                    self._check()
+            finally:
+                self._lock.release()
+        return self.replica if self._replica_ok else self.primary
+
+    def writer(self) -> Engine:
+        return self.primary
+
+    def mark_down(self):
+        with self._lock:
+            self._replica_ok = False
+            self._next_check = time.monotonic() + self.retry_sec
+
+    def read(self, fn):
+        eng = self.reader()
+        if eng is self.primary:
+            self.primary_reads += 1
+            return fn(self.primary)
+        try:
+            out = fn(eng)
+        except (OperationalError, InterfaceError):   # 연결 문제만 우회 (SQL 오류는 그대로 올린다)
+            self.mark_down()
+            self.fallbacks += 1; self.primary_reads += 1
+            return fn(self.primary)
+        self.replica_reads += 1
+        return out
+
+    def stats(self) -> dict:
+        return {"replica": self.replica is not None, "replica_ok": self._replica_ok, "lag_sec": self.lag_sec,
+                "max_lag_sec": self.max_lag_sec, "replica_reads": self.replica_reads,
+                "primary_reads": self.primary_reads, "fallbacks": self.fallbacks}
+
+def read(db, fn):
+    """fn(engine) 을 읽기용 엔진으로 실행. db 가 Engine 이면 그대로."""
+    return db.read(fn) if isinstance(db, DBRouter) else fn(db)
+
+def writer(db) -> Engine:
+    return db.writer() if isinstance(db, DBRouter) else db
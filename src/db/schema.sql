@@ -3,4 +3,39 @@ CREATE TABLE IF NOT EXISTS capm_beta_cache (
   source VARCHAR(16) NOT NULL,
   beta DOUBLE,
   fetched_at TIMESTAMP NULL
-) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
\ No newline at end of file
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- 사용자별 최신 포트폴리오 평가 스냅샷 (백그라운드 작업이 일괄 갱신)
+CREATE TABLE IF NOT EXISTS portfolio_snapshot (
+  user_id INT PRIMARY KEY,
+  user_name VARCHAR(64) NOT NULL,
+  priced_at TIMESTAMP NOT NULL,
+  years_left DOUBLE,
+  current_total DOUBLE,
+  forecast_total DOUBLE,
+  mix_rm_msg VARCHAR(255),
+  overall_cur JSON,
+  overall_mat JSON,
+  report_prompts JSON,
+  updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  KEY idx_snapshot_user_name (user_name, priced_at),
+  KEY idx_snapshot_priced_at (priced_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- 대화 턴 + 감정 지표 (write-behind 일괄 기록, 감사/분석용)
+CREATE TABLE IF NOT EXISTS conversation_turns (
+  id BIGINT AUTO_INCREMENT PRIMARY KEY,
+  session_id VARCHAR(64) NOT NULL,
+  user_name VARCHAR(64) NULL,
+  turn_no INT,
+  role VARCHAR(16) NOT NULL,
+  content TEXT NOT NULL,
+  anxiety DOUBLE,
+  loss_aversion DOUBLE,
+  created_at DATETIME(3) NOT NULL,
+  KEY idx_turns_session (session_id, id),
+  KEY idx_turns_user_created (user_name, created_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- users / assets 조회 인덱스는 migrations/002_user_asset_indexes.sql 로 추가한다
+-- (두 테이블은 서비스 DB에 이미 존재하므로 여기서 만들지 않음)
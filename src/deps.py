@@ -1,19 +1,75 @@
 from sqlalchemy import create_engine
 from sqlalchemy.engine import Engine
 from .config import get_settings
+from .db.routing import DBRouter
 
 _settings = get_settings()
 
-def get_engine() -> Engine:
-    url = (
+_engine: Engine | None = None
+_db: DBRouter | None = None
+
+def _url(host: str, port: int) -> str:
+    return (
         f"mysql+pymysql://{_settings.DB_USER}:{_settings.DB_PASS}"
-        f"@{_settings.DB_HOST}:{_settings.DB_PORT}/{_settings.DB_NAME}"
+        f"@{host}:{port}/{_settings.DB_NAME}"
     )
-    engine = create_engine(url, pool_pre_ping=True)
-    return engine
+
+def get_engine() -> Engine:
+    # 프로세스당 엔진(커넥션 풀) 하나를 재사용 — 매 요청 새 연결을 맺지 않도록
+    global _engine
+    if _engine is None:
+        _engine = create_engine(_url(_settings.DB_HOST, _settings.DB_PORT), pool_pre_ping=True)
+    return _engine
+
+def get_db() -> DBRouter:
+    # 읽기는 복제본(지연 허용 범위 안일 때), 쓰기는 get_engine() 으로 보내는 라우터
+    global _db
+    if _db is None:
+        replica = None
+        if _settings.REPLICA_DB_HOST:
+            port = _settings.REPLICA_DB_PORT or _settings.DB_PORT
+            replica = create_engine(_url(_settings.REPLICA_DB_HOST, port), pool_pre_ping=True)
+        _db = DBRouter(get_engine(), replica, max_lag_sec=_settings.REPLICA_MAX_LAG_SEC,
+                       check_sec=_settings.REPLICA_CHECK_SEC, retry_sec=_settings.REPLICA_RETRY_SEC)
+    return _db
 
 RF = _settings.RF
 RM_DOMESTIC = _settings.RM_DOMESTIC
 RM_GLOBAL = _settings.RM_GLOBAL
 BETA_TTL_DAYS = _settings.BETA_TTL_DAYS
+BETA_SOURCE = _settings.BETA_SOURCE
+BETA_WINDOW_WEEKS = _settings.BETA_WINDOW_WEEKS
+BETA_MIN_WEEKS = _settings.BETA_MIN_WEEKS
+PRICE_STORE_PATH = _settings.PRICE_STORE_PATH
+MARKET_CACHE_PATH = _settings.MARKET_CACHE_PATH
+MARKET_CACHE_SLOTS = _settings.MARKET_CACHE_SLOTS
+MARKET_CACHE_MAX_AGE_SEC = _settings.MARKET_CACHE_MAX_AGE_SEC
+PORTFOLIO_MODEL_TTL_SEC = _settings.PORTFOLIO_MODEL_TTL_SEC
+PORTFOLIO_MODEL_MAX = _settings.PORTFOLIO_MODEL_MAX
+PRICE_FEED_INTERVAL_SEC = _settings.PRICE_FEED_INTERVAL_SEC
+SNAPSHOT_REFRESH_SEC = _settings.SNAPSHOT_REFRESH_SEC
+SUMMARY_CACHE_MAX_AGE_SEC = _settings.SUMMARY_CACHE_MAX_AGE_SEC
+SESSION_MAX = _settings.SESSION_MAX
+SESSION_IDLE_SEC = _settings.SESSION_IDLE_SEC
+HISTORY_MAX_TURNS = _settings.HISTORY_MAX_TURNS
+HISTORY_TURN_CHARS = _settings.HISTORY_TURN_CHARS
+HISTORY_SUMMARY_CHARS = _settings.HISTORY_SUMMARY_CHARS
+EMPATHY_DEADLINE_SEC = _settings.EMPATHY_DEADLINE_SEC
+EMPATHY_CACHE_SIZE = _settings.EMPATHY_CACHE_SIZE
+EMPATHY_CACHE_TTL_SEC = _settings.EMPATHY_CACHE_TTL_SEC
+TURN_LOG_ENABLED = _settings.TURN_LOG_ENABLED
+TURN_LOG_BATCH = _settings.TURN_LOG_BATCH
+TURN_LOG_FLUSH_SEC = _settings.TURN_LOG_FLUSH_SEC
+TURN_LOG_MAX_BUFFER = _settings.TURN_LOG_MAX_BUFFER
+PREFETCH_MAX_WORKERS = _settings.PREFETCH_MAX_WORKERS
+PREFETCH_MAX_PENDING = _settings.PREFETCH_MAX_PENDING
+PREFETCH_REPORTS = _settings.PREFETCH_REPORTS
+PREFETCH_TTL_SEC = _settings.PREFETCH_TTL_SEC
+PROFILE_ENABLED = _settings.PROFILE_ENABLED
+PROFILE_SAMPLE_RATE = _settings.PROFILE_SAMPLE_RATE
+PROFILE_SLOW_MS = _settings.PROFILE_SLOW_MS
+PROFILE_INTERVAL_MS = _settings.PROFILE_INTERVAL_MS
+PROFILE_KEEP = _settings.PROFILE_KEEP
+ADMIN_TOKEN = _settings.ADMIN_TOKEN
+GZIP_MIN_SIZE = _settings.GZIP_MIN_SIZE
 SETTINGS = _settings
\ No newline at end of file
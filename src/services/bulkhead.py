@@ -0,0 +1,77 @@
+# src/services/bulkhead.py
+"""
+upstream 호출별 격벽(bulkhead).
+동시 실행 수를 세마포어로 제한하고, 대기열이 꽉 찼거나 대기 시간이 기한을 넘으면
+BulkheadFull을 던져 호출자가 즉시 기존 대체 문구로 응답하도록 한다.
+"""
+import threading, time
+from collections import deque
+from contextlib import contextmanager
+from ..deps import SETTINGS
+
+class BulkheadFull(Exception):
+    pass
+
+class Bulkhead:
+    def __init__(self, name: str, max_concurrent: int, max_queue: int, max_wait: float):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self._sem = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self._waits = deque(maxlen=512)   # 최근 대기 시간(초)
+
+    @contextmanager
+    def slot(self):
+        with self._lock:
+            if self.waiting >= self.max_queue:
+                self.rejected += 1
+                raise BulkheadFull(f"{self.name}: queue full ({self.waiting})")
+            self.waiting += 1
+        t0 = time.perf_counter()
+        ok = self._sem.acquire(timeout=self.max_wait)
+        waited = time.perf_counter() - t0
+        with self._lock:
+            self.waiting -= 1
+            self._waits.append(waited)
+            if not ok:
+                self.rejected += 1
+            else:
+                self.admitted += 1
+                self.in_flight += 1
+        if not ok:
+            raise BulkheadFull(f"{self.name}: waited {waited:.2f}s")
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+            self._sem.release()
+
+    def metrics(self) -> dict:
+        with self._lock:
+            waits = sorted(self._waits)
+            def pct(p):
+                return round(waits[min(len(waits)-1, int(p*len(waits)))]*1000, 2) if waits else 0.0
+            return {
+                "max_concurrent": self.max_concurrent,
+                "in_flight": self.in_flight,
+                "queue_depth": self.waiting,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "wait_ms_p50": pct(0.50),
+                "wait_ms_p95": pct(0.95),
+                "wait_ms_max": round(waits[-1]*1000, 2) if waits else 0.0,
+            }
+
+llm_bulkhead = Bulkhead("llm", SETTINGS.LLM_MAX_CONCURRENCY, SETTINGS.LLM_MAX_QUEUE, SETTINGS.LLM_MAX_WAIT_SEC)
+quote_bulkhead = Bulkhead("quote", SETTINGS.QUOTE_MAX_CONCURRENCY, SETTINGS.QUOTE_MAX_QUEUE, SETTINGS.QUOTE_MAX_WAIT_SEC)
+db_bulkhead = Bulkhead("db", SETTINGS.DB_MAX_CONCURRENCY, SETTINGS.DB_MAX_QUEUE, SETTINGS.DB_MAX_WAIT_SEC)
+
+def all_metrics() -> dict:
+    return {b.name: b.metrics() for b in (llm_bulkhead, quote_bulkhead, db_bulkhead)}
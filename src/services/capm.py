@@ -1,56 +1,170 @@
-import re, requests, numpy as np, pandas as pd, datetime as dt
-from sqlalchemy import text
+import re, time, requests, numpy as np, pandas as pd, datetime as dt
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import text, bindparam
 import yfinance as yf
-from ..deps import RF, RM_DOMESTIC, RM_GLOBAL, BETA_TTL_DAYS
+from ..deps import RF, RM_DOMESTIC, RM_GLOBAL, BETA_TTL_DAYS, BETA_SOURCE, BETA_WINDOW_WEEKS, BETA_MIN_WEEKS, MARKET_CACHE_MAX_AGE_SEC, SETTINGS
+from .bulkhead import quote_bulkhead, db_bulkhead
+from ..db.routing import read, writer
+from .providers import Source, TieredProvider
+from .price_history import BENCHMARKS, get_store
+from .market_cache import shared_cache
+from .profiler import carry
 
 def rm_for_region(region:str)->float:
     return RM_GLOBAL if str(region).lower()=="global" else RM_DOMESTIC
 
-def capm_expected_return(beta: float, rf: float, rm: float) -> float:
-    return float(rf) + float(beta)*(float(rm)-float(rf))
+def capm_expected_return(beta, rf, rm):
+    """E[r] = rf + beta·(rm − rf). beta/rm 에 배열을 주면 배열로, 모두 스칼라면 float 로 반환."""
+    rf = np.asarray(rf, dtype=float)
+    out = rf + np.asarray(beta, dtype=float)*(np.asarray(rm, dtype=float)-rf)
+    return float(out) if out.ndim == 0 else out
 
-def fetch_beta_from_yahoo(ticker: str):
-    try:
-        t = yf.Ticker(ticker); info = t.info
-        for k in ("beta","beta3Year","beta_3y"):
-            if info.get(k) is not None: return float(info[k])
-    except Exception: pass
-    try:
-        url=f"https://finance.yahoo.com/quote/{ticker}/key-statistics?p={ticker}"
-        html=requests.get(url,timeout=8).text
-        m=re.search(r'Beta \(5Y Monthly\).*?>([-+]?\d*\.\d+|\d+)<', html)
-        if m: return float(m.group(1))
-    except Exception: pass
+# --- 베타 공급원: .info → 통계 페이지 스크래핑 ---
+def _beta_from_info(ticker: str):
+    with quote_bulkhead.slot():
+        info = yf.Ticker(ticker).info
+    for k in ("beta","beta3Year","beta_3y"):
+        if info.get(k) is not None: return float(info[k])
     return None
 
-def get_beta(engine, ticker: str, force_refresh=False, ttl_days=BETA_TTL_DAYS):
-    with engine.begin() as conn:
-        if not force_refresh:
-            row=conn.execute(text("""
-              SELECT beta, fetched_at FROM capm_beta_cache
-              WHERE ticker=:t AND source='yahoo'
-            """), {"t": ticker}).fetchone()
-            if row:
-                beta, fetched_at = float(row[0]), row[1]
-                if fetched_at and (dt.datetime.utcnow()-fetched_at.replace(tzinfo=None) <= dt.timedelta(days=ttl_days)):
-                    return beta
-        beta=fetch_beta_from_yahoo(ticker)
-        if beta is not None:
+def _beta_from_scrape(ticker: str):
+    url=f"https://finance.yahoo.com/quote/{ticker}/key-statistics?p={ticker}"
+    with quote_bulkhead.slot():
+        html=requests.get(url,timeout=SETTINGS.BETA_SCRAPE_BUDGET_SEC).text
+    m=re.search(r'Beta \(5Y Monthly\).*?>([-+]?\d*\.\d+|\d+)<', html)
+    return float(m.group(1)) if m else None
+
+beta_provider = TieredProvider("beta", [
+    Source("info", _beta_from_info, SETTINGS.BETA_INFO_BUDGET_SEC),
+    Source("scrape", _beta_from_scrape, SETTINGS.BETA_SCRAPE_BUDGET_SEC),
+], negative_ttl=SETTINGS.NEGATIVE_CACHE_TTL_SEC, max_workers=SETTINGS.QUOTE_MAX_CONCURRENCY)
+
+def fetch_beta_from_yahoo(ticker: str):
+    return beta_provider.get(ticker) if ticker else None
+
+def rolling_betas(prices: pd.DataFrame, benchmark: pd.Series, window: int = BETA_WINDOW_WEEKS, min_obs: int = BETA_MIN_WEEKS) -> pd.DataFrame:
+    """
+    주간 수익률 기준 전 종목 rolling beta = Cov(r_i, r_m) / Var(r_m).
+    종목별 루프 없이 누적합(rolling sum) 행렬 연산 한 번으로 계산한다.
+    prices: index=날짜, columns=ticker / benchmark: 지수 종가
+    """
+    rx = prices.resample("W-FRI").last().pct_change(fill_method=None)
+    ry = benchmark.resample("W-FRI").last().pct_change(fill_method=None).reindex(rx.index)
+    valid = rx.notna() & ry.notna().to_numpy()[:, None]
+    x = rx.where(valid, 0.0)
+    y = pd.DataFrame(np.where(valid, ry.to_numpy()[:, None], 0.0), index=rx.index, columns=rx.columns)
+    roll = lambda f: f.rolling(window, min_periods=1).sum()
+    n, sx, sy, sxy, syy = roll(valid.astype(float)), roll(x), roll(y), roll(x*y), roll(y*y)
+    cov = sxy - sx*sy/n
+    var = syy - sy*sy/n
+    return (cov / var.where(var > 0)).where(n >= min_obs)
+
+def estimate_betas(tickers_by_region: dict, store=None) -> dict:
+    """로컬 가격 저장소만으로 지역별 벤치마크(KOSPI/S&P500) 대비 최신 beta 추정"""
+    store = store or get_store()
+    out = {}
+    for region, tickers in tickers_by_region.items():
+        tickers = list(tickers)
+        if not tickers: continue
+        bench = BENCHMARKS["global" if str(region).lower()=="global" else "domestic"]
+        px = store.load(tickers + [bench])
+        if px.empty or px[bench].dropna().empty: continue
+        betas = rolling_betas(px[tickers], px[bench])
+        if betas.empty: continue
+        out.update({t: float(b) for t, b in betas.iloc[-1].items() if pd.notna(b)})
+    return out
+
+_BETA_CACHE_SELECT = text("""
+  SELECT ticker, beta, fetched_at FROM capm_beta_cache WHERE ticker IN :ts
+""").bindparams(bindparam("ts", expanding=True))
+
+def get_betas(engine, tickers_by_region: dict, force_refresh=False, ttl_days=BETA_TTL_DAYS, use_shared=True) -> dict:
+    """
+    region→[ticker] 를 받아 ticker→beta 반환.
+    유효한 캐시(공유 시세 캐시 → DB)는 그대로 쓰고, 나머지는 한 번에 추정(BETA_SOURCE=local)
+    또는 Yahoo 조회 후 DB 캐시에 일괄 저장. 로컬 추정이 안 되는 종목은 Yahoo 로 보충한다.
+    """
+    tickers = sorted({t for ts in tickers_by_region.values() for t in ts})
+    if not tickers: return {}
+    out = {}
+    cache = shared_cache() if use_shared and not force_refresh else None
+    if cache is not None:
+        for t in tickers:
+            rec = cache.get(t)
+            if rec is not None and np.isfinite(rec[1]) and time.time()-rec[3] <= ttl_days*86400:
+                out[t] = rec[1]
+        tickers = [t for t in tickers if t not in out]
+    if not force_refresh and tickers:
+        def q(e):
+            with e.connect() as conn:
+                return conn.execute(_BETA_CACHE_SELECT, {"ts": tickers}).fetchall()
+        with db_bulkhead.slot():
+            rows = read(engine, q)
+        now = dt.datetime.utcnow()
+        for t, beta, fetched_at in rows:
+            if beta is not None and fetched_at and (now-pd.to_datetime(fetched_at).to_pydatetime().replace(tzinfo=None) <= dt.timedelta(days=ttl_days)):
+                out[t] = float(beta)
+
+    missing = {r: [t for t in ts if t not in out] for r, ts in tickers_by_region.items()}
+    fresh, source = {}, {}
+    if BETA_SOURCE == "local":
+        fresh = estimate_betas(missing)
+        source = dict.fromkeys(fresh, "local")
+    # 로컬 저장소가 비었거나(동기화 전 배포) 이력이 짧은 종목은 Yahoo 로 보충
+    for t in sorted({t for ts in missing.values() for t in ts} - set(fresh)):
+        if (b := fetch_beta_from_yahoo(t)) is not None:
+            fresh[t] = b; source[t] = "yahoo"
+    if fresh:
+        with db_bulkhead.slot(), writer(engine).begin() as conn:
             conn.execute(text("""
               INSERT INTO capm_beta_cache (ticker, source, beta, fetched_at)
-              VALUES (:t,'yahoo',:b,UTC_TIMESTAMP())
-              ON DUPLICATE KEY UPDATE beta=:b, fetched_at=UTC_TIMESTAMP()
-            """), {"t": ticker, "b": beta})
-        return beta
+              VALUES (:t,:s,:b,UTC_TIMESTAMP())
+              ON DUPLICATE KEY UPDATE source=VALUES(source), beta=VALUES(beta), fetched_at=UTC_TIMESTAMP()
+            """), [{"t": t, "s": source[t], "b": b} for t, b in fresh.items()])
+        out.update(fresh)
+    return out
+
+def get_beta(engine, ticker: str, region: str = "domestic", force_refresh=False, ttl_days=BETA_TTL_DAYS):
+    return get_betas(engine, {region: [ticker]}, force_refresh=force_refresh, ttl_days=ttl_days).get(ticker)
 
 def get_live_price_yf(ticker:str):
     if not ticker: return None
-    try:
-        t=yf.Ticker(ticker); finfo=getattr(t,'fast_info',{}) or {}
+    # 공유 시세 캐시(갱신 프로세스가 기록)가 충분히 새로우면 upstream 호출 없이 사용
+    cache = shared_cache()
+    if cache is not None:
+        rec = cache.get(ticker)
+        if rec is not None and np.isfinite(rec[0]) and time.time()-rec[2] <= MARKET_CACHE_MAX_AGE_SEC:
+            return rec[0]
+    return fetch_live_price_yf(ticker)
+
+# --- 시세 공급원: fast_info → 최근 5일 종가 ---
+def _price_from_fast_info(ticker: str):
+    with quote_bulkhead.slot():
+        finfo=getattr(yf.Ticker(ticker),'fast_info',{}) or {}
         for k in ('last_price','lastPrice','regularMarketPrice','previousClose'):
             v=finfo.get(k)
             if v is not None and np.isfinite(v): return float(v)
-        hist=t.history(period='5d')
-        if len(hist)>0: return float(hist['Close'].dropna()[-1])
-    except Exception: pass
-    return None
\ No newline at end of file
+    return None
+
+def _price_from_history(ticker: str):
+    with quote_bulkhead.slot():
+        hist=yf.Ticker(ticker).history(period='5d')
+    if len(hist)>0: return float(hist['Close'].dropna().iloc[-1])
+    return None
+
+price_provider = TieredProvider("price", [
+    Source("fast_info", _price_from_fast_info, SETTINGS.QUOTE_FAST_BUDGET_SEC),
+    Source("history", _price_from_history, SETTINGS.QUOTE_HISTORY_BUDGET_SEC),
+], negative_ttl=SETTINGS.NEGATIVE_CACHE_TTL_SEC, max_workers=SETTINGS.QUOTE_MAX_CONCURRENCY)
+
+def fetch_live_price_yf(ticker:str):
+    return price_provider.get(ticker) if ticker else None
+
+_fanout = ThreadPoolExecutor(max_workers=SETTINGS.QUOTE_MAX_CONCURRENCY, thread_name_prefix="quote-fanout")
+
+def get_live_prices(tickers) -> dict:
+    """여러 종목 시세를 동시에 조회 — 느린 종목 하나가 나머지를 기다리게 하지 않는다"""
+    tickers = [t for t in dict.fromkeys(tickers) if t]
+    if len(tickers) <= 1:
+        return {t: get_live_price_yf(t) for t in tickers}
+    return dict(zip(tickers, _fanout.map(carry(get_live_price_yf), tickers)))
@@ -1,9 +1,23 @@
-import time
+import re, time
+import numpy as np, pandas as pd
 
 EMA_ALPHA = 0.3
 ANXIETY_THRESHOLD = 0.70
 LOSS_AVERSION_THRESHOLD = 0.60
 
+# 감정 키워드 (뒤에 있는 감정이 우선: 기대 > 혼란 > 후회 > 불안)
+EMOTION_KEYWORDS = {
+    "불안": ["불안","초조","잠이","무섭","떨리"],
+    "후회": ["후회","망했","큰일"],
+    "혼란": ["혼란","헷갈","모르겠"],
+    "기대": ["기대","설레","희망"],
+}
+SIGNAL_KEYWORDS = {
+    "충동결정": ["해지","손절","전액","몰빵"],
+    "추가매수고민": ["추가 매수","물타기"],
+}
+ANXIOUS_EMOTIONS = ("불안","후회","혼란")
+
 class EmoMeter:
     def __init__(self):
         self.anxiety = 0.0
@@ -16,17 +30,13 @@ class EmoMeter:
 
     def detect(self, text: str):
         emotion = "중립"
-        if any(k in text for k in ["불안","초조","잠이","무섭","떨리"]): emotion="불안"
-        if any(k in text for k in ["후회","망했","큰일"]): emotion="후회"
-        if any(k in text for k in ["혼란","헷갈","모르겠"]): emotion="혼란"
-        if any(k in text for k in ["기대","설레","희망"]): emotion="기대"
-        signals=[]
-        if any(k in text for k in ["해지","손절","전액","몰빵"]): signals.append("충동결정")
-        if "추가 매수" in text or "물타기" in text: signals.append("추가매수고민")
+        for label, words in EMOTION_KEYWORDS.items():
+            if any(k in text for k in words): emotion=label
+        signals=[label for label, words in SIGNAL_KEYWORDS.items() if any(k in text for k in words)]
         return {"emotion": emotion, "signals": signals}
 
     def _raw(self, tags):
-        anxiety_raw = 1.0 if tags["emotion"] in ["불안","후회","혼란"] else 0.2
+        anxiety_raw = 1.0 if tags["emotion"] in ANXIOUS_EMOTIONS else 0.2
         loss_raw = 1.0 if "충동결정" in tags["signals"] else 0.0
         return anxiety_raw, loss_raw
 
@@ -56,5 +66,85 @@ class EmoMeter:
         if self.COOLDOWN_SECONDS>0:
             self.cooldown_seconds_until=time.time()+self.COOLDOWN_SECONDS
 
+# ---- 배치 채점 (대화 아카이브 분석용) ----
+_LABELS = list(EMOTION_KEYWORDS) + list(SIGNAL_KEYWORDS)
+
+def _keyword_bits() -> dict[str, int]:
+    bits: dict[str, int] = {}
+    keywords = {**EMOTION_KEYWORDS, **SIGNAL_KEYWORDS}
+    for i, label in enumerate(_LABELS):
+        for w in keywords[label]:
+            bits[w] = bits.get(w, 0) | (1 << i)
+    # 같은 위치에서 긴 키워드가 매칭되면 그 안의 짧은 키워드는 따로 잡히지 않으므로 비트를 합쳐 둔다
+    merged = {}
+    for w in bits:
+        merged[w] = 0
+        for v, b in bits.items():
+            if v in w: merged[w] |= b
+    return merged
+
+_KEYWORD_BITS = _keyword_bits()
+# 전방탐색으로 모든 시작 위치의 키워드를 겹침 없이 한 번에 찾는다 (컴파일 1회)
+_KEYWORD_RE = re.compile("(?=(" + "|".join(sorted(map(re.escape, _KEYWORD_BITS), key=len, reverse=True)) + "))")
+
+def _mask(text: str) -> int:
+    out = 0
+    for w in _KEYWORD_RE.findall(text): out |= _KEYWORD_BITS[w]
+    return out
+
+def detect_batch(texts) -> pd.DataFrame:
+    """EmoMeter.detect 의 배치판: emotion, 신호별 bool 컬럼 (입력 순서 유지). 같은 문장은 한 번만 검사."""
+    s = pd.Series(texts, dtype=object).fillna("").astype(str)
+    seen: dict[str, int] = {}
+    def mask(t):
+        m = seen.get(t)
+        if m is None: m = seen[t] = _mask(t)
+        return m
+    masks = np.fromiter(map(mask, s), dtype=np.int64, count=len(s))
+    hit = {label: (masks >> i) & 1 == 1 for i, label in enumerate(_LABELS)}
+    labels = list(EMOTION_KEYWORDS)
+    # detect()와 같은 우선순위: 나중 감정이 앞 감정을 덮어쓴다
+    emotion = np.select([hit[l] for l in reversed(labels)], list(reversed(labels)), default="중립")
+    out = pd.DataFrame({"emotion": emotion})
+    for label in SIGNAL_KEYWORDS:
+        out[label] = hit[label]
+    return out
+
+def score_batch(session_ids, texts) -> pd.DataFrame:
+    """
+    세션별로 묶인 메시지 배열의 감정 궤적.
+    같은 세션의 메시지는 입력 순서대로 EmoMeter.update 를 호출한 것과 비트 단위로 같은
+    anxiety / loss_aversion 을 돌려준다 (새 세션 초기값 0).
+    EMA 는 '세션 내 위치' 단위로 모든 세션을 한 번에 갱신하므로 반복 횟수 = 최장 세션 길이.
+    session_id 가 None/NaN 인 메시지는 모두 같은 세션으로 본다.
+    """
+    tags = detect_batch(texts)
+    n = len(tags)
+    a_raw = np.where(np.isin(tags["emotion"].to_numpy(), ANXIOUS_EMOTIONS), 1.0, 0.2)
+    l_raw = np.where(tags["충동결정"].to_numpy(), 1.0, 0.0)
+
+    # session_id 가 비어 있는(None/NaN) 메시지는 하나의 세션으로 묶는다 (-1 코드 방지)
+    codes, _ = pd.factorize(pd.Series(session_ids, dtype=object).reset_index(drop=True), use_na_sentinel=False)
+    counts = np.bincount(codes) if n else np.zeros(0, dtype=int)
+    order = np.argsort(codes, kind="stable")                         # 세션별로 모으되 세션 안 순서 유지
+    pos = np.empty(n, dtype=np.int64)
+    pos[order] = np.arange(n) - np.repeat(np.cumsum(counts) - counts, counts)
+    by_pos = np.argsort(pos, kind="stable")                          # 위치 t 의 메시지들이 연속
+    bounds = np.r_[0, np.cumsum(np.bincount(pos))] if n else np.zeros(1, dtype=int)
+
+    anxiety = np.empty(n); loss = np.empty(n)
+    state_a = np.zeros(len(counts)); state_l = np.zeros(len(counts))
+    for t in range(len(bounds) - 1):
+        rows = by_pos[bounds[t]:bounds[t+1]]
+        sess = codes[rows]
+        state_a[sess] = EMA_ALPHA*a_raw[rows] + (1-EMA_ALPHA)*state_a[sess]
+        state_l[sess] = EMA_ALPHA*l_raw[rows] + (1-EMA_ALPHA)*state_l[sess]
+        anxiety[rows] = state_a[sess]; loss[rows] = state_l[sess]
+
+    tags.insert(0, "session_id", pd.Series(session_ids).to_numpy())
+    tags["anxiety_raw"] = a_raw; tags["loss_raw"] = l_raw
+    tags["anxiety"] = anxiety; tags["loss_aversion"] = loss
+    return tags
+
 def intervention_text() -> str:
     return "혹시 1분만 호흡을 같이 해볼까요? 끝나면 ‘결정 보류’나 ‘리프레이밍’, ‘ISA 체크리스트’ 중 하나로 오늘 마음을 정리해도 좋아요."
\ No newline at end of file
@@ -0,0 +1,122 @@
+# src/services/empathy.py
+"""
+일반 공감 턴 응답.
+
+- 지식/지침 블록은 모듈 로드 때 한 번만 만들어 고정 system 메시지로 보낸다.
+  (HyperCLOVA chat-completions 는 세션 상태가 없어 '세션당 한 번 전송'은 불가 → 매 턴 같은 접두부를 보내고,
+   사용자 발화만 user 메시지로 붙인다.)
+- 턴마다 EMPATHY_DEADLINE_SEC 안에 LLM 답이 없으면 EmoMeter.detect 감정/신호로
+  로컬 템플릿(공감 1문장 + 질문 1문장)을 돌려준다.
+- 마감 뒤에 늦게 도착한 LLM 답만 정규화한 입력을 키로 캐시해 EMPATHY_CACHE_TTL_SEC 동안 같은 입력에 재사용한다.
+  (제때 온 답은 캐시하지 않는다 — 같은 말에 매번 같은 답이 나가지 않도록)
+"""
+import re, threading, time, zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from ..prompts import FEW_SHOT_PROMPT_TEMPLATE, FINANCIAL_KNOWLEDGE
+from ..deps import EMPATHY_DEADLINE_SEC, EMPATHY_CACHE_SIZE, EMPATHY_CACHE_TTL_SEC, SETTINGS
+from . import hyperclova_client
+from .emo_metrics import EmoMeter
+from .profiler import carry
+
+_USER_SLOT = "유저: {user_input}"
+SYSTEM_ROLE = "당신은 투자자들의 감정과 금융 상황을 함께 이해하고 공감해주는 금융 심리 상담사입니다."
+# 고정 접두부: 역할 + 금융 지식 + 응답 지침 (요청마다 format 하지 않음)
+SYSTEM_PROMPT = SYSTEM_ROLE + "\n" + FEW_SHOT_PROMPT_TEMPLATE.split(_USER_SLOT)[0].format(
+    financial_knowledge=FINANCIAL_KNOWLEDGE).strip()
+
+def build_messages(user_text: str) -> list[dict]:
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": _USER_SLOT.format(user_input=user_text)},
+    ]
+
+# ---- 로컬 응답 템플릿 ----
+EMPATHY_LINES = {
+    "불안": ["시장이 흔들릴 때 마음이 불안해지는 건 정말 자연스러운 일이에요.",
+             "요즘 같은 변동성 속에서 초조한 마음이 드시는 게 충분히 이해돼요."],
+    "후회": ["지난 결정이 자꾸 떠오르면 마음이 무거우실 것 같아요.",
+             "돌아보면 아쉬운 선택이 있을 때 후회가 드는 건 누구나 그래요."],
+    "혼란": ["정보가 많을수록 무엇이 맞는지 헷갈리실 수 있어요.",
+             "여러 선택지 사이에서 방향을 잡기 어려우신 마음이 느껴져요."],
+    "기대": ["앞으로에 대한 기대가 느껴져서 저도 반가워요.",
+             "설레는 마음으로 계획을 세우고 계신 것 같아요."],
+    "중립": ["말씀해 주셔서 고마워요.",
+             "지금 상황을 차분히 정리하고 계신 것 같아요."],
+}
+SIGNAL_QUESTIONS = {
+    "충동결정": ["혹시 해지나 매도를 생각하시게 된 가장 큰 이유가 무엇인지 여쭤봐도 될까요?",
+                 "괜찮으시다면 결정을 조금 미뤘을 때 가장 걱정되는 점이 무엇인지 알려주실 수 있을까요?"],
+    "추가매수고민": ["혹시 추가 매수를 고민하실 때 어떤 기준으로 판단하고 계신가요?",
+                     "괜찮으시다면 지금 비중을 늘리려는 이유를 조금 더 들려주실 수 있을까요?"],
+}
+EMOTION_QUESTIONS = {
+    "불안": ["혹시 가장 마음이 쓰이는 부분이 손실 규모인지, 앞으로의 불확실성인지 여쭤봐도 될까요?"],
+    "후회": ["괜찮으시다면 그때 어떤 점을 가장 중요하게 보고 결정하셨는지 들려주실 수 있을까요?"],
+    "혼란": ["도움이 될 수 있도록, 지금 가장 먼저 정리하고 싶은 고민이 무엇인지 알려주실 수 있을까요?"],
+    "기대": ["혹시 이번 투자에서 가장 기대하시는 목표가 있으신가요?"],
+    "중립": ["혹시 요즘 투자와 관련해 마음에 걸리는 부분이 있으신가요?"],
+}
+
+_detector = EmoMeter()   # detect()만 사용
+
+def local_reply(user_text: str) -> str:
+    """감정/신호 기반 템플릿 응답 (같은 입력이면 같은 문장)"""
+    tags = _detector.detect(user_text)
+    h = zlib.crc32(user_text.encode())
+    empathy = EMPATHY_LINES[tags["emotion"]]
+    questions = SIGNAL_QUESTIONS[tags["signals"][0]] if tags["signals"] else EMOTION_QUESTIONS[tags["emotion"]]
+    return f"{empathy[h % len(empathy)]} {questions[(h // 7) % len(questions)]}"
+
+# ---- 늦은 LLM 답 캐시 ----
+_cache: OrderedDict[str, tuple[str, float]] = OrderedDict()   # key → (답, 저장 시각)
+_lock = threading.Lock()
+_pool = ThreadPoolExecutor(max_workers=SETTINGS.LLM_MAX_CONCURRENCY + SETTINGS.LLM_MAX_QUEUE,
+                           thread_name_prefix="empathy")
+stats = {"llm": 0, "local": 0, "cache": 0, "late_cached": 0}
+
+def _key(user_text: str) -> str:
+    return re.sub(r"[\W_]+", "", user_text).lower()
+
+def _cache_get(key: str) -> str | None:
+    with _lock:
+        hit = _cache.get(key)
+        if hit is None: return None
+        if time.time() - hit[1] > EMPATHY_CACHE_TTL_SEC:
+            del _cache[key]
+            return None
+        _cache.move_to_end(key)
+        return hit[0]
+
+def _cache_put(key: str, value: str):
+    with _lock:
+        _cache[key] = (value, time.time())
+        _cache.move_to_end(key)
+        while len(_cache) > EMPATHY_CACHE_SIZE:
+            _cache.popitem(last=False)
+        stats["late_cached"] += 1
+
+def reply(user_text: str, deadline: float = EMPATHY_DEADLINE_SEC) -> tuple[str, str]:
+    """(응답, 출처: cache | llm | local)"""
+    key = _key(user_text)
+    cached = _cache_get(key) if key else None
+    if cached:
+        stats["cache"] += 1
+        return cached, "cache"
+
+    fut = _pool.submit(carry(hyperclova_client.chat), build_messages(user_text), task="empathy")
+    def _late(f):
+        if f.cancelled() or f.exception() is not None or not key: return
+        out = f.result()
+        if out: _cache_put(key, out)
+    try:
+        out = fut.result(timeout=deadline)
+    except FutureTimeout:
+        if not fut.cancel():                 # 이미 호출 중이면 끝까지 받아 캐시에 넣는다
+            fut.add_done_callback(_late)
+        out = None
+    if out:
+        stats["llm"] += 1
+        return out, "llm"
+    stats["local"] += 1
+    return local_reply(user_text), "local"
@@ -0,0 +1,91 @@
+# src/services/history.py
+"""
+세션 대화 기록.
+최근 max_turns 개 발화만 원문으로 보관하고, 밀려난 발화는 감정/신호 집계와 짧은 발췌로
+요약에 누적한다. 요약은 밀려날 때마다 증분 갱신되므로 세션이 길어져도
+메모리와 프롬프트 길이가 일정하게 유지된다.
+"""
+from collections import Counter, deque
+from .emo_metrics import EmoMeter
+from ..deps import HISTORY_MAX_TURNS, HISTORY_TURN_CHARS, HISTORY_SUMMARY_CHARS
+
+_detector = EmoMeter()   # detect()만 사용 (상태 없음)
+_HIGHLIGHT_CHARS = 40
+_HIGHLIGHTS = 5
+
+class ConversationHistory:
+    def __init__(self, max_turns: int = HISTORY_MAX_TURNS, turn_chars: int = HISTORY_TURN_CHARS,
+                 summary_chars: int = HISTORY_SUMMARY_CHARS, on_append=None):
+        self.turns: deque[dict] = deque(maxlen=max_turns)
+        self.on_append = on_append      # 턴이 추가될 때마다 호출 (영속화 등), 잘리기 전 원문 전달
+        self.turn_chars = turn_chars
+        self.summary_chars = summary_chars
+        self._reset_summary()
+
+    def _reset_summary(self):
+        self.folded = 0
+        self.emotions = Counter()
+        self.signals = Counter()
+        self.highlights: deque[str] = deque(maxlen=_HIGHLIGHTS)
+
+    # --- list 호환 API (기존 conversation_log 사용처 그대로 동작) ---
+    def append(self, turn: dict):
+        if self.on_append is not None:
+            self.on_append(turn)
+        turn = {"role": turn.get("role"), "content": str(turn.get("content", ""))[:self.turn_chars]}
+        if len(self.turns) == self.turns.maxlen:
+            self._fold(self.turns[0])
+        self.turns.append(turn)
+
+    def extend(self, turns):
+        for t in turns:
+            self.append(t)
+
+    def clear(self):
+        self.turns.clear()
+        self._reset_summary()
+
+    def __len__(self):
+        return len(self.turns)
+
+    def __iter__(self):
+        return iter(self.turns)
+
+    def __getitem__(self, idx):
+        return list(self.turns)[idx]
+
+    # --- 요약 ---
+    def _fold(self, turn: dict):
+        """밀려나는 한 턴을 요약에 반영 (O(1))"""
+        self.folded += 1
+        if turn.get("role") != "user":
+            return
+        text = turn.get("content", "")
+        tags = _detector.detect(text)
+        self.emotions[tags["emotion"]] += 1
+        self.signals.update(tags["signals"])
+        if tags["emotion"] != "중립" or tags["signals"]:
+            self.highlights.append(text[:_HIGHLIGHT_CHARS])
+
+    def summary(self) -> str:
+        if not self.folded:
+            return ""
+        parts = [f"이전 대화 {self.folded}개 발화 요약"]
+        if self.emotions:
+            parts.append("감정 " + ", ".join(f"{k} {v}회" for k, v in self.emotions.most_common()))
+        if self.signals:
+            parts.append("신호 " + ", ".join(f"{k} {v}회" for k, v in self.signals.most_common()))
+        if self.highlights:
+            parts.append("주요 발화: " + " / ".join(self.highlights))
+        return " | ".join(parts)[:self.summary_chars]
+
+    def render(self) -> str:
+        """프롬프트용 기록: 요약 1줄 + 최근 원문. 길이 상한 = summary_chars + max_turns × turn_chars"""
+        lines = []
+        s = self.summary()
+        if s:
+            lines.append(f"[요약] {s}")
+        for turn in self.turns:
+            prefix = "유저" if turn.get("role") == "user" else "상담사"
+            lines.append(f"{prefix}: {turn.get('content','')}")
+        return "\n".join(lines)
@@ -0,0 +1,29 @@
+# src/services/http_cache.py
+"""
+조건부 GET 헬퍼: ETag / Last-Modified / Cache-Control 과 orjson 직렬화.
+"""
+import hashlib
+from email.utils import formatdate
+import orjson
+from fastapi import Response
+
+def make_etag(*parts) -> str:
+    return '"' + hashlib.sha1("|".join(map(str, parts)).encode()).hexdigest()[:20] + '"'
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match: return False
+    tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+def _headers(etag: str, last_modified: float | None, max_age: int) -> dict:
+    h = {"ETag": etag, "Cache-Control": f"private, max-age={max_age}"}
+    if last_modified:
+        h["Last-Modified"] = formatdate(last_modified, usegmt=True)
+    return h
+
+def not_modified(etag: str, last_modified: float | None, max_age: int) -> Response:
+    return Response(status_code=304, headers=_headers(etag, last_modified, max_age))
+
+def json_response(payload, etag: str, last_modified: float | None, max_age: int) -> Response:
+    body = orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+    return Response(body, media_type="application/json", headers=_headers(etag, last_modified, max_age))
@@ -1,21 +1,108 @@
 # src/services/hyperclova_client.py
-import uuid
+"""
+HyperCLOVA chat-completions 호출.
+
+호출 위치별 프로필(task)로 모델/max_tokens/temperature/timeout 을 정한다.
+프로필(task)·모델별 최근 응답 시간을 기록해, 그 프로필에서 기본 모델의 p95 가 지연 예산을 넘으면
+더 가벼운 모델로 보낸다 (가끔 기본 모델로 재측정해 회복 여부를 확인).
+p95 는 최근 _WINDOW_SEC 안의 표본으로만 계산한다 — 우회 중에는 기본 모델 표본이 드물게 쌓이므로,
+표본 개수 창이면 느렸던 구간이 한참 남아 회복이 늦다. 시간 창이 지나면 느린 표본이 빠져 기본 모델로 돌아가 다시 잰다.
+"""
+import threading, time, uuid
+from collections import deque
+from dataclasses import dataclass
 import requests
 from ..config import get_settings
+from .bulkhead import llm_bulkhead
 
 _settings = get_settings()
 
-def chat(messages, max_tokens=1024, temperature=0.7, top_p=0.8) -> str | None:
-    url = f"https://clovastudio.stream.ntruss.com/testapp/v3/chat-completions/{_settings.HCX_MODEL_NAME}"
+@dataclass(frozen=True)
+class CallProfile:
+    model: str
+    max_tokens: int
+    temperature: float
+    timeout: float
+    budget_sec: float                 # 이 p95를 넘으면 light_model 로 우회
+    light_model: str | None = None
+
+PROFILES = {
+    # 공감 2문장
+    "empathy": CallProfile(_settings.HCX_MODEL_NAME, 256, 0.7, 10, 3.0, _settings.HCX_LIGHT_MODEL_NAME),
+    # 감정/성향 JSON 한 줄
+    "profile": CallProfile(_settings.HCX_LIGHT_MODEL_NAME, 96, 0.2, 10, 3.0),
+    # 시나리오 리포트 (길고 수치 근거 필요)
+    "report": CallProfile(_settings.HCX_MODEL_NAME, 1024, 0.5, 30, 15.0, _settings.HCX_LIGHT_MODEL_NAME),
+    "default": CallProfile(_settings.HCX_MODEL_NAME, 1024, 0.7, 30, 30.0),
+}
+
+_MIN_SAMPLES = 10
+_PROBE_EVERY = 20                      # 우회 중에도 N번에 한 번은 기본 모델로 재측정
+_WINDOW_SEC = 60.0                     # p95 계산에 쓰는 최근 시간 창
+
+class _Latency:
+    def __init__(self, window_sec: float = _WINDOW_SEC):
+        self.window_sec = window_sec
+        self._lock = threading.Lock()
+        # (task, model) 별로 따로 잰다: 긴 리포트 호출이 짧은 공감 호출의 p95 를 끌어올리지 않도록
+        self._lat: dict[tuple[str, str], deque] = {}     # (기록 시각, 지연)
+        self._routed: dict[str, int] = {}
+
+    def record(self, task: str, model: str, sec: float):
+        with self._lock:
+            self._lat.setdefault((task, model), deque(maxlen=100)).append((time.monotonic(), sec))
+
+    def _recent(self, key) -> list[float]:
+        cutoff = time.monotonic() - self.window_sec
+        return sorted(sec for t, sec in self._lat.get(key, ()) if t >= cutoff)
+
+    def p95(self, task: str, model: str) -> float | None:
+        with self._lock:
+            lat = self._recent((task, model))
+        if len(lat) < _MIN_SAMPLES: return None
+        return lat[int(0.95*(len(lat)-1))]
+
+    def route(self, task: str, prof: CallProfile) -> str:
+        if not prof.light_model: return prof.model
+        p = self.p95(task, prof.model)
+        if p is None or p <= prof.budget_sec: return prof.model
+        with self._lock:
+            n = self._routed[task] = self._routed.get(task, 0) + 1
+        return prof.model if n % _PROBE_EVERY == 0 else prof.light_model
+
+    def stats(self) -> dict:
+        with self._lock:
+            lat = {f"{t}:{m}": self._recent((t, m)) for t, m in self._lat}
+            routed = dict(self._routed)
+        return {"p95_ms": {k: round(v[int(0.95*(len(v)-1))]*1000, 1) for k, v in lat.items() if v},
+                "calls": {k: len(v) for k, v in lat.items()}, "light_routed": routed}
+
+latency = _Latency()
+
+def chat(messages, max_tokens=None, temperature=None, top_p=0.8, task: str = "default") -> str | None:
+    task = task if task in PROFILES else "default"
+    prof = PROFILES[task]
+    model = latency.route(task, prof)
+    url = f"https://clovastudio.stream.ntruss.com/testapp/v3/chat-completions/{model}"
     headers = {
         "Content-Type": "application/json",
         "Authorization": f"Bearer {_settings.HCX_API_KEY}",
         "X-NCP-CLOVASTUDIO-REQUEST-ID": str(uuid.uuid4()),
     }
-    payload = {"messages": messages, "topP": top_p, "temperature": temperature, "maxTokens": max_tokens}
+    payload = {
+        "messages": messages, "topP": top_p,
+        "temperature": prof.temperature if temperature is None else temperature,
+        "maxTokens": prof.max_tokens if max_tokens is None else max_tokens,
+    }
 
     try:
-        res = requests.post(url, headers=headers, json=payload, timeout=30)
+        # 격벽이 꽉 차면 BulkheadFull → None (상위에서 대체 문구로 즉시 응답)
+        with llm_bulkhead.slot():
+            t0 = time.perf_counter()
+            try:
+                res = requests.post(url, headers=headers, json=payload, timeout=prof.timeout)
+            finally:
+                latency.record(task, model, time.perf_counter() - t0)   # 시간 초과도 지연으로 반영
         # 인증 실패 등은 None 반환해서 상위에서 친절 메시지로 대체
         if res.status_code == 401:
             # 로그가 필요하면 여기서 print(res.text) 혹은 logger.warning(...)
@@ -23,4 +110,4 @@ def chat(messages, max_tokens=1024, temperature=0.7, top_p=0.8) -> str | None:
         res.raise_for_status()
         return res.json().get("result", {}).get("message", {}).get("content") or None
     except Exception:
-        return None
\ No newline at end of file
+        return None
@@ -95,43 +95,37 @@ def calculate_taxed_profit(profit: Any, is_isa_period_met: bool, asset_type: str
     return total, 0.0, {'notes': '세금 계산 예외 발생'}
 
 # ---- C. 메인 실행 ----
-def run_isa_tax_calculation(
-    df: pd.DataFrame, df_users: pd.DataFrame,
-    current_profit_dict, maturity_profit_dict,
-    is_current_period_met: bool, is_maturity_period_met: bool
-):
+def prepare_tax_base(df: pd.DataFrame, df_users: pd.DataFrame) -> pd.DataFrame:
+    """세제 분류 + 사용자 한도를 자산 행에 붙인다. 가격과 무관하며 인덱스는 df와 동일."""
     df_users_processed, df_assets_processed = prepare_isa_data(df_users, df)
-    df_merged = pd.merge(df_assets_processed, df_users_processed, on='user_id')
+    return (pd.merge(df_assets_processed.rename_axis('_row').reset_index(), df_users_processed, on='user_id')
+              .set_index('_row').rename_axis(None))
 
-    # 현재
-    rows_cur=[]
+def tax_rows(df_merged: pd.DataFrame, profit_dict, is_period_met: bool) -> pd.DataFrame:
+    rows=[]
     for _, row in df_merged.iterrows():
         asset_name = row['name_x']; user_name = row['name_y']
-        profit_data = current_profit_dict.get(asset_name, 0)
+        profit_data = profit_dict.get(asset_name, 0)
         after_tax_profit, tax_amount, notes = calculate_taxed_profit(
-            profit=profit_data, is_isa_period_met=is_current_period_met,
+            profit=profit_data, is_isa_period_met=is_period_met,
             asset_type=row['tax_category'], isa_limit_override=row['tax_free_limit']
         )
-        rows_cur.append({
+        rows.append({
             'user_id': row['user_id'],'user_name': user_name,'asset_name': asset_name,
+            # 행 자신의 투자금 (자산명으로 다시 찾으면 같은 이름의 행이 여럿일 때 행이 불어남)
+            'invested': row.get('invested_amount'),
             'total_profit_before_tax': profit_data,'tax_amount': tax_amount,'after_tax_profit': after_tax_profit,'notes': notes['notes']
         })
-    df_cur = pd.DataFrame(rows_cur)
+    return pd.DataFrame(rows, index=df_merged.index)
 
-    # 만기
-    rows_mat=[]
-    for _, row in df_merged.iterrows():
-        asset_name = row['name_x']; user_name = row['name_y']
-        profit_data = maturity_profit_dict.get(asset_name, 0)
-        after_tax_profit, tax_amount, notes = calculate_taxed_profit(
-            profit=profit_data, is_isa_period_met=is_maturity_period_met,
-            asset_type=row['tax_category'], isa_limit_override=row['tax_free_limit']
-        )
-        rows_mat.append({
-            'user_id': row['user_id'],'user_name': user_name,'asset_name': asset_name,
-            'total_profit_before_tax': profit_data,'tax_amount': tax_amount,'after_tax_profit': after_tax_profit,'notes': notes['notes']
-        })
-    df_mat = pd.DataFrame(rows_mat)
+def run_isa_tax_calculation(
+    df: pd.DataFrame, df_users: pd.DataFrame,
+    current_profit_dict, maturity_profit_dict,
+    is_current_period_met: bool, is_maturity_period_met: bool
+):
+    df_merged = prepare_tax_base(df, df_users)
+    df_cur = tax_rows(df_merged, current_profit_dict, is_current_period_met).reset_index(drop=True)   # 현재
+    df_mat = tax_rows(df_merged, maturity_profit_dict, is_maturity_period_met).reset_index(drop=True) # 만기
     return df_cur, df_mat
 
 # ---- D. 머지/요약/프롬프트 ----
@@ -0,0 +1,137 @@
+# src/services/market_cache.py
+"""
+uvicorn 워커 간 공유하는 시세/베타 테이블 (메모리 매핑 파일, 고정 길이 레코드).
+
+- 쓰기: 갱신 프로세스 하나만 (python -m src.services.market_cache)
+- 읽기: 모든 워커가 같은 파일을 mmap 으로 열어 복사·락 없이 읽는다.
+  레코드마다 seq 카운터(seqlock)를 두어, 쓰는 중(홀수)이거나 읽는 사이 바뀌었으면 다시 읽는다.
+
+레이아웃: 헤더 64바이트(magic, slots, itemsize) + slots × 레코드.
+ticker 는 crc32 해시 + 선형 탐사로 슬롯을 정하며, 한 번 정해진 슬롯은 움직이지 않는다.
+"""
+import mmap, os, struct, time, zlib
+from ..deps import MARKET_CACHE_PATH, MARKET_CACHE_SLOTS
+
+MAGIC = b"MDC1"
+HEADER_SIZE = 64
+# seq(u32) | ticker(20B) | price | beta | price_ts | beta_ts  → 56바이트 (가격 필드는 8바이트 정렬)
+RECORD = struct.Struct("<I20sdddd")
+_SEQ = struct.Struct("<I")
+_VALUES = struct.Struct("<dddd")
+_VALUES_OFFSET = 24
+NAN = float("nan")
+
+class MarketCache:
+    def __init__(self, path: str, slots: int = MARKET_CACHE_SLOTS, writable: bool = False):
+        self.path = path
+        self.writable = writable
+        if writable and not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.write(struct.pack("<4sII", MAGIC, slots, RECORD.size).ljust(HEADER_SIZE, b"\0"))
+                f.truncate(HEADER_SIZE + slots*RECORD.size)
+        with open(path, "r+b" if writable else "rb") as f:
+            magic, slots, itemsize = struct.unpack("<4sII", f.read(12))
+            if magic != MAGIC or itemsize != RECORD.size:
+                raise ValueError(f"{path}: 시세 캐시 형식이 다릅니다")
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+        self.slots = slots
+        self._slot_of: dict[str, int] = {}   # 프로세스 로컬 ticker→슬롯 (슬롯은 고정이라 안전)
+
+    def _off(self, i: int) -> int:
+        return HEADER_SIZE + i*RECORD.size
+
+    def _find(self, ticker: str, claim: bool = False) -> int | None:
+        i = self._slot_of.get(ticker)
+        if i is not None: return i
+        key = ticker.encode()[:20]
+        start = zlib.crc32(key) % self.slots
+        for k in range(self.slots):
+            i = (start + k) % self.slots
+            off = self._off(i) + 4
+            cur = self._mm[off:off+20].rstrip(b"\0")
+            if cur == key:
+                self._slot_of[ticker] = i
+                return i
+            if cur == b"":
+                if not claim: return None
+                self._mm[off:off+20] = key.ljust(20, b"\0")
+                self._slot_of[ticker] = i
+                return i
+        if claim: raise RuntimeError("시세 캐시 슬롯이 가득 찼습니다 (MARKET_CACHE_SLOTS 확대 필요)")
+        return None
+
+    def get(self, ticker: str):
+        """(price, beta, price_ts, beta_ts) — 값이 없으면 NaN/0. 등록되지 않은 ticker면 None."""
+        i = self._find(ticker)
+        if i is None: return None
+        off = self._off(i); mm = self._mm
+        for _ in range(1000):
+            s1 = _SEQ.unpack_from(mm, off)[0]
+            if s1 & 1: continue                    # 쓰는 중
+            out = _VALUES.unpack_from(mm, off + _VALUES_OFFSET)
+            if _SEQ.unpack_from(mm, off)[0] == s1: return out
+        return None                                # writer가 쓰다 멈춘 경우
+
+    def put(self, ticker: str, price: float | None = None, beta: float | None = None, now: float | None = None):
+        """단일 writer 전용"""
+        now = time.time() if now is None else now
+        i = self._find(ticker, claim=True)
+        off = self._off(i); mm = self._mm
+        seq = _SEQ.unpack_from(mm, off)[0]
+        old = _VALUES.unpack_from(mm, off + _VALUES_OFFSET) if seq else (NAN, NAN, 0.0, 0.0)
+        p, b, pts, bts = old
+        if price is not None: p, pts = price, now
+        if beta is not None: b, bts = beta, now
+        _SEQ.pack_into(mm, off, (seq + 1) & 0xFFFFFFFF)          # 홀수: 쓰는 중
+        _VALUES.pack_into(mm, off + _VALUES_OFFSET, p, b, pts, bts)
+        _SEQ.pack_into(mm, off, (seq + 2) & 0xFFFFFFFF)          # 짝수: 완료
+
+    def flush(self):
+        self._mm.flush()
+
+_reader = None
+_reader_checked = 0.0
+
+def shared_cache() -> MarketCache | None:
+    """읽기용 공유 캐시. MARKET_CACHE_PATH 미설정이거나 파일이 아직 없으면 None (10초마다 재시도)."""
+    global _reader, _reader_checked
+    if _reader is not None or not MARKET_CACHE_PATH: return _reader
+    now = time.time()
+    if now - _reader_checked < 10: return None
+    _reader_checked = now
+    try:
+        _reader = MarketCache(MARKET_CACHE_PATH)
+    except (OSError, ValueError):
+        _reader = None
+    return _reader
+
+def run_refresher(interval: float):
+    """보유 종목 시세/베타를 주기적으로 조회해 공유 캐시에 기록 (이 프로세스만 upstream 호출)"""
+    import pandas as pd
+    from ..deps import get_db
+    from ..db.routing import read
+    from .bulkhead import BulkheadFull
+    from .capm import fetch_live_price_yf, get_betas
+    engine = get_db()
+    cache = MarketCache(MARKET_CACHE_PATH, writable=True)
+    while True:
+        assets = read(engine, lambda e: pd.read_sql("SELECT DISTINCT ticker, region FROM assets WHERE ticker IS NOT NULL", e))
+        by_region = assets.groupby(assets['region'].astype(str).str.lower())['ticker'].apply(list).to_dict()
+        try:
+            betas = get_betas(engine, by_region, use_shared=False)   # 자기 자신이 쓴 값을 재사용하지 않도록
+        except BulkheadFull:
+            betas = {}
+        for t in assets['ticker'].unique():
+            try:
+                price = fetch_live_price_yf(t)
+            except BulkheadFull:
+                price = None
+            cache.put(t, price=price, beta=betas.get(t))
+        cache.flush()
+        time.sleep(interval)
+
+if __name__ == "__main__":
+    from ..deps import PRICE_FEED_INTERVAL_SEC
+    if not MARKET_CACHE_PATH:
+        raise SystemExit("MARKET_CACHE_PATH 를 설정하세요")
+    run_refresher(PRICE_FEED_INTERVAL_SEC)
@@ -1,43 +1,98 @@
 import pandas as pd, numpy as np
 from sqlalchemy import text
-from .capm import get_beta, get_live_price_yf, rm_for_region, capm_expected_return
+from .capm import get_betas, get_live_price_yf, rm_for_region, capm_expected_return
+from .bulkhead import db_bulkhead
 from ..deps import RF, RM_DOMESTIC, RM_GLOBAL
+from ..db.routing import read
 
-def load_user_assets(engine, user_name:str):
-    with engine.begin() as conn:
-        user = conn.execute(text("SELECT user_id, name, account_date FROM users WHERE name=:n"), {"n": user_name}).fetchone()
-        if not user: raise ValueError(f"'{user_name}' 사용자를 찾을 수 없습니다.")
-        user_id = int(user[0]); account_date = pd.to_datetime(user[2])
+# 모듈 상수 text() → SQLAlchemy 컴파일 캐시를 요청마다 재사용
+_USER_ID_BY_NAME = text("SELECT user_id FROM users WHERE name=:n LIMIT 1")
+_USER_ASSETS = """
+SELECT u.user_id, u.name AS user_name, u.account_date, u.isa_user_type,
+       a.asset_id, a.type, a.name, a.ticker, a.region,
+       a.ratio AS weight_pct, a.invested AS invested_amount, a.count, a.beta_override
+FROM users u LEFT JOIN assets a ON a.user_id = u.user_id
+WHERE {where}
+ORDER BY u.user_id, a.asset_id
+"""
+_USER_ASSETS_BY_NAME = text(_USER_ASSETS.format(where="u.name=:n"))
+_USER_ASSETS_BY_ID = text(_USER_ASSETS.format(where="u.user_id=:uid"))
+_ALL_USER_ASSETS = text(_USER_ASSETS.format(where="a.asset_id IS NOT NULL"))
+_ASSET_COLS = ['asset_id', 'user_id', 'type', 'name', 'ticker', 'region',
+               'weight_pct', 'invested_amount', 'count', 'beta_override']
 
-    q = """
-    SELECT asset_id, user_id, type, name, ticker, region,
-           ratio AS weight_pct, invested AS invested_amount, count, beta_override
-    FROM assets WHERE user_id=:uid
+def lookup_user_id(engine, user_name: str) -> int | None:
+    """로그인용 이름 확인. 세션에 user_id를 저장해 이후 조회는 PK로 한다."""
+    def q(e):
+        with e.connect() as conn:
+            return conn.execute(_USER_ID_BY_NAME, {"n": user_name}).fetchone()
+    with db_bulkhead.slot():
+        row = read(engine, q)
+    return int(row[0]) if row else None
+
+def load_user_portfolio(engine, user_name: str, user_id: int | None = None):
+    """
+    사용자 정보와 보유 자산을 users JOIN assets 한 번으로 읽는다 (user_id를 알면 PK 조회).
+    반환: (df_user 1행: user_id/name/account_date/isa_user_type, 자산 df)
     """
-    df = pd.read_sql(text(q), engine, params={"uid": user_id})
+    q, params = (_USER_ASSETS_BY_ID, {"uid": int(user_id)}) if user_id is not None else (_USER_ASSETS_BY_NAME, {"n": user_name})
+    with db_bulkhead.slot():
+        rows = read(engine, lambda e: pd.read_sql(q, e, params=params))
+    if rows.empty: raise ValueError(f"'{user_name}' 사용자를 찾을 수 없습니다.")
+    rows = rows[rows['user_id'] == rows['user_id'].iloc[0]]   # 동명이인이면 첫 사용자
+    df_user, df = _split_rows(rows)
     if df.empty: raise ValueError("해당 사용자의 자산이 없습니다.")
-    return user_id, account_date, df
+    return df_user, df
+
+def load_all_portfolios(engine):
+    """
+    자산이 있는 전체 사용자를 JOIN 한 번으로 읽는다 (스냅샷 일괄 갱신용).
+    반환: (df_users 사용자당 1행, 자산 df — account_date 컬럼 포함)
+    """
+    with db_bulkhead.slot():
+        rows = read(engine, lambda e: pd.read_sql(_ALL_USER_ASSETS, e))
+    df_users, df = _split_rows(rows)
+    df['account_date'] = df['user_id'].map(df_users.set_index('user_id')['account_date'])
+    return df_users, df
+
+def _split_rows(rows: pd.DataFrame):
+    df_users = (rows[['user_id', 'user_name', 'account_date', 'isa_user_type']].drop_duplicates('user_id')
+                .rename(columns={'user_name': 'name'}).reset_index(drop=True))
+    df = rows[rows['asset_id'].notna()][_ASSET_COLS].reset_index(drop=True)
+    df['asset_id'] = df['asset_id'].astype('int64')
+    return df_users, df
+
+def load_user_assets(engine, user_name:str, user_id: int | None = None):
+    df_user, df = load_user_portfolio(engine, user_name, user_id)
+    return int(df_user['user_id'].iloc[0]), pd.to_datetime(df_user['account_date'].iloc[0]), df
 
 def enrich_capm(engine, df: pd.DataFrame):
+    # override 없는 종목의 beta는 지역별로 묶어 한 번에 조회/추정
+    need = df[df['beta_override'].isna() & df['ticker'].notna()]
+    by_region = need.groupby(need['region'].astype(str).str.lower())['ticker'].apply(lambda s: sorted(set(s))).to_dict()
+    cached = get_betas(engine, by_region) if by_region else {}
     betas=[]
     for _, r in df.iterrows():
         beta=None
         if pd.notna(r.get('beta_override')): beta=float(r['beta_override'])
-        elif pd.notna(r.get('ticker')): beta=get_beta(engine, r['ticker'])
+        elif pd.notna(r.get('ticker')): beta=cached.get(r['ticker'])
         if beta is None: beta = 1.0 if str(r['region']).lower()=='domestic' else 1.2
         betas.append(beta)
     df=df.copy()
     df['beta_live']=betas
     df['rm_assigned']=df['region'].map(rm_for_region)
-    df['expected_return']=df.apply(lambda r: capm_expected_return(r['beta_live'], RF, r['rm_assigned']), axis=1)
+    df['expected_return']=capm_expected_return(df['beta_live'].to_numpy(), RF, df['rm_assigned'].to_numpy())
     df['기대 수익률 (%)']=(df['expected_return']*100).round(2)
     return df
 
-def attach_live_values(df: pd.DataFrame):
+def attach_live_values(df: pd.DataFrame, prices: dict | None = None):
+    # prices(ticker→가격)가 주어지면 조회 없이 그 값을 사용 (증분 재평가용)
     live_prices=[]; live_values=[]; live_returns=[]
     for _, r in df.iterrows():
         tkr=r.get('ticker'); qty=r.get('count'); inv=float(r['invested_amount']) if pd.notna(r['invested_amount']) else np.nan
-        price=get_live_price_yf(tkr) if pd.notna(tkr) else None
+        if pd.isna(tkr): price=None
+        elif prices is not None: price=prices.get(tkr)
+        else: price=get_live_price_yf(tkr)
         if (price is not None) and pd.notna(qty):
             try: val=float(price)*float(qty)
             except: val=np.nan
@@ -54,23 +109,33 @@ def attach_live_values(df: pd.DataFrame):
     df['현재 수익금(%)']=((df['current_value_live']/safe_inv-1.0)*100).round(2)
     return df
 
-def maturity_projection(df: pd.DataFrame, account_date, today=None):
+def years_to_maturity(account_date, today=None) -> float:
     today = pd.Timestamp.today().normalize() if today is None else pd.to_datetime(today)
     maturity_date = pd.to_datetime(account_date) + pd.DateOffset(years=3)
-    years_left = max(0.0, (maturity_date - today).days/365.25)
+    return max(0.0, (maturity_date - today).days/365.25)
 
-    base_now_value = df['current_value_live'].astype(float).where(df['current_value_live'].notna(), df['invested_amount'].astype(float))
+def current_base_value(df: pd.DataFrame) -> pd.Series:
+    # 실시간 평가액이 없으면 투자원금으로 대체
+    return df['current_value_live'].astype(float).where(df['current_value_live'].notna(), df['invested_amount'].astype(float))
+
+def apply_mix_rm(df: pd.DataFrame):
+    """투자원금 기준 지역 비중으로 혼합 Rm을 정한다. 가격과 무관하므로 캐시 가능."""
     w = df['invested_amount'].astype(float); w = w / w.sum()
     domestic_ratio = w[df['region']=='domestic'].sum(); global_ratio = w[df['region']=='global'].sum()
 
+    df=df.copy()
     if global_ratio>0:
         mix_rm = domestic_ratio*RM_DOMESTIC + global_ratio*RM_GLOBAL
-        df['expected_return_mixRm']=df.apply(lambda r: capm_expected_return(r['beta_live'], RF, mix_rm), axis=1)
+        df['expected_return_mixRm']=capm_expected_return(df['beta_live'].to_numpy(), RF, mix_rm)
         df['기대 수익률_mixRm (%)']=(df['expected_return_mixRm']*100).round(2); r_col='expected_return_mixRm'
         mix_rm_msg=f"🔗 혼합 Rm 적용: {mix_rm:.4f} [domestic={domestic_ratio:.2%}, global={global_ratio:.2%}]"
     else:
         mix_rm=RM_DOMESTIC; r_col='expected_return'; mix_rm_msg=f"🔗 해외 0% → 국내 Rm({mix_rm:.4f}) 사용"
+    return df, r_col, mix_rm_msg
 
+def project_to_maturity(df: pd.DataFrame, r_col: str, years_left: float):
+    """현재 평가액을 r_col 기대수익률로 만기까지 복리 투영 (행 단위로 독립)"""
+    base_now_value = current_base_value(df)
     r_annual = df[r_col].astype(float)
     df=df.copy()
     df['forecast_value_at_maturity']=(base_now_value*(1.0+r_annual)**years_left).round(0).astype('int64')
@@ -80,7 +145,61 @@ def maturity_projection(df: pd.DataFrame, account_date, today=None):
     df['만기 수익금(%)']=((df['forecast_value_at_maturity']/df['invested_amount'].replace(0,np.nan)-1.0)*100).round(2)
     df['앞으로 기대수익(원,현재→만기)']=(df['forecast_value_at_maturity']-base_now_value).round(0)
     df['앞으로 기대수익(%)']=((df['forecast_value_at_maturity']/base_now_value-1.0)*100).round(2)
+    return df
+
+def maturity_projection(df: pd.DataFrame, account_date, today=None):
+    years_left = years_to_maturity(account_date, today)
+    df, r_col, mix_rm_msg = apply_mix_rm(df)
+    df = project_to_maturity(df, r_col, years_left)
 
-    current_total = float(base_now_value.sum())
+    current_total = float(current_base_value(df).sum())
     forecast_total = float(df['forecast_value_at_maturity'].sum())
-    return df, years_left, current_total, forecast_total, mix_rm_msg
\ No newline at end of file
+    return df, years_left, current_total, forecast_total, mix_rm_msg
+
+def project_portfolios(df: pd.DataFrame, today=None):
+    """
+    여러 사용자의 자산(user_id, account_date 컬럼 포함)을 한 번에 만기 투영.
+    혼합 Rm·CAPM·복리 계산을 전체 행에 대한 NumPy 식 하나씩으로 처리하고,
+    잔여 기간은 계좌 개설일별로 한 번만 계산한다.
+    반환: (투영 컬럼이 붙은 df, 사용자별 요약 DataFrame)
+    """
+    df = df.copy()
+    uid = df['user_id']
+    inv = df['invested_amount'].astype(float)
+    w = inv / inv.groupby(uid).transform('sum')
+    region = df['region']
+    domestic_ratio = w.where(region=='domestic', 0.0).groupby(uid).transform('sum').to_numpy()
+    global_ratio = w.where(region=='global', 0.0).groupby(uid).transform('sum').to_numpy()
+    mix_rm = domestic_ratio*RM_DOMESTIC + global_ratio*RM_GLOBAL
+
+    # 해외 비중이 있으면 혼합 Rm 기대수익률, 없으면 지역 Rm 기대수익률
+    mixed = capm_expected_return(df['beta_live'].to_numpy(), RF, mix_rm)
+    has_global = global_ratio > 0
+    df['expected_return_mixRm'] = np.where(has_global, mixed, np.nan)
+    df['기대 수익률_mixRm (%)'] = (df['expected_return_mixRm']*100).round(2)
+    r_annual = np.where(has_global, mixed, df['expected_return'].to_numpy(dtype=float))
+
+    dates = pd.to_datetime(df['account_date'])
+    years = {d: years_to_maturity(d, today) for d in dates.unique()}
+    years_left = dates.map(years).to_numpy(dtype=float)
+
+    base_now_value = current_base_value(df).to_numpy()
+    forecast = np.round(base_now_value*(1.0+r_annual)**years_left, 0).astype('int64')
+    df['forecast_value_at_maturity'] = forecast
+    df['만기까지 예상 누적수익률 (%)'] = np.round((forecast/base_now_value-1.0)*100, 2)
+    df['만기 수익금(원,원금대비)'] = (df['forecast_value_at_maturity']-df['invested_amount']).round(0)
+    df['만기 수익금(%)'] = ((df['forecast_value_at_maturity']/df['invested_amount'].replace(0,np.nan)-1.0)*100).round(2)
+    df['앞으로 기대수익(원,현재→만기)'] = np.round(forecast-base_now_value, 0)
+    df['앞으로 기대수익(%)'] = np.round((forecast/base_now_value-1.0)*100, 2)
+
+    g = pd.DataFrame({'user_id': uid.to_numpy(), 'base': base_now_value, 'forecast': forecast,
+                      'years_left': years_left, 'mix_rm': mix_rm, 'domestic': domestic_ratio, 'global': global_ratio})
+    summary = g.groupby('user_id').agg(years_left=('years_left','first'), current_total=('base','sum'),
+                                        forecast_total=('forecast','sum'), mix_rm=('mix_rm','first'),
+                                        domestic_ratio=('domestic','first'), global_ratio=('global','first'))
+    summary['mix_rm_msg'] = [
+        f"🔗 혼합 Rm 적용: {r.mix_rm:.4f} [domestic={r.domestic_ratio:.2%}, global={r.global_ratio:.2%}]" if r.global_ratio>0
+        else f"🔗 해외 0% → 국내 Rm({RM_DOMESTIC:.4f}) 사용"
+        for r in summary.itertuples()
+    ]
+    return df, summary
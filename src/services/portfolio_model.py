@@ -0,0 +1,224 @@
+# src/services/portfolio_model.py
+"""
+사용자별 포트폴리오 모델.
+가격과 무관한 단계(CAPM 보강, 혼합 Rm, ISA 세제 분류)는 한 번만 계산해 두고,
+시세가 바뀌면 해당 종목의 평가액/수익률/만기 예측/세금 컬럼만 다시 계산한다.
+"""
+import hashlib, threading, time
+from collections import OrderedDict
+import pandas as pd
+from .capm import get_live_prices
+from .portfolio import (
+    load_user_portfolio, load_all_portfolios, enrich_capm, attach_live_values,
+    apply_mix_rm, years_to_maturity, project_to_maturity, project_portfolios, current_base_value,
+)
+from .isa_tax import prepare_tax_base, tax_rows, merge_with_investment, summarize_overall, build_prompt
+from ..deps import PORTFOLIO_MODEL_TTL_SEC, PORTFOLIO_MODEL_MAX
+
+SCENARIO_CURRENT = "현재 해지(중도)"
+SCENARIO_MATURITY = "3년 만기(유지)"
+
+class PortfolioModel:
+    def __init__(self, engine, user_name: str, user_id: int | None = None):
+        self.user_name = user_name
+        self.lock = threading.RLock()
+        self.loaded_at = time.time()
+
+        # --- 가격 무관 단계 (캐시) ---
+        # 사용자 정보 + 자산을 한 번에 (세제 한도용 사용자 행도 여기서 얻는다)
+        df_user, df = load_user_portfolio(engine, user_name, user_id)
+        self.user_id = int(df_user['user_id'].iloc[0])
+        self.account_date = pd.to_datetime(df_user['account_date'].iloc[0])
+        df = enrich_capm(engine, df)
+        self.base, self.r_col, self.mix_rm_msg = apply_mix_rm(df)
+        self.tax_base = prepare_tax_base(self.base, df_user)
+        self.tickers = sorted(self.base['ticker'].dropna().unique().tolist())
+        # 자산 구성 버전: 보유 내역/베타/세제 한도가 같으면 같은 값 (ETag 용)
+        cols = ['asset_id', 'ticker', 'region', 'type', 'invested_amount', 'count', 'beta_live']
+        h = pd.util.hash_pandas_object(self.base[cols], index=False).to_numpy().tobytes()
+        h += pd.util.hash_pandas_object(self.tax_base['tax_free_limit'], index=False).to_numpy().tobytes()
+        self.asset_version = hashlib.sha1(h).hexdigest()[:16]
+
+        # --- 가격 의존 단계 ---
+        self.prices: dict = {}
+        self.years_left = None
+        self.df = None
+        self.tax_cur = None
+        self.tax_mat = None
+        self.version = 0          # 재평가될 때마다 증가
+        self.priced_at = None     # 마지막으로 값이 바뀐 시각 (가격 epoch)
+        self.checked_at = None    # 마지막으로 전 종목 시세를 확인한 시각
+        self.result = None
+
+    def expired(self, max_age: float = PORTFOLIO_MODEL_TTL_SEC) -> bool:
+        return (time.time() - self.loaded_at) > max_age
+
+    def refresh(self, today=None) -> dict:
+        """전 종목 시세를 조회해 바뀐 종목만 재평가"""
+        prices = get_live_prices(self.tickers)
+        result = self.reprice(prices, today=today)
+        self.checked_at = time.time()
+        return result
+
+    def fresh(self, max_age: float) -> bool:
+        return self.checked_at is not None and (time.time() - self.checked_at) <= max_age
+
+    def current(self, max_age: float) -> dict:
+        """max_age 초 안에 시세를 확인했으면 캐시된 결과, 아니면 refresh"""
+        return self.result if self.fresh(max_age) else self.refresh()
+
+    def reprice(self, prices: dict, today=None) -> dict:
+        """
+        push형 갱신 진입점. prices(ticker→가격) 중 값이 바뀐 종목만 다시 계산한다.
+        만기까지 남은 기간이 바뀌었거나(날짜 변경) 첫 평가면 전체를 계산한다.
+        """
+        with self.lock:
+            years_left = years_to_maturity(self.account_date, today)
+            full = self.df is None or years_left != self.years_left
+            changed = {t for t, p in prices.items() if t in self.tickers and self.prices.get(t, ...) != p}
+            self.prices.update({t: prices[t] for t in changed})
+            if not full and not changed:
+                return self.result
+
+            if full:
+                mask = pd.Series(True, index=self.base.index)
+            else:
+                mask = self.base['ticker'].isin(changed)
+                # 세금 계산은 자산명 기준이므로 같은 이름의 행도 함께 갱신
+                mask |= self.base['name'].isin(self.base.loc[mask, 'name'])
+
+            sub = attach_live_values(self.base.loc[mask], self.prices)
+            sub = project_to_maturity(sub, self.r_col, years_left)
+            self.df = sub if full else pd.concat([self.df.loc[~mask], sub]).loc[self.base.index]
+            self.years_left = years_left
+
+            current_profit_dict = self.df.set_index('name')['현재 수익금(원)'].to_dict()
+            maturity_profit_dict = self.df.set_index('name')['만기 수익금(원,원금대비)'].to_dict()
+            rows = self.tax_base.loc[self.tax_base.index.isin(mask[mask].index)]
+            cur = tax_rows(rows, current_profit_dict, is_period_met=False)
+            mat = tax_rows(rows, maturity_profit_dict, is_period_met=True)
+            if full:
+                self.tax_cur, self.tax_mat = cur, mat
+            else:
+                keep = ~self.tax_cur.index.isin(rows.index)
+                self.tax_cur = pd.concat([self.tax_cur.loc[keep], cur]).loc[self.tax_base.index]
+                self.tax_mat = pd.concat([self.tax_mat.loc[keep], mat]).loc[self.tax_base.index]
+
+            self.version += 1
+            self.priced_at = time.time()
+            self.result = self._summarize()
+            return self.result
+
+    def live_rows(self, tickers=None) -> list[dict]:
+        """종목별 실시간 평가 (tickers가 주어지면 해당 종목만). NaN은 None으로 바꿔 JSON 안전하게."""
+        with self.lock:
+            if self.df is None: return []
+            df = self.df if tickers is None else self.df[self.df['ticker'].isin(tickers)]
+            cols = {'live_price': 'live_price', 'current_value_live': 'current_value', '현재 수익금(원)': 'current_profit'}
+            out = []
+            for _, r in df.iterrows():
+                row = {"name": r['name'], "ticker": r['ticker']}
+                for src, dst in cols.items():
+                    v = r.get(src)
+                    row[dst] = None if v is None or pd.isna(v) else float(v)
+                out.append(row)
+            return out
+
+    def _summarize(self) -> dict:
+        # 합계/프롬프트는 종목 수만큼의 작은 집계라 매번 다시 만든다
+        return {
+            "user_id": self.user_id,
+            "priced_at": self.priced_at,
+            "mix_rm_msg": self.mix_rm_msg,
+            "years_left": self.years_left,
+            "current_total": float(current_base_value(self.df).sum()),
+            "forecast_total": float(self.df['forecast_value_at_maturity'].sum()),
+            **scenario_summary(self.df, self.tax_cur, self.tax_mat),
+        }
+
+def scenario_summary(df: pd.DataFrame, tax_cur: pd.DataFrame, tax_mat: pd.DataFrame) -> dict:
+    """한 사용자의 두 시나리오 총계 + 리포트 프롬프트"""
+    df_cur = merge_with_investment(tax_cur.reset_index(drop=True), df)
+    df_mat = merge_with_investment(tax_mat.reset_index(drop=True), df)
+    overall_cur = summarize_overall(df_cur, SCENARIO_CURRENT)
+    overall_mat = summarize_overall(df_mat, SCENARIO_MATURITY)
+
+    user_state_stub = {}  # 감정/성향을 아직 안 쓰면 빈 dict로도 build_prompt 동작
+    prompt_cur = build_prompt(df_cur, overall_cur, SCENARIO_CURRENT, user_state_stub)
+    prompt_mat = build_prompt(df_mat, overall_mat, SCENARIO_MATURITY, user_state_stub)
+    return {"report_prompts": {"current": prompt_cur, "maturity": prompt_mat},
+            "overall_cur": overall_cur, "overall_mat": overall_mat}
+
+def price_all_users(engine, today=None) -> list[tuple[str, dict]]:
+    """
+    자산이 있는 전체 사용자를 한 번에 평가 (스냅샷 일괄 갱신용). 공유 모델 레지스트리는 쓰지 않는다.
+    JOIN 1회, 베타·시세 조회 1회, 만기 투영은 project_portfolios 로 전체 행을 한 번에 계산하고
+    세금/프롬프트만 사용자별로 만든다. 반환: [(user_name, PortfolioModel.refresh() 와 같은 형태의 결과)]
+    """
+    df_users, df = load_all_portfolios(engine)
+    if df.empty: return []
+    df = enrich_capm(engine, df)
+    df = attach_live_values(df, get_live_prices(df['ticker'].dropna().unique().tolist()))
+    df, summary = project_portfolios(df, today)
+    tax_base = prepare_tax_base(df, df_users)
+    names = df_users.set_index('user_id')['name']
+    priced_at = time.time()
+
+    out = []
+    for uid, d in df.groupby('user_id', sort=False):
+        rows = tax_base.loc[d.index]
+        cur = tax_rows(rows, d.set_index('name')['현재 수익금(원)'].to_dict(), is_period_met=False)
+        mat = tax_rows(rows, d.set_index('name')['만기 수익금(원,원금대비)'].to_dict(), is_period_met=True)
+        s = summary.loc[uid]
+        out.append((names[uid], {
+            "user_id": int(uid),
+            "priced_at": priced_at,
+            "mix_rm_msg": s['mix_rm_msg'],
+            "years_left": float(s['years_left']),
+            "current_total": float(s['current_total']),
+            "forecast_total": float(s['forecast_total']),
+            **scenario_summary(d, cur, mat),
+        }))
+    return out
+
+# ===== 사용자별 모델 레지스트리 (최근 사용 순 LRU, PORTFOLIO_MODEL_MAX 개까지) =====
+_models: OrderedDict[str, PortfolioModel] = OrderedDict()
+_models_lock = threading.Lock()
+
+def _touch(user_name: str) -> PortfolioModel | None:
+    model = _models.get(user_name)
+    if model is not None:
+        _models.move_to_end(user_name)
+    return model
+
+def get_model(engine, user_name: str, max_age: float = PORTFOLIO_MODEL_TTL_SEC, user_id: int | None = None) -> PortfolioModel:
+    """캐시된 모델 반환. 없거나 오래됐으면(자산 변경 반영) 새로 적재."""
+    with _models_lock:
+        model = _touch(user_name)
+    if model is None or model.expired(max_age):
+        model = PortfolioModel(engine, user_name, user_id)   # ValueError: 사용자/자산 없음
+        with _models_lock:
+            _models[user_name] = model
+            _models.move_to_end(user_name)
+            while len(_models) > PORTFOLIO_MODEL_MAX:
+                _models.popitem(last=False)
+    return model
+
+def peek_model(user_name: str) -> PortfolioModel | None:
+    """적재 없이 캐시된(만료 전) 모델만 반환. 만료된 모델은 여기서 버린다."""
+    with _models_lock:
+        model = _touch(user_name)
+        if model is not None and model.expired():
+            del _models[user_name]
+            return None
+    return model
+
+def reprice(user_name: str, prices: dict) -> dict | None:
+    """이미 평가된 사용자의 모델에 시세만 밀어 넣는다. 모델이 없거나 아직 전 종목 평가 전이면 None."""
+    with _models_lock:
+        model = _models.get(user_name)
+    return model.reprice(prices) if model is not None and model.result is not None else None
+
+def drop_model(user_name: str):
+    with _models_lock:
+        _models.pop(user_name, None)
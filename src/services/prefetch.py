@@ -0,0 +1,105 @@
+# src/services/prefetch.py
+"""
+이름 확인 직후 포트폴리오(선택적으로 두 시나리오 리포트)를 백그라운드에서 미리 계산.
+
+- 세션마다 Speculation 하나. 다음 턴은 진행 중인 계산을 기다려 그 결과를 쓴다 (중복 계산 없음).
+  아직 시작도 못 한 작업이면 취소하고 호출자가 직접 계산한다.
+- 동시 투기 작업 수는 PREFETCH_MAX_PENDING 으로 제한하고, 넘치면 그냥 건너뛴다 (0이면 끔).
+- 리포트(LLM)는 PREFETCH_REPORTS=1 이고 LLM 격벽에 대기열이 없을 때만 미리 만든다.
+- 세션 종료/만료 시 cancel().
+"""
+import threading, time
+from concurrent.futures import ThreadPoolExecutor
+from .bulkhead import llm_bulkhead
+from .profiler import carry
+from ..deps import PREFETCH_MAX_WORKERS, PREFETCH_MAX_PENDING, PREFETCH_REPORTS, PREFETCH_TTL_SEC
+
+REPORT_KINDS = ("current", "maturity")
+
+class Speculation:
+    def __init__(self, name: str):
+        self.name = name
+        self.future = None
+        self.cancelled = threading.Event()
+        self._ready = threading.Event()
+        self._result = None
+        self.done_at = 0.0
+        self.reports: dict[str, tuple[str, str]] = {}   # kind → (prompt, 리포트)
+
+    def cancel(self):
+        self.cancelled.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    def result(self, name: str, timeout: float = 30.0):
+        """같은 사용자의 유효한 포트폴리오 결과 (계산 중이면 기다림). 쓸 수 없으면 None."""
+        if self.name != name or self.cancelled.is_set() or self.future is None:
+            return None
+        if self.future.cancel():          # 아직 대기열 → 직접 계산하는 편이 빠름
+            return None
+        if not self._ready.wait(timeout) or self._result is None:
+            return None
+        if time.time() - self.done_at > PREFETCH_TTL_SEC:
+            return None
+        return self._result
+
+    def report(self, kind: str, prompt: str) -> str | None:
+        """같은 프롬프트로 미리 만든 리포트가 있으면 반환"""
+        hit = self.reports.get(kind)
+        return hit[1] if hit and hit[0] == prompt else None
+
+class Prefetcher:
+    def __init__(self, max_workers: int = PREFETCH_MAX_WORKERS, max_pending: int = PREFETCH_MAX_PENDING):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._pool: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.started = 0
+        self.skipped = 0
+
+    def start(self, name: str, build, report=None) -> Speculation | None:
+        """build(name) → 포트폴리오 결과, report(kind, prompt) → 리포트 문자열 또는 None"""
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.skipped += 1
+                return None
+            self.pending += 1
+            self.started += 1
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="prefetch")
+        spec = Speculation(name)
+        spec.future = self._pool.submit(carry(self._run), spec, build, report)
+        spec.future.add_done_callback(self._release)
+        return spec
+
+    def _release(self, _future):
+        with self._lock:
+            self.pending -= 1
+
+    def _run(self, spec: Speculation, build, report):
+        try:
+            if spec.cancelled.is_set():
+                return
+            spec._result = build(spec.name)
+            spec.done_at = time.time()
+        except Exception:
+            spec._result = None
+        finally:
+            spec._ready.set()
+
+        if report is None or not PREFETCH_REPORTS or spec._result is None:
+            return
+        for kind in REPORT_KINDS:
+            if spec.cancelled.is_set() or llm_bulkhead.waiting:
+                return
+            prompt = spec._result["report_prompts"][kind]
+            text = report(kind, prompt)
+            if text:
+                spec.reports[kind] = (prompt, text)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"pending": self.pending, "started": self.started, "skipped": self.skipped}
+
+prefetcher = Prefetcher()
@@ -0,0 +1,71 @@
+# src/services/price_feed.py
+"""
+ticker당 폴링 루프 하나로 시세를 가져와 모든 구독자에게 나눠주는 공유 피드.
+구독자 수와 무관하게 upstream 조회는 ticker 수 × 주기로 고정된다.
+"""
+import asyncio
+from .capm import get_live_price_yf
+from ..deps import PRICE_FEED_INTERVAL_SEC
+
+class Subscription:
+    """구독자별 미전달 시세 버퍼. ticker당 최신값만 남기므로 느린 소비자도 메모리가 늘지 않는다."""
+    def __init__(self, tickers):
+        self.tickers = set(tickers)
+        self.pending: dict[str, float] = {}
+        self.event = asyncio.Event()
+
+    def push(self, ticker: str, price: float):
+        self.pending[ticker] = price
+        self.event.set()
+
+    async def next(self) -> dict:
+        await self.event.wait()
+        self.event.clear()
+        out, self.pending = self.pending, {}
+        return out
+
+class PriceFeed:
+    def __init__(self, fetch=get_live_price_yf, interval: float = PRICE_FEED_INTERVAL_SEC):
+        self.fetch = fetch
+        self.interval = interval
+        self.subs: dict[str, set[Subscription]] = {}
+        self.tasks: dict[str, asyncio.Task] = {}
+        self.last: dict[str, float] = {}
+
+    def subscribe(self, tickers) -> Subscription:
+        sub = Subscription(tickers)
+        for t in sub.tickers:
+            self.subs.setdefault(t, set()).add(sub)
+            if t in self.last:
+                sub.push(t, self.last[t])     # 최근 시세는 바로 전달
+            if t not in self.tasks:
+                self.tasks[t] = asyncio.create_task(self._poll(t))
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        for t in sub.tickers:
+            subs = self.subs.get(t)
+            if subs is None: continue
+            subs.discard(sub)
+            if not subs:
+                # 마지막 구독자가 떠나면 폴링 중단
+                self.subs.pop(t, None)
+                task = self.tasks.pop(t, None)
+                if task: task.cancel()
+
+    def stats(self) -> dict:
+        return {"tickers": len(self.tasks), "subscriptions": sum(len(s) for s in self.subs.values())}
+
+    async def _poll(self, ticker: str):
+        while True:
+            try:
+                price = await asyncio.to_thread(self.fetch, ticker)
+            except Exception:
+                price = None
+            if price is not None and price != self.last.get(ticker):
+                self.last[ticker] = price
+                for sub in list(self.subs.get(ticker, ())):
+                    sub.push(ticker, price)
+            await asyncio.sleep(self.interval)
+
+price_feed = PriceFeed()
@@ -0,0 +1,94 @@
+# src/services/price_history.py
+"""
+로컬 일별 종가 저장소 (SQLite 파일).
+sync() 가 저장된 마지막 날짜 이후만 한 번의 일괄 다운로드로 덧붙이고,
+베타 추정은 이 저장소만 읽어 네트워크 없이 계산한다.
+
+    python -m src.services.price_history      # 보유 종목 + 벤치마크 동기화
+"""
+import sqlite3, threading
+from pathlib import Path
+import pandas as pd
+from ..deps import PRICE_STORE_PATH
+
+# 지역별 시장 벤치마크
+BENCHMARKS = {"domestic": "^KS11", "global": "^GSPC"}
+
+class PriceStore:
+    def __init__(self, path: str = PRICE_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+          CREATE TABLE IF NOT EXISTS prices (
+            ticker TEXT NOT NULL,
+            date TEXT NOT NULL,
+            close REAL NOT NULL,
+            PRIMARY KEY (ticker, date)
+          )
+        """)
+
+    def append(self, closes: pd.DataFrame):
+        """closes: index=날짜, columns=ticker 인 종가 행렬. 같은 날짜는 덮어쓴다."""
+        long = closes.rename_axis("date").reset_index().melt(id_vars="date", var_name="ticker", value_name="close").dropna()
+        rows = [(t, pd.Timestamp(d).strftime("%Y-%m-%d"), float(c)) for d, t, c in long[["date", "ticker", "close"]].itertuples(index=False)]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO prices (ticker, date, close) VALUES (?,?,?)", rows)
+
+    def last_dates(self, tickers) -> dict:
+        tickers = list(tickers)
+        if not tickers: return {}
+        q = f"SELECT ticker, MAX(date) FROM prices WHERE ticker IN ({','.join('?'*len(tickers))}) GROUP BY ticker"
+        with self._lock:
+            return {t: pd.Timestamp(d) for t, d in self._conn.execute(q, tickers)}
+
+    def load(self, tickers, start=None) -> pd.DataFrame:
+        """index=날짜, columns=ticker 종가 행렬 (없는 값은 NaN)"""
+        tickers = list(tickers)
+        if not tickers: return pd.DataFrame()
+        q = f"SELECT date, ticker, close FROM prices WHERE ticker IN ({','.join('?'*len(tickers))})"
+        params = list(tickers)
+        if start is not None:
+            q += " AND date >= ?"; params.append(pd.Timestamp(start).strftime("%Y-%m-%d"))
+        with self._lock:
+            df = pd.read_sql_query(q, self._conn, params=params)
+        if df.empty: return pd.DataFrame(columns=tickers, dtype=float)
+        wide = df.pivot(index="date", columns="ticker", values="close")
+        wide.index = pd.to_datetime(wide.index)
+        return wide.reindex(columns=tickers).sort_index()
+
+def sync(store: PriceStore, tickers, history: str = "3y") -> int:
+    """저장소에 없는 구간만 한 번의 yf.download 로 받아 덧붙인다. 추가한 행 수 반환."""
+    import yfinance as yf
+    tickers = sorted(set(tickers))
+    if not tickers: return 0
+    last = store.last_dates(tickers)
+    if len(last) < len(tickers):
+        kw = {"period": history}                             # 처음 보는 ticker가 있으면 전체 기간
+    else:
+        kw = {"start": (min(last.values()) + pd.Timedelta(days=1)).strftime("%Y-%m-%d")}
+    data = yf.download(tickers, auto_adjust=True, progress=False, **kw)
+    if data is None or data.empty: return 0
+    closes = data["Close"]
+    if isinstance(closes, pd.Series):
+        closes = closes.to_frame(tickers[0])
+    store.append(closes)
+    return int(closes.notna().sum().sum())
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_store() -> PriceStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = PriceStore()
+        return _store
+
+if __name__ == "__main__":
+    from ..deps import get_engine
+    assets = pd.read_sql("SELECT DISTINCT ticker FROM assets WHERE ticker IS NOT NULL", get_engine())
+    n = sync(get_store(), assets["ticker"].tolist() + list(BENCHMARKS.values()))
+    print(f"synced {n} rows")
@@ -0,0 +1,190 @@
+# src/services/profiler.py
+"""
+요청 단위 스택 샘플링 프로파일러 (opt-in).
+
+- 미들웨어가 헤더(X-Profile: <ADMIN_TOKEN>) / 샘플링 비율 / 지연 임계값으로 캡처를 시작하고,
+  @profiled 가 붙은 엔드포인트가 실제로 실행되는 스레드(스레드풀 워커 포함)를 캡처에 등록한다.
+  핸들러가 다른 풀(LLM·시세 fan-out·프리페치)에 넘기는 작업은 carry(fn) 로 감싸 그 워커도 실행하는 동안 등록한다.
+- 샘플러 스레드 하나가 활성 캡처의 스레드 스택을 sys._current_frames() 로 주기적으로 읽어
+  collapsed stack("a;b;c N") 으로 집계한다 → flamegraph.pl / speedscope 에 그대로 넣을 수 있다.
+- 최근 PROFILE_KEEP 개만 링 버퍼에 보관. PROFILE_ENABLED=0 이면 미들웨어를 달지 않으므로
+  @profiled 의 ContextVar 조회 외에는 비용이 없다.
+"""
+import asyncio, contextvars, functools, hmac, itertools, os, random, sys, threading, time
+from collections import Counter, deque
+from contextvars import ContextVar
+from ..deps import PROFILE_SAMPLE_RATE, PROFILE_SLOW_MS, PROFILE_INTERVAL_MS, PROFILE_KEEP, ADMIN_TOKEN
+
+_MAX_DEPTH = 128
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+class Capture:
+    def __init__(self, cid: int, method: str, path: str, reason: str, delay: float = 0.0):
+        self.id = cid
+        self.method = method
+        self.path = path
+        self.reason = reason
+        self.started = time.time()
+        self.sample_after = time.perf_counter() + delay
+        self.threads: set[int] = set()
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.duration_ms: float | None = None
+        self.status: int | None = None
+
+    def info(self) -> dict:
+        return {"id": self.id, "method": self.method, "path": self.path, "reason": self.reason,
+                "started": self.started, "duration_ms": self.duration_ms, "status": self.status,
+                "samples": self.samples}
+
+    def collapsed(self) -> str:
+        return "\n".join(f"{stack} {n}" for stack, n in self.stacks.most_common())
+
+def _label(frame) -> str:
+    code = frame.f_code
+    path = code.co_filename
+    if path.startswith(_ROOT):
+        path = os.path.relpath(path, _ROOT)
+    else:
+        path = os.path.basename(path)
+    return f"{code.co_name} ({path}:{code.co_firstlineno})"
+
+def _collapse(frame) -> str:
+    labels = []
+    while frame is not None and len(labels) < _MAX_DEPTH:
+        labels.append(_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+class Profiler:
+    def __init__(self, interval_ms: float = PROFILE_INTERVAL_MS, keep: int = PROFILE_KEEP):
+        self.interval = interval_ms / 1000.0
+        self.profiles: deque[Capture] = deque(maxlen=keep)
+        self._active: dict[int, Capture] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def begin(self, method: str, path: str, reason: str, delay: float = 0.0) -> Capture:
+        cap = Capture(next(self._ids), method, path, reason, delay)
+        with self._lock:
+            self._active[cap.id] = cap
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+                self._thread.start()
+            self._wake.set()
+        return cap
+
+    def attach(self, cap: Capture, thread_id: int | None = None):
+        cap.threads.add(thread_id or threading.get_ident())
+
+    def detach(self, cap: Capture, thread_id: int | None = None):
+        cap.threads.discard(thread_id or threading.get_ident())
+
+    def end(self, cap: Capture, duration_ms: float, status: int | None, keep: bool):
+        with self._lock:
+            self._active.pop(cap.id, None)
+        cap.duration_ms = round(duration_ms, 1)
+        cap.status = status
+        if keep:
+            self.profiles.append(cap)
+
+    def get(self, cid: int) -> Capture | None:
+        return next((c for c in self.profiles if c.id == cid), None)
+
+    def list(self) -> list[dict]:
+        return [c.info() for c in reversed(self.profiles)]
+
+    def _run(self):
+        me = threading.get_ident()
+        while True:
+            with self._lock:
+                active = list(self._active.values())
+                if not active: self._wake.clear()    # begin()이 같은 락 안에서 set 하므로 깨움을 놓치지 않음
+            if not active:
+                self._wake.wait()
+                continue
+            now = time.perf_counter()
+            frames = sys._current_frames()
+            for cap in active:
+                if now < cap.sample_after:
+                    continue
+                for tid in tuple(cap.threads):
+                    frame = frames.get(tid)
+                    if frame is None or tid == me:
+                        continue
+                    cap.stacks[_collapse(frame)] += 1
+                    cap.samples += 1
+            del frames
+            time.sleep(self.interval)
+
+profiler = Profiler()
+_current: ContextVar[Capture | None] = ContextVar("profile_capture", default=None)
+
+def profiled(fn):
+    """엔드포인트 실행 스레드를 현재 요청의 캡처에 등록 (캡처가 없으면 아무것도 안 함)"""
+    if asyncio.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            cap = _current.get()
+            if cap is not None: profiler.attach(cap)
+            return await fn(*args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        cap = _current.get()
+        if cap is not None: profiler.attach(cap)
+        return fn(*args, **kwargs)
+    return wrapper
+
+def carry(fn):
+    """
+    풀에 넘길 함수를 현재 컨텍스트로 감싼다. 캡처 중이면 워커 스레드를 실행하는 동안만 캡처에 등록하고,
+    워커 안에서 다시 풀에 넘기는 작업(예: 시세 공급원 호출)도 같은 캡처를 이어받는다. 캡처가 없으면 fn 그대로.
+    """
+    ctx = contextvars.copy_context()
+    cap = ctx.get(_current)
+    if cap is None: return fn
+
+    @functools.wraps(fn)
+    def run(*args, **kwargs):
+        tid = threading.get_ident()
+        added = tid not in cap.threads
+        profiler.attach(cap, tid)
+        try:
+            return ctx.copy().run(fn, *args, **kwargs)   # map 처럼 동시에 여러 번 불려도 각자 복사본에서
+        finally:
+            if added: profiler.detach(cap, tid)
+    return run
+
+def _trigger(request) -> tuple[str, float] | None:
+    """(사유, 샘플링 시작 지연 초) — 프로파일 대상이 아니면 None"""
+    token = request.headers.get("x-profile")
+    if ADMIN_TOKEN and token and hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+        return "header", 0.0
+    if PROFILE_SAMPLE_RATE and random.random() < PROFILE_SAMPLE_RATE:
+        return "sample", 0.0
+    if PROFILE_SLOW_MS:
+        return "slow", PROFILE_SLOW_MS / 1000.0
+    return None
+
+async def profile_middleware(request, call_next):
+    trig = _trigger(request)
+    if trig is None:
+        return await call_next(request)
+    reason, delay = trig
+    cap = profiler.begin(request.method, request.url.path, reason, delay)
+    token = _current.set(cap)
+    t0 = time.perf_counter(); response = None
+    try:
+        response = await call_next(request)
+        return response
+    finally:
+        _current.reset(token)
+        ms = (time.perf_counter() - t0) * 1000
+        keep = cap.samples > 0 and (reason != "slow" or ms >= PROFILE_SLOW_MS)
+        profiler.end(cap, ms, response.status_code if response else None, keep)
+        if keep and response is not None:
+            response.headers["X-Profile-Id"] = str(cap.id)
@@ -0,0 +1,162 @@
+# src/services/providers.py
+"""
+시세/베타 공급원 계층화.
+
+- Source: 이름 + 조회 함수 + 지연 예산(budget). 최근 응답 시간으로 p95를 추적한다.
+- TieredProvider: 공급원을 순서대로 시도한다.
+  · 1순위가 자기 p95(데이터가 적으면 budget) 안에 답하지 않으면 2순위를 동시에 띄운다 (hedged request).
+  · 먼저 도착한 유효값을 쓰고, 실행 시작 후 budget을 넘긴 호출은 기다리지 않는다 (스레드는 끝까지 돌지만 결과는 버림).
+    풀이 밀려 시작도 못 한 채 budget이 지나면 취소한다. 버린 호출이 풀의 절반을 차지하면 새 호출을 보내지 않는다.
+  · 모든 공급원이 '값 없음'(빈 결과 또는 예외)으로 답한 ticker는 negative_ttl 동안 다시 묻지 않는다 (상장폐지/오타 등).
+    시간 초과·네트워크 오류는 일시적 실패로 보고 캐시하지 않는다.
+  · 격벽 거절(BulkheadFull)은 그대로 올려 호출자가 투자금 기준 평가 대신 '혼잡' 응답을 하게 한다.
+    모든 공급원을 과부하로 보내지 못한(shed) 경우도 '값 없음'이 아니라 BulkheadFull 로 알린다.
+"""
+import threading, time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from .bulkhead import BulkheadFull
+from .profiler import carry
+
+_MIN_SAMPLES = 20
+
+class Source:
+    def __init__(self, name: str, fn, budget: float):
+        self.name = name
+        self.fn = fn
+        self.budget = budget
+        self._lat = deque(maxlen=256)
+        self.hits = self.misses = self.errors = self.timeouts = self.shed = 0
+
+    def hedge_after(self) -> float:
+        lat = sorted(self._lat)
+        if len(lat) < _MIN_SAMPLES: return self.budget
+        return min(self.budget, lat[int(0.95*(len(lat)-1))])
+
+    def stats(self) -> dict:
+        return {"budget_sec": self.budget, "hedge_after_ms": round(self.hedge_after()*1000, 1),
+                "hits": self.hits, "misses": self.misses, "errors": self.errors, "timeouts": self.timeouts,
+                "shed": self.shed}
+
+class TieredProvider:
+    def __init__(self, name: str, sources: list[Source], negative_ttl: float, max_workers: int):
+        self.name = name
+        self.sources = sources
+        self.negative_ttl = negative_ttl
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-src")
+        self.max_abandoned = max(1, max_workers // 2)   # 버린 호출이 이만큼 돌고 있으면 새 호출을 줄인다
+        self.abandoned = 0
+        self._negative: dict[str, float] = {}     # ticker → 다시 물어볼 시각
+        self._lock = threading.Lock()
+        self.hedged = 0
+        self.negative_hits = 0
+
+    def _call(self, src: Source, key: str, box: dict):
+        box["t0"] = t0 = time.perf_counter()        # 예산은 실제로 실행을 시작한 시점부터
+        v = src.fn(key)
+        return v, time.perf_counter() - t0
+
+    def _abandon(self, f):
+        """예산을 넘겨 결과를 버린 호출: 끝날 때까지 풀 스레드를 잡고 있으므로 수를 센다"""
+        with self._lock:
+            self.abandoned += 1
+        f.add_done_callback(self._release)
+
+    def _release(self, _f):
+        with self._lock:
+            self.abandoned -= 1
+
+    def _drop(self, pending: dict):
+        # 대기 중이면 취소, 이미 실행 중이면 버린 호출로 집계
+        for f in pending:
+            if not f.cancel():
+                self._abandon(f)
+        pending.clear()
+
+    def get(self, key: str):
+        now = time.time()
+        with self._lock:
+            until = self._negative.get(key)
+            if until is not None:
+                if now < until:
+                    self.negative_hits += 1
+                    return None
+                del self._negative[key]
+
+        pending: dict = {}            # future → (source, 제출 시각, {"t0": 실행 시작 시각})
+        nxt = 0; last_launch = 0.0; definite_misses = 0; shed = 0
+
+        def launch():
+            nonlocal nxt, last_launch, shed
+            src = self.sources[nxt]; nxt += 1
+            last_launch = time.perf_counter()
+            if self.abandoned >= self.max_abandoned:
+                src.shed += 1; shed += 1   # 버린 호출이 풀을 채우고 있으면 새 호출을 보내지 않는다
+                return
+            box: dict = {}
+            pending[self._pool.submit(carry(self._call), src, key, box)] = (src, last_launch, box)
+
+        def deadline(entry) -> float:
+            src, submitted, box = entry
+            return box.get("t0", submitted) + src.budget
+
+        launch()
+        while pending or nxt < len(self.sources):
+            if not pending:
+                launch(); continue
+            now_p = time.perf_counter()
+            wake = min(deadline(e) for e in pending.values())
+            if nxt < len(self.sources):
+                wake = min(wake, last_launch + self.sources[nxt-1].hedge_after())
+            done, _ = wait(pending, timeout=max(0.0, wake - now_p), return_when=FIRST_COMPLETED)
+
+            for f in done:
+                src = pending.pop(f)[0]
+                try:
+                    v, elapsed = f.result()
+                except BulkheadFull:              # 과부하: 다른 공급원도 같은 격벽이므로 호출자에게 알린다
+                    src.errors += 1
+                    self._drop(pending)
+                    raise
+                except OSError:                   # 네트워크 오류는 일시적 실패 (캐시하지 않음)
+                    src.errors += 1
+                    continue
+                except Exception:                 # 그 밖의 예외(빈 응답 파싱 실패 등)는 '값 없음'
+                    src.errors += 1; definite_misses += 1
+                    continue
+                src._lat.append(elapsed)
+                if v is not None:
+                    src.hits += 1
+                    self._drop(pending)
+                    return v
+                src.misses += 1; definite_misses += 1
+
+            now_p = time.perf_counter()
+            for f, entry in list(pending.items()):
+                if now_p < deadline(entry): continue
+                src, _, box = entry
+                if "t0" not in box and f.cancel():
+                    pending.pop(f); src.shed += 1; shed += 1   # 풀 대기만 하다 예산을 넘김: 실행하지 않고 버림
+                elif "t0" in box:
+                    pending.pop(f); src.timeouts += 1
+                    self._abandon(f)
+            if nxt < len(self.sources) and pending and now_p >= last_launch + self.sources[nxt-1].hedge_after():
+                self.hedged += 1
+                launch()
+
+        if shed == len(self.sources):
+            raise BulkheadFull(f"{self.name}: all sources shed")
+        if definite_misses == len(self.sources):
+            with self._lock:
+                self._negative[key] = time.time() + self.negative_ttl
+        return None
+
+    def forget(self, key: str):
+        with self._lock:
+            self._negative.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            negative = len(self._negative)
+        return {"hedged": self.hedged, "abandoned": self.abandoned, "negative_cached": negative, "negative_hits": self.negative_hits,
+                "sources": {s.name: s.stats() for s in self.sources}}
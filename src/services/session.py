@@ -0,0 +1,77 @@
+# src/services/session.py
+"""
+채팅 세션 상태 (감정 메터, 대화 기록, 이름/포트폴리오 흐름).
+세션 수는 SESSION_MAX 로, 세션당 기록은 ConversationHistory 상한으로 제한된다.
+"""
+import threading, time
+from collections import OrderedDict
+from .emo_metrics import EmoMeter
+from .history import ConversationHistory
+from .turn_log import turn_log
+from ..deps import SESSION_MAX, SESSION_IDLE_SEC, TURN_LOG_ENABLED
+
+DEFAULT_SESSION_ID = "default"
+
+class ChatSession:
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.meter = EmoMeter()
+        self.history = ConversationHistory(on_append=self._log_turn if TURN_LOG_ENABLED else None)
+        self.turn_no = 0
+        # 처음엔 이름을 먼저 받는다
+        self.state = {"await_name": True, "name": None, "user_id": None}
+        # 포트폴리오 컨텍스트(선택지 프롬프트 캐시)
+        self.portfolio = {"name": None, "prompts": None}
+        # 로그인 직후 시작한 포트폴리오 선계산 (services.prefetch.Speculation)
+        self.speculation = None
+        self.last_seen = time.time()
+
+    def _log_turn(self, turn: dict):
+        # 턴 + 그 시점 감정 지표를 write-behind 큐로 (DB 대기 없음)
+        self.turn_no += 1
+        turn_log.record(self.session_id, turn.get("role"), str(turn.get("content", "")),
+                        user_name=self.state["name"], turn_no=self.turn_no,
+                        anxiety=self.meter.anxiety, loss_aversion=self.meter.loss_aversion)
+
+    def set_speculation(self, spec):
+        self.cancel_speculation()
+        self.speculation = spec
+
+    def cancel_speculation(self):
+        if self.speculation is not None:
+            self.speculation.cancel()
+            self.speculation = None
+
+class SessionStore:
+    """최근 사용 순 LRU. 오래 쉬었거나 상한을 넘은 세션은 버린다."""
+    def __init__(self, max_sessions: int = SESSION_MAX, idle_sec: float = SESSION_IDLE_SEC):
+        self.max_sessions = max_sessions
+        self.idle_sec = idle_sec
+        self._sessions: OrderedDict[str, ChatSession] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str | None) -> ChatSession:
+        sid = session_id or DEFAULT_SESSION_ID
+        now = time.time()
+        with self._lock:
+            sess = self._sessions.get(sid)
+            if sess is None or now - sess.last_seen > self.idle_sec:
+                if sess is not None: sess.cancel_speculation()
+                sess = ChatSession(sid)
+                self._sessions[sid] = sess
+            sess.last_seen = now
+            self._sessions.move_to_end(sid)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)[1].cancel_speculation()
+            return sess
+
+    def drop(self, session_id: str):
+        with self._lock:
+            sess = self._sessions.pop(session_id, None)
+        if sess is not None:
+            sess.cancel_speculation()
+
+    def __len__(self):
+        return len(self._sessions)
+
+sessions = SessionStore()
@@ -0,0 +1,112 @@
+# src/services/snapshot.py
+"""
+portfolio_snapshot 테이블: 사용자별 최신 평가/만기 예측/두 시나리오 요약을 저장해 두고
+/portfolio/summary 가 한 번의 인덱스 조회로 응답할 수 있게 한다.
+"""
+import json, datetime as dt
+import pandas as pd
+from sqlalchemy import text
+from .bulkhead import db_bulkhead
+from ..db.routing import read, writer
+from .portfolio_model import price_all_users
+
+def _records(df) -> list[dict]:
+    if df is None: return []
+    return df.astype(object).where(df.notna(), None).to_dict(orient="records")
+
+def summary_payload(user_name: str, result: dict, source: str = "live") -> dict:
+    """build_portfolio_for_user 결과(DataFrame 포함)를 JSON 응답 형태로 변환"""
+    priced_at = result.get("priced_at")
+    return {
+        "user_name": user_name,
+        "source": source,
+        "priced_at": dt.datetime.utcfromtimestamp(priced_at).isoformat() + "Z" if priced_at else None,
+        "years_left": result["years_left"],
+        "current_total": result["current_total"],
+        "forecast_total": result["forecast_total"],
+        "mix_rm_msg": result["mix_rm_msg"],
+        "report_prompts": result["report_prompts"],
+        "overall_cur": _records(result["overall_cur"]),
+        "overall_mat": _records(result["overall_mat"]),
+    }
+
+def snapshot_row(user_name: str, result: dict, checked_at: float | None = None) -> dict:
+    """checked_at: 마지막으로 시세를 확인한 시각 (없으면 priced_at, 일괄 평가는 두 값이 같다)"""
+    return {
+        "uid": int(result["user_id"]),
+        "name": user_name,
+        "priced_at": dt.datetime.utcfromtimestamp(result["priced_at"]),
+        "checked_at": dt.datetime.utcfromtimestamp(checked_at or result["priced_at"]),
+        "years_left": result["years_left"],
+        "current_total": result["current_total"],
+        "forecast_total": result["forecast_total"],
+        "mix_rm_msg": result["mix_rm_msg"],
+        "overall_cur": json.dumps(_records(result["overall_cur"]), ensure_ascii=False),
+        "overall_mat": json.dumps(_records(result["overall_mat"]), ensure_ascii=False),
+        "report_prompts": json.dumps(result["report_prompts"], ensure_ascii=False),
+    }
+
+def write_snapshots(engine, rows: list[dict]):
+    """여러 사용자 스냅샷을 한 번의 executemany(다중 행 INSERT)로 upsert"""
+    if not rows: return
+    with db_bulkhead.slot(), writer(engine).begin() as conn:
+        conn.execute(text("""
+          INSERT INTO portfolio_snapshot
+            (user_id, user_name, priced_at, checked_at, years_left, current_total, forecast_total,
+             mix_rm_msg, overall_cur, overall_mat, report_prompts)
+          VALUES (:uid, :name, :priced_at, :checked_at, :years_left, :current_total, :forecast_total,
+                  :mix_rm_msg, :overall_cur, :overall_mat, :report_prompts)
+          ON DUPLICATE KEY UPDATE
+            user_name=VALUES(user_name), priced_at=VALUES(priced_at), checked_at=VALUES(checked_at),
+            years_left=VALUES(years_left),
+            current_total=VALUES(current_total), forecast_total=VALUES(forecast_total),
+            mix_rm_msg=VALUES(mix_rm_msg), overall_cur=VALUES(overall_cur),
+            overall_mat=VALUES(overall_mat), report_prompts=VALUES(report_prompts)
+        """), rows)
+
+_SNAPSHOT_SELECT = text("""
+  SELECT priced_at, years_left, current_total, forecast_total,
+         mix_rm_msg, overall_cur, overall_mat, report_prompts,
+         COALESCE(checked_at, priced_at) AS checked_at
+  FROM portfolio_snapshot
+  WHERE user_name=:n ORDER BY checked_at DESC LIMIT 1
+""")
+
+def read_snapshot(engine, user_name: str, max_age_sec: float) -> dict | None:
+    """
+    max_age_sec 이내에 시세를 확인한(checked_at) 스냅샷이면 응답 형태로 반환, 아니면 None.
+    priced_at 은 값이 마지막으로 바뀐 시각이라 Last-Modified/ETag 에만 쓴다.
+    """
+    def q(e):
+        with e.connect() as conn:
+            return conn.execute(_SNAPSHOT_SELECT, {"n": user_name}).fetchone()
+    with db_bulkhead.slot():
+        row = read(engine, q)
+    if not row: return None
+    priced_at = pd.to_datetime(row[0]).to_pydatetime().replace(tzinfo=None)
+    checked_at = pd.to_datetime(row[8]).to_pydatetime().replace(tzinfo=None)
+    if dt.datetime.utcnow() - checked_at > dt.timedelta(seconds=max_age_sec):
+        return None
+    load = lambda v: json.loads(v) if isinstance(v, (str, bytes)) else v
+    return {
+        "user_name": user_name,
+        "source": "snapshot",
+        "priced_at": priced_at.isoformat() + "Z",
+        "years_left": row[1],
+        "current_total": row[2],
+        "forecast_total": row[3],
+        "mix_rm_msg": row[4],
+        "report_prompts": load(row[7]),
+        "overall_cur": load(row[5]),
+        "overall_mat": load(row[6]),
+    }
+
+def refresh_snapshots(engine, batch_size: int = 100) -> int:
+    """
+    전체 사용자를 한 번에 재평가(price_all_users)해 batch_size 단위로 일괄 저장. 저장한 사용자 수 반환.
+    사용자별 모델 레지스트리를 거치지 않으므로 갱신 주기마다 전 사용자 모델이 메모리에 쌓이지 않는다.
+    """
+    rows = [snapshot_row(name, result) for name, result in price_all_users(engine)]
+    for i in range(0, len(rows), batch_size):
+        write_snapshots(engine, rows[i:i+batch_size])
+    return len(rows)
@@ -0,0 +1,96 @@
+# src/services/static_assets.py
+"""
+채팅 UI 정적 파일 파이프라인.
+
+시작 시 한 번 src/static/* 와 templates/chat.html 을 읽어
+- 내용 해시로 지문을 붙인 URL(/static/chat.3f2a9c1d.css)을 만들고,
+  HTML 안의 /static/<이름> 참조를 지문 URL로 바꾼다.
+- gzip(+ brotli 모듈이 있으면 br)로 미리 압축해 둔다.
+요청 때는 디스크 I/O·압축 없이 Accept-Encoding 에 맞는 바이트를 그대로 보낸다.
+지문 URL은 내용이 바뀌면 URL도 바뀌므로 1년 immutable, HTML 은 매번 ETag 재확인(no-cache).
+"""
+import gzip, hashlib, mimetypes
+from dataclasses import dataclass, field
+from pathlib import Path
+from fastapi import Response
+from .http_cache import etag_matches
+
+try:
+    import brotli
+except ImportError:            # 선택 의존성: 없으면 gzip 만
+    brotli = None
+
+ROOT = Path(__file__).resolve().parent.parent
+STATIC_DIR = ROOT / "static"
+PAGE_PATH = ROOT / "templates" / "chat.html"
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+_COMPRESSIBLE = ("text/", "application/javascript", "application/json", "image/svg+xml")
+
+@dataclass
+class Asset:
+    body: bytes
+    media_type: str
+    etag: str
+    cache_control: str
+    encoded: dict[str, bytes] = field(default_factory=dict)   # br / gzip
+
+    @classmethod
+    def build(cls, body: bytes, media_type: str, cache_control: str) -> "Asset":
+        a = cls(body, media_type, '"' + hashlib.sha256(body).hexdigest()[:32] + '"', cache_control)
+        if media_type.startswith(_COMPRESSIBLE):
+            if brotli is not None:
+                a.encoded["br"] = brotli.compress(body, quality=11)
+            a.encoded["gzip"] = gzip.compress(body, compresslevel=9, mtime=0)
+            # 압축이 오히려 크면 보내지 않는다
+            a.encoded = {k: v for k, v in a.encoded.items() if len(v) < len(body)}
+        return a
+
+def _accepted(accept_encoding: str | None) -> set[str]:
+    out = set()
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        q = params.strip().removeprefix("q=")
+        try:
+            if params and float(q) == 0: continue
+        except ValueError:
+            pass
+        out.add(name.strip().lower())
+    return out
+
+def respond(asset: Asset, if_none_match: str | None, accept_encoding: str | None) -> Response:
+    # 인코딩별 바이트가 달라도 원본 기준 ETag 하나 (Vary 로 캐시 구분)
+    headers = {"ETag": asset.etag, "Cache-Control": asset.cache_control, "Vary": "Accept-Encoding"}
+    if etag_matches(if_none_match, asset.etag):
+        return Response(status_code=304, headers=headers)
+    ok = _accepted(accept_encoding)
+    for enc in ("br", "gzip"):
+        if enc in asset.encoded and (enc in ok or "*" in ok):
+            headers["Content-Encoding"] = enc
+            return Response(asset.encoded[enc], media_type=asset.media_type, headers=headers)
+    return Response(asset.body, media_type=asset.media_type, headers=headers)
+
+class AssetBundle:
+    def __init__(self, static_dir: Path = STATIC_DIR, page_path: Path = PAGE_PATH):
+        self.assets: dict[str, Asset] = {}     # 지문 이름 → Asset
+        self.urls: dict[str, str] = {}         # 원래 이름 → /static/지문 이름
+        for path in sorted(p for p in static_dir.glob("*") if p.is_file()):
+            body = path.read_bytes()
+            name = f"{path.stem}.{hashlib.sha256(body).hexdigest()[:8]}{path.suffix}"
+            media = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+            if media.startswith("text/") or media == "application/javascript":
+                media += "; charset=utf-8"
+            self.assets[name] = Asset.build(body, media, IMMUTABLE)
+            self.urls[path.name] = f"/static/{name}"
+        html = page_path.read_text(encoding="utf-8")
+        for orig, url in self.urls.items():
+            html = html.replace(f"/static/{orig}", url)
+        self.page = Asset.build(html.encode("utf-8"), "text/html; charset=utf-8", REVALIDATE)
+
+    def get(self, name: str) -> Asset | None:
+        return self.assets.get(name)
+
+    def stats(self) -> dict:
+        return {name: {"bytes": len(a.body), **{k: len(v) for k, v in a.encoded.items()}}
+                for name, a in [("/", self.page), *self.assets.items()]}
@@ -0,0 +1,103 @@
+# src/services/turn_log.py
+"""
+대화 턴 + 감정 지표의 write-behind 저장.
+
+/chat 은 버퍼에 넣기만 하고(O(1), DB 대기 없음), 백그라운드 스레드가
+TURN_LOG_BATCH 건이 모이거나 TURN_LOG_FLUSH_SEC 가 지나면 다중 행 INSERT 한 번으로 기록한다.
+버퍼는 TURN_LOG_MAX_BUFFER 건으로 제한하고 넘치면 가장 오래된 행부터 버린다(dropped 집계).
+종료 시 close() 가 남은 행을 모두 기록한다.
+"""
+import threading, time
+from collections import deque
+from datetime import datetime
+from sqlalchemy import text
+from ..deps import TURN_LOG_ENABLED, TURN_LOG_BATCH, TURN_LOG_FLUSH_SEC, TURN_LOG_MAX_BUFFER
+
+_INSERT = text("""
+  INSERT INTO conversation_turns
+    (session_id, user_name, turn_no, role, content, anxiety, loss_aversion, created_at)
+  VALUES (:session_id, :user_name, :turn_no, :role, :content, :anxiety, :loss_aversion, :created_at)
+""")
+
+class TurnLog:
+    def __init__(self, engine_factory=None, batch_size: int = TURN_LOG_BATCH,
+                 flush_sec: float = TURN_LOG_FLUSH_SEC, max_buffer: int = TURN_LOG_MAX_BUFFER):
+        self._engine_factory = engine_factory
+        self.batch_size = batch_size
+        self.flush_sec = flush_sec
+        self._buf: deque[dict] = deque(maxlen=max_buffer)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.written = self.dropped = self.failed_batches = 0
+
+    def _engine(self):
+        if self._engine_factory is None:
+            from ..deps import get_engine
+            self._engine_factory = get_engine
+        return self._engine_factory()
+
+    def record(self, session_id: str, role: str, content: str, user_name: str | None = None,
+               turn_no: int | None = None, anxiety: float | None = None, loss_aversion: float | None = None):
+        row = {"session_id": session_id, "user_name": user_name, "turn_no": turn_no, "role": role,
+               "content": content, "anxiety": anxiety, "loss_aversion": loss_aversion,
+               "created_at": datetime.utcnow()}
+        with self._lock:
+            if len(self._buf) == self._buf.maxlen:
+                self.dropped += 1
+            self._buf.append(row)
+            if self._thread is None and not self._stop.is_set():
+                self._thread = threading.Thread(target=self._run, name="turn-log", daemon=True)
+                self._thread.start()
+            full = len(self._buf) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def _take(self) -> list[dict]:
+        with self._lock:
+            n = min(self.batch_size, len(self._buf))
+            return [self._buf.popleft() for _ in range(n)]
+
+    def flush(self) -> int:
+        """버퍼를 비울 때까지 배치 단위로 기록. 실패한 배치는 버퍼 앞에 되돌린다."""
+        total = 0
+        while True:
+            rows = self._take()
+            if not rows: return total
+            try:
+                with self._engine().begin() as conn:
+                    conn.execute(_INSERT, rows)           # executemany → 다중 행 INSERT
+            except Exception:
+                self.failed_batches += 1
+                with self._lock:
+                    # 그사이 들어온 행이 자리를 차지했으면 실패한 배치 중 오래된 행부터 버린다
+                    room = self._buf.maxlen - len(self._buf)
+                    self.dropped += max(0, len(rows) - room)
+                    self._buf.extendleft(reversed(rows[max(0, len(rows) - room):]))
+                return total
+            self.written += len(rows); total += len(rows)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_sec)
+            self._wake.clear()
+            self.flush()
+
+    def close(self, timeout: float = 10.0):
+        """백그라운드 기록을 멈추고 남은 행을 모두 기록 (앱 종료 시)"""
+        self._stop.set(); self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        deadline = time.time() + timeout
+        while self._buf and time.time() < deadline:
+            if not self.flush() and self._buf:
+                break                                       # DB 불가: 더 기다려도 소용 없음
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending = len(self._buf)
+        return {"enabled": TURN_LOG_ENABLED, "pending": pending, "written": self.written,
+                "dropped": self.dropped, "failed_batches": self.failed_batches}
+
+turn_log = TurnLog()
@@ -0,0 +1,287 @@
+const log = document.getElementById('log');
+const form = document.getElementById('chat-form');
+const input = document.getElementById('user-input');
+const sendBtn = document.getElementById('send-btn');
+const exitBtn = document.getElementById('exit-btn');
+
+// 탭마다 별도 상담 세션
+const sessionId =
+  sessionStorage.getItem('isa-session-id') ||
+  (crypto.randomUUID ? crypto.randomUUID() : String(Date.now() + Math.random()));
+sessionStorage.setItem('isa-session-id', sessionId);
+
+/* ---------- helpers ---------- */
+function setBusy(b) {
+  input.disabled = b;
+  sendBtn.disabled = b;
+  exitBtn.disabled = b;
+}
+function refocus() {
+  setTimeout(() => input.focus({ preventScroll: true }), 0);
+}
+
+function rowEl(sender) {
+  const r = document.createElement('div');
+  r.className = `row ${sender}`;
+  return r;
+}
+function bubbleEl() {
+  const b = document.createElement('div');
+  b.className = 'bubble';
+  return b;
+}
+function avatarEl(sender) {
+  const a = document.createElement('div');
+  a.className = 'avatar';
+  a.textContent = sender === 'bot' ? '🤖' : '🙂';
+  return a;
+}
+function nameEl(sender) {
+  const n = document.createElement('div');
+  n.className = 'name';
+  n.textContent = sender === 'bot' ? '챗봇' : '사용자';
+  return n;
+}
+
+function addBubble(sender, text, { loading = false } = {}) {
+  const r = rowEl(sender);
+  if (sender === 'bot') r.appendChild(avatarEl(sender));
+  const b = bubbleEl();
+  const header = nameEl(sender);
+  b.appendChild(header);
+  const body = document.createElement('div');
+  body.className = 'body';
+  if (loading) {
+    body.innerHTML = `<span class="typing"><span class="dot"></span><span class="dot"></span><span class="dot"></span></span>`;
+  } else {
+    body.textContent = text ?? '';
+  }
+  b.appendChild(body);
+  r.appendChild(b);
+  if (sender === 'user') r.appendChild(avatarEl(sender));
+  log.appendChild(r);
+  log.scrollTop = log.scrollHeight;
+  return { row: r, bubble: b, body };
+}
+
+function updateBubbleToText(refs, text) {
+  refs.body.classList.remove('typing');
+  refs.body.innerHTML = '';
+  refs.body.textContent = text ?? '';
+  log.scrollTop = log.scrollHeight;
+}
+
+function addBlock(title, html) {
+  const d = document.createElement('div');
+  d.className = 'block';
+  d.innerHTML = `<h3>${title}</h3>${html}`;
+  log.appendChild(d);
+  log.scrollTop = log.scrollHeight;
+}
+
+function numberComma(v) {
+  try {
+    return Math.round(v)
+      .toString()
+      .replace(/\B(?=(\d{3})+(?!\d))/g, ',');
+  } catch {
+    return v ?? '-';
+  }
+}
+
+function nl2br(s) {
+  return (s ?? '')
+    .replace(/&/g, '&amp;')
+    .replace(/</g, '&lt;')
+    .replace(/>/g, '&gt;')
+    .replace(/\n/g, '<br>');
+}
+
+function renderExitBlocks(data) {
+  if (!data) return;
+
+  if (data.summary) {
+    const s = data.summary;
+    const preface =
+      data.summary_preface ||
+      '대화를 기반으로 산출된 불안도와 회피도입니다.';
+    addBlock(
+      '세션 요약',
+      `
+      <div class="meta">${preface}</div>
+      <ul>
+        <li>감정: <b>${s['감정'] ?? '-'}</b></li>
+        <li>성향: <b>${s['성향'] ?? '-'}</b></li>
+        <li>불안지수: <b>${s['불안지수'] ?? '-'}</b></li>
+        <li>회피성향: <b>${s['회피성향'] ?? '-'}</b></li>
+      </ul>
+    `
+    );
+  }
+
+  if (data.simulation) {
+    const m = data.simulation;
+    addBlock(
+      '포트폴리오 시뮬레이션',
+      `
+      <ul>
+        <li>사용자: <b>${m.name}</b></li>
+        <li>남은 기간(년): <b>${(m.years_left ?? 0).toFixed(2)}</b></li>
+        <li>현재 평가액 합계: <b>${numberComma(
+          m.current_total
+        )}</b> 원</li>
+        <li>만기 예상 평가액 합계: <b>${numberComma(
+          m.forecast_total
+        )}</b> 원</li>
+      </ul>
+      <div class="meta">${m.mix_rm_msg || ''}</div>
+    `
+    );
+  }
+
+  if (data.comparison) {
+    addBlock(
+      '시나리오 비교',
+      `<div class="meta">${nl2br(data.comparison)}</div>`
+    );
+  }
+
+  if (data.reports) {
+    if (data.reports.current) {
+      addBlock(
+        '지금 바로 해지 리포트',
+        `<div>${nl2br(data.reports.current)}</div>`
+      );
+    }
+    if (data.reports.maturity) {
+      addBlock(
+        '3년 만기 유지 리포트',
+        `<div>${nl2br(data.reports.maturity)}</div>`
+      );
+    }
+  }
+
+  if (data.encouragement) {
+    addBlock('응원 메시지', `<div>${nl2br(data.encouragement)}</div>`);
+  }
+}
+
+/* ---------- live portfolio (WebSocket) ---------- */
+let liveWs = null;
+let liveBlock = null;
+let liveAssets = {};
+
+function krw(v) {
+  return v === null || v === undefined ? '-' : numberComma(v);
+}
+
+function renderLive(msg) {
+  if (!liveBlock) {
+    liveBlock = document.createElement('div');
+    liveBlock.className = 'block';
+    log.appendChild(liveBlock);
+  }
+  // 서버는 바뀐 종목만 보내므로 이전 값에 덮어쓴다
+  (msg.assets || []).forEach((a) => (liveAssets[a.ticker] = a));
+  const rows = Object.values(liveAssets)
+    .map(
+      (a) =>
+        `<li>${nl2br(a.name)}: <b>${krw(a.current_value)}</b> 원 (현재가 ${krw(
+          a.live_price
+        )}, 수익 ${krw(a.current_profit)} 원)</li>`
+    )
+    .join('');
+  liveBlock.innerHTML = `
+    <h3>실시간 포트폴리오</h3>
+    <ul>${rows}</ul>
+    <div class="meta">현재 평가액 합계 ${krw(msg.current_total)} 원 · ${nl2br(
+      msg.comparison
+    )}</div>
+  `;
+}
+
+function openLive(name) {
+  closeLive();
+  const proto = location.protocol === 'https:' ? 'wss' : 'ws';
+  liveWs = new WebSocket(
+    `${proto}://${location.host}/ws/portfolio?user_name=${encodeURIComponent(name)}`
+  );
+  liveWs.onmessage = (ev) => {
+    const msg = JSON.parse(ev.data);
+    if (msg.type === 'valuation') renderLive(msg);
+  };
+}
+
+function closeLive() {
+  if (liveWs) liveWs.close();
+  liveWs = null;
+  liveBlock = null;
+  liveAssets = {};
+}
+
+function handleLive(data) {
+  if (data.user_name) openLive(data.user_name);
+  if (data.summary) closeLive(); // 종료 응답
+}
+
+/* ---------- initial greet ---------- */
+addBubble(
+  'bot',
+  '안녕하세요! ISA 계좌 관련 고민이 있으시면 무엇이든 말해주시면 도와드리겠습니다. 먼저 성함을 알려주실까요?'
+);
+
+/* ---------- send flow ---------- */
+form.addEventListener('submit', async (e) => {
+  e.preventDefault();
+  const text = input.value.trim();
+  if (!text) return;
+
+  addBubble('user', text);
+  input.value = '';
+
+  const loadingRef = addBubble('bot', '', { loading: true });
+  setBusy(true);
+
+  try {
+    const res = await fetch('/chat', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ text, session_id: sessionId }),
+    });
+    const data = await res.json();
+    updateBubbleToText(loadingRef, data.reply || '응답이 없습니다.');
+    renderExitBlocks(data); // <-- 종료 응답이면 하단 블록 렌더
+    handleLive(data);
+  } catch (err) {
+    updateBubbleToText(loadingRef, '❌ 오류: 서버와 연결할 수 없습니다.');
+  } finally {
+    setBusy(false);
+    refocus();
+  }
+});
+
+/* ---------- exit button flow ---------- */
+exitBtn.addEventListener('click', async () => {
+  const text = '종료';
+  addBubble('user', text);
+
+  const loadingRef = addBubble('bot', '', { loading: true });
+  setBusy(true);
+
+  try {
+    const res = await fetch('/chat', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ text, session_id: sessionId }),
+    });
+    const data = await res.json();
+    updateBubbleToText(loadingRef, data.reply || '응답이 없습니다.');
+    renderExitBlocks(data); // <-- 종료 응답이면 하단 블록 렌더
+    handleLive(data);
+  } catch {
+    updateBubbleToText(loadingRef, '❌ 오류: 서버와 연결할 수 없습니다.');
+  } finally {
+    setBusy(false);
+    refocus();
+  }
+});
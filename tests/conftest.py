@@ -0,0 +1,30 @@
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.pool import StaticPool
+
+PRICES = {"005930.KS": 80000.0, "SPY": 560000.0, "148070.KS": 110000.0, "069500.KS": 36000.0, "035720.KS": 45000.0}
+
+@pytest.fixture
+def engine():
+    """users/assets 만 있는 SQLite 대역 (beta_override 가 있어 베타 조회 없음)"""
+    eng = sa.create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    with eng.begin() as c:
+        c.exec_driver_sql("CREATE TABLE users (user_id INTEGER PRIMARY KEY, name TEXT, account_date TEXT, isa_user_type TEXT)")
+        c.exec_driver_sql("CREATE TABLE assets (asset_id INTEGER PRIMARY KEY, user_id INT, type TEXT, name TEXT, ticker TEXT, "
+                          "region TEXT, ratio REAL, invested REAL, count REAL, beta_override REAL)")
+        c.exec_driver_sql("INSERT INTO users VALUES (1,'이현주','2023-03-01','일반형'),(2,'김철수','2024-01-01','서민형')")
+        c.exec_driver_sql("INSERT INTO assets VALUES (?,?,?,?,?,?,?,?,?,?)", [
+            (1, 1, '주식', '삼성전자', '005930.KS', 'domestic', 30, 3000000, 40, 1.0),
+            (2, 1, 'ETF', 'S&P500 ETF', 'SPY', 'global', 40, 4000000, 8, 1.1),
+            (3, 1, '채권 ETF', '국고채 ETF', '148070.KS', 'domestic', 20, 2000000, 18, 0.3),
+            (4, 1, 'ETF', 'KODEX200', '069500.KS', 'domestic', 10, 1000000, 30, 0.9),
+            (5, 2, '주식', '카카오', '035720.KS', 'domestic', 100, 5000000, 100, 1.2),
+        ])
+    return eng
+
+@pytest.fixture
+def live_prices(monkeypatch):
+    """모델 refresh 가 네트워크 대신 PRICES 를 쓰도록"""
+    from src.services import portfolio_model
+    monkeypatch.setattr(portfolio_model, "get_live_prices", lambda tickers: {t: PRICES.get(t) for t in tickers})
+    return PRICES
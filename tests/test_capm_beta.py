@@ -0,0 +1,48 @@
+from pathlib import Path
+import pandas as pd
+import pytest
+from src.services import capm
+from src.services.price_history import PriceStore
+
+FIXTURE = Path(__file__).parent / "fixtures" / "weekly_closes.csv"   # BETA15.KS = 1.5 * ^KS11 + 잡음
+
+@pytest.fixture
+def closes():
+    return pd.read_csv(FIXTURE, index_col="date", parse_dates=True)
+
+@pytest.fixture
+def store(closes):
+    s = PriceStore(":memory:")
+    s.append(closes)
+    return s
+
+def test_rolling_betas_recovers_known_beta(closes):
+    betas = capm.rolling_betas(closes[["BETA15.KS"]], closes["^KS11"])
+    assert betas["BETA15.KS"].iloc[-1] == pytest.approx(1.5, abs=0.1)
+    # min_obs 미만 구간은 NaN
+    assert betas["BETA15.KS"].iloc[:capm.BETA_MIN_WEEKS - 1].isna().all()
+
+def test_estimate_betas_from_store(store):
+    out = capm.estimate_betas({"domestic": ["BETA15.KS", "NOPE.KS"]}, store)
+    assert set(out) == {"BETA15.KS"}
+    assert out["BETA15.KS"] == pytest.approx(1.5, abs=0.1)
+
+def test_estimate_betas_empty_store():
+    assert capm.estimate_betas({"domestic": ["BETA15.KS"]}, PriceStore(":memory:")) == {}
+
+class _FakeEngine:
+    def __init__(self): self.rows = []
+    def begin(self): return self
+    def __enter__(self): return self
+    def __exit__(self, *a): return False
+    def execute(self, stmt, rows): self.rows.extend(rows)
+
+def test_get_betas_falls_back_to_yahoo(monkeypatch, store):
+    monkeypatch.setattr(capm, "BETA_SOURCE", "local")
+    monkeypatch.setattr(capm, "get_store", lambda: store)
+    monkeypatch.setattr(capm, "fetch_beta_from_yahoo", lambda t: {"NOPE.KS": 0.8}.get(t))
+    eng = _FakeEngine()
+    out = capm.get_betas(eng, {"domestic": ["BETA15.KS", "NOPE.KS", "GONE.KS"]}, force_refresh=True, use_shared=False)
+    assert out["BETA15.KS"] == pytest.approx(1.5, abs=0.1)
+    assert out["NOPE.KS"] == 0.8 and "GONE.KS" not in out
+    assert {r["t"]: r["s"] for r in eng.rows} == {"BETA15.KS": "local", "NOPE.KS": "yahoo"}
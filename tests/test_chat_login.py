@@ -0,0 +1,34 @@
+from src import app as chat_app
+from src.services import session as session_mod
+from src.services.bulkhead import BulkheadFull
+
+def _busy(*a, **k):
+    raise BulkheadFull("db: queue full")
+
+def test_login_under_db_overload_keeps_waiting_for_name(monkeypatch):
+    monkeypatch.setattr(session_mod, "TURN_LOG_ENABLED", False)
+    monkeypatch.setattr(chat_app, "lookup_user_id", _busy)
+    sid = "test-login-busy"
+    try:
+        out = chat_app.chat(chat_app.ChatIn(text="이현주", session_id=sid))
+        state = chat_app.sessions.get(sid).state
+    finally:
+        chat_app.sessions.drop(sid)
+    assert "찾지 못했어요" not in out["reply"]
+    assert "잠시 뒤" in out["reply"]
+    assert state["await_name"] is True and state["name"] is None
+
+def test_portfolio_under_quote_overload_is_degraded(monkeypatch, engine):
+    from src.services import portfolio_model
+    monkeypatch.setattr(session_mod, "TURN_LOG_ENABLED", False)
+    monkeypatch.setattr(chat_app, "get_db", lambda: engine)
+    monkeypatch.setattr(portfolio_model, "get_live_prices", _busy)
+    monkeypatch.setattr(chat_app.prefetcher, "max_pending", 0)
+    sid = "test-quote-busy"
+    try:
+        chat_app.chat(chat_app.ChatIn(text="이현주", session_id=sid))
+        out = chat_app.chat(chat_app.ChatIn(text="포트폴리오 보여줘", session_id=sid))
+    finally:
+        chat_app.sessions.drop(sid)
+        portfolio_model.drop_model("이현주")
+    assert out["reply"] == "요약을 불러오지 못했어요. 잠시 뒤 다시 시도해 주세요."
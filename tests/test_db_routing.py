@@ -0,0 +1,59 @@
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.pool import StaticPool
+from src.db.routing import DBRouter, read, writer
+from src.services.portfolio import lookup_user_id
+
+def _engine(name: str):
+    eng = sa.create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    with eng.begin() as c:
+        c.exec_driver_sql("CREATE TABLE users (user_id INTEGER PRIMARY KEY, name TEXT)")
+        c.exec_driver_sql("INSERT INTO users VALUES (1, ?)", (name,))
+    return eng
+
+@pytest.fixture
+def primary():
+    return _engine("primary")
+
+@pytest.fixture
+def replica():
+    return _engine("replica")
+
+def _who(db):
+    return read(db, lambda e: e.connect().execute(sa.text("SELECT name FROM users")).scalar())
+
+def test_replica_used_within_lag(primary, replica):
+    r = DBRouter(primary, replica, max_lag_sec=5, check_sec=0, lag_probe=lambda e: 5.0)
+    assert _who(r) == "replica"
+    assert lookup_user_id(r, "replica") == 1
+    assert r.stats()["replica_reads"] == 2
+
+@pytest.mark.parametrize("probe", [lambda e: 30.0, lambda e: None, lambda e: 1 / 0])
+def test_primary_used_when_lagging_or_probe_fails(primary, replica, probe):
+    r = DBRouter(primary, replica, max_lag_sec=5, check_sec=0, lag_probe=probe)
+    assert _who(r) == "primary"
+    assert r.stats()["replica_ok"] is False
+
+def test_no_replica_reads_primary(primary):
+    assert _who(DBRouter(primary)) == "primary"
+    assert _who(primary) == "primary"          # 평범한 Engine 도 그대로
+
+def test_connection_error_falls_back_and_marks_down(primary, replica, monkeypatch):
+    r = DBRouter(primary, replica, check_sec=0, retry_sec=60, lag_probe=lambda e: 0.0)
+    marked = []
+    orig = r.mark_down
+    monkeypatch.setattr(r, "mark_down", lambda: (marked.append(1), orig()))
+    def fn(e):
+        if e is replica:
+            raise sa.exc.OperationalError("SELECT 1", {}, Exception("connection lost"))
+        return "primary"
+    assert read(r, fn) == "primary"
+    assert marked == [1]
+    assert r.stats()["fallbacks"] == 1
+    assert r.reader() is primary               # retry_sec 동안 복제본 건너뜀
+
+def test_writer_is_always_primary(primary, replica):
+    r = DBRouter(primary, replica, check_sec=0, lag_probe=lambda e: 0.0)
+    assert r.reader() is replica
+    assert writer(r) is primary and r.writer() is primary
+    assert writer(primary) is primary
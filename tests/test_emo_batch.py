@@ -0,0 +1,37 @@
+import random
+import numpy as np
+import pytest
+from src.services.emo_metrics import EmoMeter, score_batch
+
+POOL = ["요즘 시장이 너무 불안해요", "전액 해지할까 고민돼요", "후회가 커요", "헷갈려서 모르겠어요",
+        "조금 기대돼요", "물타기 해야 할까요", "오늘은 괜찮아요", "손절하고 싶어요", "잠이 안 와요", ""]
+
+def _sequential(session_ids, texts):
+    meters, out = {}, []
+    for sid, t in zip(session_ids, texts):
+        key = "<na>" if sid is None or (isinstance(sid, float) and np.isnan(sid)) else sid
+        m = meters.setdefault(key, EmoMeter())
+        m.update(t)
+        out.append((m.anxiety, m.loss_aversion))
+    return out
+
+def test_score_batch_matches_emometer():
+    rng = random.Random(1)
+    ids = [f"s{rng.randrange(50)}" for _ in range(3000)]
+    texts = [rng.choice(POOL) for _ in ids]
+    got = score_batch(ids, texts)
+    want = _sequential(ids, texts)
+    assert got["anxiety"].tolist() == [a for a, _ in want]
+    assert got["loss_aversion"].tolist() == [l for _, l in want]
+
+@pytest.mark.parametrize("missing", [None, float("nan")])
+def test_missing_session_ids_are_one_session(missing):
+    ids = ["a", missing, "a", missing, None]
+    texts = ["불안해요", "해지할래요", "괜찮아요", "불안해요", "손절"]
+    got = score_batch(ids, texts)
+    want = _sequential(ids, texts)
+    assert got["anxiety"].tolist() == [a for a, _ in want]
+    assert got["loss_aversion"].tolist() == [l for _, l in want]
+
+def test_empty_batch():
+    assert len(score_batch([], [])) == 0
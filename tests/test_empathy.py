@@ -0,0 +1,53 @@
+import time
+import pytest
+from src.services import empathy, hyperclova_client
+
+@pytest.fixture
+def llm(monkeypatch):
+    """hyperclova_client.chat 대역: delay 초 뒤 답, 호출 수 기록"""
+    state = {"delay": 0.0, "calls": 0}
+    def chat(messages, **kw):
+        state["calls"] += 1
+        time.sleep(state["delay"])
+        return f"LLM 답 {state['calls']}"
+    monkeypatch.setattr(hyperclova_client, "chat", chat)
+    empathy._cache.clear()
+    yield state
+    empathy._cache.clear()
+
+def _wait_cached(text, timeout=2.0):
+    end = time.time() + timeout
+    while time.time() < end:
+        if empathy._cache_get(empathy._key(text)): return True
+        time.sleep(0.01)
+    return False
+
+def test_deadline_falls_back_to_local_template(llm):
+    llm["delay"] = 0.3
+    text = "요즘 시장이 너무 불안해요"
+    t0 = time.perf_counter()
+    out, src = empathy.reply(text, deadline=0.05)
+    assert time.perf_counter() - t0 < 0.25
+    assert src == "local" and out == empathy.local_reply(text)
+
+def test_late_answer_is_reused(llm):
+    llm["delay"] = 0.2
+    text = "후회가 커요"
+    assert empathy.reply(text, deadline=0.02)[1] == "local"
+    assert _wait_cached(text)
+    # 정규화 키: 공백/문장부호가 달라도 같은 입력
+    assert empathy.reply("후회가  커요!!", deadline=0.02) == ("LLM 답 1", "cache")
+    assert llm["calls"] == 1
+
+def test_on_time_answer_is_not_cached(llm):
+    assert empathy.reply("오늘은 괜찮아요")[1] == "llm"
+    assert empathy.reply("오늘은 괜찮아요") == ("LLM 답 2", "llm")
+    assert not empathy._cache
+
+def test_cached_answer_expires(llm, monkeypatch):
+    monkeypatch.setattr(empathy, "EMPATHY_CACHE_TTL_SEC", 0.05)
+    empathy._cache_put(empathy._key("잠이 안 와요"), "예전 답")
+    assert empathy.reply("잠이 안 와요", deadline=1.0) == ("예전 답", "cache")
+    time.sleep(0.1)
+    assert empathy.reply("잠이 안 와요", deadline=1.0) == ("LLM 답 1", "llm")
+    assert empathy._key("잠이 안 와요") not in empathy._cache
@@ -0,0 +1,60 @@
+import pytest
+from src import app as chat_app
+from src.services import hyperclova_client, session as session_mod
+from src.services.history import ConversationHistory
+
+TURNS = 500
+_PROMPT_OVERHEAD = 1000          # 프로필 system 메시지 + 지시문 틀
+TEXTS = ["요즘 시장이 너무 불안해요", "전액 해지할까 고민돼요", "후회가 커요", "물타기 해야 할까요", "오늘은 괜찮아요"]
+
+def _bound(h: ConversationHistory) -> int:
+    # render() 상한: 요약 1줄 + 최근 원문 (접두어 포함)
+    return len("[요약] ") + h.summary_chars + h.turns.maxlen * (h.turn_chars + len("상담사: ") + 1)
+
+def test_history_stays_flat():
+    h = ConversationHistory(max_turns=20, turn_chars=50, summary_chars=200)
+    for i in range(TURNS):
+        h.append({"role": "user", "content": f"{TEXTS[i % len(TEXTS)]} {i} " + "가" * 100})
+        h.append({"role": "assistant", "content": "답변 " * 40})
+        assert len(h) <= 20
+        assert len(h.summary()) <= 200
+        assert len(h.render()) <= _bound(h)
+    assert h.folded == 2 * TURNS - 20
+
+@pytest.fixture
+def stub_llm(monkeypatch):
+    calls = []
+    def chat(messages, **kwargs):
+        calls.append((kwargs.get("task"), sum(len(m["content"]) for m in messages)))
+        if kwargs.get("task") == "profile":
+            return '{"감정": "불안", "성향": "안정적"}'
+        return "말씀해 주셔서 고마워요. " * 30
+    monkeypatch.setattr(hyperclova_client, "chat", chat)
+    monkeypatch.setattr(session_mod, "TURN_LOG_ENABLED", False)
+    return calls
+
+def test_chat_session_prompts_stay_flat(stub_llm):
+    sid = "test-500-turns"
+    sess = chat_app.sessions.get(sid)
+    sess.state.update(await_name=False, name=None)
+    h = sess.history
+    profile_sizes = []
+    try:
+        for i in range(TURNS):
+            chat_app.chat(chat_app.ChatIn(text=f"{TEXTS[i % len(TEXTS)]} ({i}번째)", session_id=sid))
+            if i % 25 == 0:
+                chat_app.finalize_profile_from_log(h)
+                profile_sizes.append(stub_llm[-1][1])
+            assert len(h) <= h.turns.maxlen
+            assert len(h.summary()) <= h.summary_chars
+    finally:
+        chat_app.sessions.drop(sid)
+
+    assert len(h) == h.turns.maxlen and h.folded == 2 * TURNS - h.turns.maxlen
+    # 공감 프롬프트: 고정 접두부 + 이번 발화뿐
+    empathy_sizes = [n for task, n in stub_llm if task == "empathy"]
+    assert max(empathy_sizes) - min(empathy_sizes) < 20
+    # 프로필 프롬프트: 링이 찬 뒤에는 상한 안에서 평탄
+    filled = profile_sizes[len(profile_sizes) // 4:]
+    assert max(filled) <= _PROMPT_OVERHEAD + _bound(h)
+    assert max(filled) - min(filled) <= h.summary_chars
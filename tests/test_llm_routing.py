@@ -0,0 +1,50 @@
+import time
+from src.services import hyperclova_client as hc
+
+def _fresh():
+    return hc._Latency()
+
+def test_slow_reports_do_not_reroute_empathy():
+    lat = _fresh()
+    primary = hc.PROFILES["empathy"].model
+    for _ in range(20):
+        lat.record("report", primary, 20.0)      # 긴 리포트 호출
+        lat.record("empathy", primary, 0.8)      # 짧은 공감 호출은 빠름
+    assert lat.route("empathy", hc.PROFILES["empathy"]) == primary
+
+def test_slow_empathy_routes_to_light_model_with_probes():
+    lat = _fresh()
+    prof = hc.PROFILES["empathy"]
+    for _ in range(20):
+        lat.record("empathy", prof.model, prof.budget_sec + 1)
+    models = [lat.route("empathy", prof) for _ in range(hc._PROBE_EVERY)]
+    assert models.count(prof.light_model) == hc._PROBE_EVERY - 1
+    assert models[-1] == prof.model              # 주기적으로 기본 모델 재측정
+
+def test_chat_records_under_task(monkeypatch):
+    class R:
+        status_code = 200
+        def raise_for_status(self): pass
+        def json(self): return {"result": {"message": {"content": "ok"}}}
+    sent = []
+    monkeypatch.setattr(hc, "latency", _fresh())
+    monkeypatch.setattr(hc.requests, "post", lambda url, headers, json, timeout: sent.append((url, json["maxTokens"])) or R())
+    assert hc.chat([{"role": "user", "content": "x"}], task="profile") == "ok"
+    hc.chat([{"role": "user", "content": "x"}], task="unknown")
+    assert sent[0][1] == hc.PROFILES["profile"].max_tokens
+    assert sent[0][0].endswith(hc.PROFILES["profile"].model)
+    assert set(hc.latency.stats()["calls"]) == {f"profile:{hc.PROFILES['profile'].model}",
+                                                  f"default:{hc.PROFILES['default'].model}"}
+
+def test_recovers_once_slow_window_passes():
+    lat = hc._Latency(window_sec=0.1)
+    prof = hc.PROFILES["empathy"]
+    for _ in range(100):
+        lat.record("empathy", prof.model, prof.budget_sec + 1)
+    assert lat.route("empathy", prof) == prof.light_model
+    time.sleep(0.15)
+    # 느린 구간이 창 밖으로 빠지면 바로 기본 모델로 돌아가 다시 잰다
+    assert lat.route("empathy", prof) == prof.model
+    for _ in range(hc._MIN_SAMPLES):
+        lat.record("empathy", prof.model, 0.5)
+    assert lat.route("empathy", prof) == prof.model
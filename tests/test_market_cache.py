@@ -0,0 +1,109 @@
+import math, multiprocessing as mp, time, zlib
+import pytest
+from src.services import market_cache
+from src.services.market_cache import MarketCache
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "market.cache")
+
+def _colliding(slots, n):
+    """crc32 % slots 가 같은 ticker n개"""
+    out, i = [], 0
+    while len(out) < n:
+        t = f"C{i}.KS"; i += 1
+        if zlib.crc32(t.encode()) % slots == 0: out.append(t)
+    return out
+
+def test_put_get_and_partial_update(path):
+    w = MarketCache(path, slots=16, writable=True)
+    w.put("005930.KS", price=80000.0, beta=1.0, now=100.0)
+    w.put("005930.KS", price=81000.0, now=200.0)          # 베타는 그대로
+    assert MarketCache(path).get("005930.KS") == (81000.0, 1.0, 200.0, 100.0)
+    w.put("SPY", beta=1.1, now=300.0)
+    p, b, pts, bts = MarketCache(path).get("SPY")
+    assert math.isnan(p) and pts == 0.0 and (b, bts) == (1.1, 300.0)
+
+def test_unknown_ticker_is_none_and_not_claimed(path):
+    w = MarketCache(path, slots=8, writable=True)
+    w.put("A.KS", price=1.0)
+    r = MarketCache(path)
+    assert r.get("NOPE.KS") is None
+    assert w._find("NOPE.KS") is None
+
+def test_linear_probing_keeps_colliding_tickers_apart(path):
+    a, b, c = _colliding(8, 3)
+    w = MarketCache(path, slots=8, writable=True)
+    for n, t in enumerate((a, b, c)):
+        w.put(t, price=float(n))
+    assert [w._slot_of[t] for t in (a, b, c)] == [0, 1, 2]
+    r = MarketCache(path)                                   # 새 프로세스처럼 슬롯 맵 없이 탐사
+    assert [r.get(t)[0] for t in (c, b, a)] == [2.0, 1.0, 0.0]
+
+def test_full_table(path):
+    w = MarketCache(path, slots=2, writable=True)
+    w.put("A.KS", price=1.0); w.put("B.KS", price=2.0)
+    with pytest.raises(RuntimeError):
+        w.put("C.KS", price=3.0)
+    assert MarketCache(path).get("C.KS") is None            # 빈 슬롯이 없어도 끝까지 보고 None
+    assert MarketCache(path).get("B.KS")[0] == 2.0
+
+def test_rejects_foreign_file(tmp_path):
+    p = tmp_path / "other.bin"
+    p.write_bytes(b"\0" * 128)
+    with pytest.raises(ValueError):
+        MarketCache(str(p))
+
+class _ScriptedSeq:
+    """seq 읽기 값을 순서대로 돌려주는 _SEQ 대역 (쓰기는 진짜 struct 로)"""
+    def __init__(self, values):
+        self.values = list(values)
+        self.reads = 0
+    def unpack_from(self, mm, off):
+        self.reads += 1
+        return (self.values.pop(0),) if self.values else market_cache.struct.Struct("<I").unpack_from(mm, off)
+    def pack_into(self, *a):
+        market_cache.struct.Struct("<I").pack_into(*a)
+
+def test_seqlock_retries_while_writing_or_changed(path, monkeypatch):
+    w = MarketCache(path, slots=8, writable=True)
+    w.put("A.KS", price=5.0, beta=0.5, now=1.0)             # seq = 2
+    r = MarketCache(path)
+    r._find("A.KS")
+    # 쓰는 중(홀수) → 읽는 사이 바뀜(2→4) → 안정(4, 4)
+    seq = _ScriptedSeq([1, 2, 4, 4, 4])
+    monkeypatch.setattr(market_cache, "_SEQ", seq)
+    assert r.get("A.KS") == (5.0, 0.5, 1.0, 1.0)
+    assert seq.reads == 5
+
+def test_stalled_writer_gives_up(path, monkeypatch):
+    w = MarketCache(path, slots=8, writable=True)
+    w.put("A.KS", price=5.0)
+    off = w._off(w._slot_of["A.KS"])
+    market_cache._SEQ.pack_into(w._mm, off, 3)              # 홀수로 멈춘 writer
+    assert MarketCache(path).get("A.KS") is None
+
+def _writer(path, stop_at):
+    w = MarketCache(path, writable=True)
+    i = 0
+    while time.time() < stop_at:
+        i += 1
+        w.put("A.KS", price=float(i), beta=float(i), now=float(i))
+
+def test_reader_never_sees_torn_record_across_processes(path):
+    MarketCache(path, slots=8, writable=True).put("A.KS", price=0.0, beta=0.0, now=0.0)
+    ctx = mp.get_context("fork" if "fork" in mp.get_all_start_methods() else "spawn")
+    proc = ctx.Process(target=_writer, args=(path, time.time() + 0.5))
+    proc.start()
+    r = MarketCache(path)
+    seen = set()
+    try:
+        while proc.is_alive():
+            got = r.get("A.KS")
+            if got is None: continue
+            p, b, pts, bts = got
+            assert p == b == pts == bts                     # 한 레코드의 값은 항상 같은 쓰기에서 온다
+            seen.add(p)
+    finally:
+        proc.join()
+    assert len(seen) > 1
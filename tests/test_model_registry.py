@@ -0,0 +1,21 @@
+import pytest
+from src.services import portfolio_model as pm
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setattr(pm, "_models", pm.OrderedDict())
+    monkeypatch.setattr(pm, "PORTFOLIO_MODEL_MAX", 1)
+    return pm._models
+
+def test_registry_is_bounded_lru(engine, registry):
+    a = pm.get_model(engine, "이현주")
+    assert pm.get_model(engine, "이현주") is a
+    pm.get_model(engine, "김철수")
+    assert list(registry) == ["김철수"]          # 가장 오래 안 쓴 모델부터 버림
+    assert pm.peek_model("이현주") is None
+
+def test_peek_drops_expired(engine, registry):
+    model = pm.get_model(engine, "이현주")
+    model.loaded_at -= pm.PORTFOLIO_MODEL_TTL_SEC + 1
+    assert pm.peek_model("이현주") is None
+    assert len(registry) == 0
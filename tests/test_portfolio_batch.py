@@ -0,0 +1,41 @@
+import pandas as pd
+import pytest
+from src.services.portfolio import (
+    load_all_portfolios, enrich_capm, attach_live_values, maturity_projection, project_portfolios,
+)
+from src.services.portfolio_model import PortfolioModel, price_all_users
+from src.services import snapshot
+
+TODAY = "2025-01-15"
+
+def test_project_portfolios_matches_maturity_projection(engine, live_prices):
+    _, df = load_all_portfolios(engine)
+    df = attach_live_values(enrich_capm(engine, df), live_prices)
+    proj, summary = project_portfolios(df, TODAY)
+    assert set(summary.index) == {1, 2}
+    for uid, d in df.groupby('user_id'):
+        ref, years_left, current_total, forecast_total, msg = maturity_projection(d, d['account_date'].iloc[0], TODAY)
+        assert proj.loc[d.index, 'forecast_value_at_maturity'].tolist() == ref['forecast_value_at_maturity'].tolist()
+        s = summary.loc[uid]
+        assert s['years_left'] == pytest.approx(years_left)
+        assert s['current_total'] == pytest.approx(current_total)
+        assert s['forecast_total'] == forecast_total
+        assert s['mix_rm_msg'] == msg
+
+def test_price_all_users_matches_per_user_model(engine, live_prices):
+    batch = dict(price_all_users(engine, TODAY))
+    assert set(batch) == {"이현주", "김철수"}
+    for name, got in batch.items():
+        want = PortfolioModel(engine, name).refresh(today=TODAY)
+        for k in ("user_id", "years_left", "mix_rm_msg", "report_prompts"):
+            assert got[k] == want[k]
+        assert got["current_total"] == pytest.approx(want["current_total"])
+        assert got["forecast_total"] == pytest.approx(want["forecast_total"])
+        pd.testing.assert_frame_equal(got["overall_cur"], want["overall_cur"])
+        pd.testing.assert_frame_equal(got["overall_mat"], want["overall_mat"])
+
+def test_refresh_snapshots_writes_in_batches(engine, live_prices, monkeypatch):
+    batches = []
+    monkeypatch.setattr(snapshot, "write_snapshots", lambda eng, rows: batches.append([r["name"] for r in rows]))
+    assert snapshot.refresh_snapshots(engine, batch_size=1) == 2
+    assert sorted(sum(batches, [])) == ["김철수", "이현주"] and len(batches) == 2
@@ -0,0 +1,49 @@
+import pandas as pd
+import pytest
+from conftest import PRICES
+from src.services.portfolio_model import PortfolioModel
+
+DAY1, DAY2 = "2024-06-01", "2024-06-02"
+
+@pytest.fixture
+def engine2(engine):
+    """같은 자산명(삼성전자)이 두 종목에 걸친 행을 추가 — 세금은 자산명 기준으로 합산된다"""
+    with engine.begin() as c:
+        c.exec_driver_sql("INSERT INTO assets VALUES (6,1,'주식','삼성전자','005935.KS','domestic',5,500000,8,0.95)")
+    return engine
+
+def _same(a: dict, b: dict):
+    for k in ("years_left", "current_total", "forecast_total", "mix_rm_msg", "report_prompts"):
+        assert a[k] == pytest.approx(b[k]) if isinstance(a[k], float) else a[k] == b[k], k
+    for k in ("overall_cur", "overall_mat"):
+        pd.testing.assert_frame_equal(a[k].reset_index(drop=True), b[k].reset_index(drop=True))
+
+def _full(engine, prices, today):
+    return PortfolioModel(engine, "이현주").reprice(prices, today=today)
+
+PRICES2 = {**PRICES, "005935.KS": 70000.0}
+
+@pytest.mark.parametrize("ticker", ["005930.KS", "005935.KS", "SPY"])
+def test_partial_reprice_matches_full(engine2, ticker):
+    model = PortfolioModel(engine2, "이현주")
+    model.reprice(PRICES2, today=DAY1)
+    moved = {**PRICES2, ticker: PRICES2[ticker] * 1.07}
+    partial = model.reprice({ticker: moved[ticker]}, today=DAY1)
+    _same(partial, _full(engine2, moved, DAY1))
+
+def test_unchanged_prices_keep_result(engine2):
+    model = PortfolioModel(engine2, "이현주")
+    first = model.reprice(PRICES2, today=DAY1)
+    version = model.version
+    assert model.reprice(PRICES2, today=DAY1) is first and model.version == version
+
+def test_years_left_change_recomputes_everything(engine2):
+    model = PortfolioModel(engine2, "이현주")
+    model.reprice(PRICES2, today=DAY1)
+    moved = {**PRICES2, "005930.KS": 90000.0}
+    out = model.reprice({"005930.KS": 90000.0}, today=DAY2)
+    assert out["years_left"] < _full(engine2, moved, DAY1)["years_left"]
+    _same(out, _full(engine2, moved, DAY2))
+    # 가격 변화 없이 날짜만 바뀌어도 다시 계산
+    day3 = model.reprice({}, today="2024-06-03")
+    _same(day3, _full(engine2, moved, "2024-06-03"))
@@ -0,0 +1,34 @@
+import pytest
+from fastapi.testclient import TestClient
+from src import app as chat_app
+from src.services import portfolio_model
+
+@pytest.fixture
+def client(engine, live_prices, monkeypatch):
+    monkeypatch.setattr(chat_app, "get_db", lambda: engine)
+    yield TestClient(chat_app.app)
+    portfolio_model.drop_model("이현주")
+
+def test_summary_matches_schema(client):
+    r = client.get("/portfolio/summary", params={"user_name": "이현주"})
+    assert r.status_code == 200
+    body = r.json()
+    assert set(body) == set(chat_app.PortfolioSummaryOut.model_fields)
+    chat_app.PortfolioSummaryOut.model_validate(body)
+    assert r.headers["etag"]
+    assert client.get("/portfolio/summary", params={"user_name": "이현주"},
+                      headers={"If-None-Match": r.headers["etag"]}).status_code == 304
+
+def test_summary_rejects_payload_outside_schema(client, monkeypatch):
+    monkeypatch.setattr(chat_app, "summary_payload", lambda name, result: {"user_name": name})
+    with pytest.raises(Exception):
+        client.get("/portfolio/summary", params={"user_name": "이현주"})
+
+def test_max_age_zero_skips_snapshot_read_and_write(client, monkeypatch):
+    calls = []
+    monkeypatch.setattr(chat_app, "read_snapshot", lambda *a: calls.append("read"))
+    monkeypatch.setattr(chat_app, "write_snapshots", lambda *a: calls.append("write"))
+    assert client.get("/portfolio/summary", params={"user_name": "이현주", "max_age": 0}).status_code == 200
+    assert calls == []
+    assert client.get("/portfolio/summary", params={"user_name": "이현주", "max_age": 60}).status_code == 200
+    assert calls == ["read", "write"]
@@ -0,0 +1,47 @@
+import itertools
+import pytest
+from fastapi.testclient import TestClient
+from src import app as chat_app
+from src.services.portfolio_model import PortfolioModel, reprice
+
+def test_first_ws_payload_is_fully_priced(engine, live_prices, monkeypatch):
+    model = PortfolioModel(engine, "이현주")
+    assert model.result is None
+    expected = PortfolioModel(engine, "이현주").refresh()
+    monkeypatch.setattr(chat_app, "get_model", lambda db, name: model)
+    # 피드는 한 종목만 밀어준다: 첫 메시지가 이 부분 시세로 계산되면 안 된다
+    monkeypatch.setattr(chat_app.price_feed, "fetch", lambda t: 90000.0 if t == "005930.KS" else None)
+    with TestClient(chat_app.app).websocket_connect("/ws/portfolio?user_name=이현주") as ws:
+        first = ws.receive_json()
+    assert first["type"] == "valuation"
+    assert first["current_total"] == pytest.approx(expected["current_total"])
+    assert first["forecast_total"] == pytest.approx(expected["forecast_total"])
+
+def test_push_ignored_until_model_priced(engine, monkeypatch):
+    from src.services import portfolio_model
+    model = PortfolioModel(engine, "이현주")
+    monkeypatch.setitem(portfolio_model._models, "이현주", model)
+    assert reprice("이현주", {"005930.KS": 90000.0}) is None
+    assert model.result is None
+
+def test_ws_reloads_expired_model_and_resubscribes(engine, live_prices, monkeypatch):
+    from src.services.portfolio_model import PORTFOLIO_MODEL_TTL_SEC
+    old = PortfolioModel(engine, "이현주")
+    with engine.begin() as c:
+        c.exec_driver_sql("DELETE FROM assets WHERE ticker='SPY'")     # 연결 중에 보유 종목이 바뀜
+    new = PortfolioModel(engine, "이현주")
+    models = [old, new]
+    monkeypatch.setattr(chat_app, "get_model", lambda db, name: models.pop(0) if len(models) > 1 else models[0])
+    tick = itertools.count(1)
+    monkeypatch.setattr(chat_app.price_feed, "fetch", lambda t: 80000.0 + next(tick) if t == "005930.KS" else None)
+    monkeypatch.setattr(chat_app.price_feed, "interval", 0.02)
+    with TestClient(chat_app.app).websocket_connect("/ws/portfolio?user_name=이현주") as ws:
+        assert len(ws.receive_json()["assets"]) == 4
+        old.loaded_at -= PORTFOLIO_MODEL_TTL_SEC + 1
+        for _ in range(50):
+            msg = ws.receive_json()
+            if len(msg["assets"]) == len(new.tickers): break    # 새 모델의 전체 평가
+        assert {a["ticker"] for a in msg["assets"]} == set(new.tickers)
+        assert "SPY" not in chat_app.price_feed.subs
+        assert set(new.tickers) <= set(chat_app.price_feed.subs)
+        assert msg["current_total"] == pytest.approx(new.result["current_total"])
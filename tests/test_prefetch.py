@@ -0,0 +1,87 @@
+import threading, time
+import pytest
+from src import app as chat_app
+from src.cli.run_console import make_stub_llm
+from src.services import hyperclova_client, prefetch, session as session_mod
+from src.services.prefetch import Prefetcher
+
+RESULT = {"report_prompts": {"current": "c", "maturity": "m"}}
+
+def _blocking():
+    gate = threading.Event()
+    def build(name):
+        gate.wait(2.0)
+        return RESULT
+    return gate, build
+
+def test_result_is_reused_not_rebuilt():
+    calls = []
+    p = Prefetcher(max_workers=1, max_pending=2)
+    spec = p.start("이현주", lambda name: calls.append(name) or RESULT)
+    assert spec.result("이현주") is RESULT
+    assert spec.result("이현주") is RESULT and calls == ["이현주"]
+    assert spec.result("김철수") is None              # 다른 사용자 결과는 쓰지 않는다
+
+def test_expired_result_is_not_used(monkeypatch):
+    monkeypatch.setattr(prefetch, "PREFETCH_TTL_SEC", 0.05)
+    spec = Prefetcher(max_workers=1, max_pending=2).start("이현주", lambda name: RESULT)
+    assert spec.result("이현주") is RESULT
+    time.sleep(0.1)
+    assert spec.result("이현주") is None
+
+def test_skips_when_max_pending_reached():
+    gate, build = _blocking()
+    p = Prefetcher(max_workers=1, max_pending=1)
+    first = p.start("이현주", build)
+    assert p.start("김철수", build) is None
+    assert p.stats() == {"pending": 1, "started": 1, "skipped": 1}
+    gate.set()
+    assert first.result("이현주") is RESULT
+    assert p.start("김철수", lambda name: RESULT) is not None
+
+def test_queued_speculation_is_cancelled_by_caller():
+    gate, build = _blocking()
+    p = Prefetcher(max_workers=1, max_pending=2)
+    p.start("이현주", build)
+    queued = p.start("김철수", build)
+    assert queued.result("김철수") is None            # 아직 시작 전 → 취소하고 직접 계산
+    assert queued.future.cancelled()
+    gate.set()
+
+@pytest.fixture
+def chat_env(engine, monkeypatch):
+    built = []
+    def build(name, user_id=None):
+        built.append(name)
+        return {**RESULT, "name": name}
+    monkeypatch.setattr(session_mod, "TURN_LOG_ENABLED", False)
+    monkeypatch.setattr(chat_app, "get_db", lambda: engine)
+    monkeypatch.setattr(chat_app, "build_portfolio_for_user", build)
+    monkeypatch.setattr(chat_app, "prefetcher", Prefetcher(max_workers=1, max_pending=4))
+    monkeypatch.setattr(prefetch, "PREFETCH_REPORTS", False)
+    monkeypatch.setattr(hyperclova_client, "chat", make_stub_llm())
+    return built
+
+def _session(sid):
+    return chat_app.sessions.get(sid)
+
+def test_chat_reuses_login_prefetch(chat_env):
+    sid = "test-prefetch-reuse"
+    try:
+        chat_app.chat(chat_app.ChatIn(text="이현주", session_id=sid))
+        out = chat_app.chat(chat_app.ChatIn(text="포트폴리오", session_id=sid))
+    finally:
+        chat_app.sessions.drop(sid)
+    assert "포트폴리오 요약을 준비했어요" in out["reply"]
+    assert chat_env == ["이현주"]                      # 로그인 때 한 번만 계산
+
+def test_exit_cancels_prefetch(chat_env):
+    sid = "test-prefetch-exit"
+    try:
+        chat_app.chat(chat_app.ChatIn(text="이현주", session_id=sid))
+        spec = _session(sid).speculation
+        assert spec is not None
+        chat_app.chat(chat_app.ChatIn(text="종료", session_id=sid))
+        assert spec.cancelled.is_set() and _session(sid).speculation is None
+    finally:
+        chat_app.sessions.drop(sid)
@@ -0,0 +1,54 @@
+import time
+from types import SimpleNamespace
+from src.services import profiler
+
+def _req(token):
+    return SimpleNamespace(headers={"x-profile": token} if token is not None else {})
+
+def test_profile_header_requires_exact_token(monkeypatch):
+    monkeypatch.setattr(profiler, "ADMIN_TOKEN", "s3cret")
+    monkeypatch.setattr(profiler, "PROFILE_SAMPLE_RATE", 0)
+    monkeypatch.setattr(profiler, "PROFILE_SLOW_MS", 0)
+    assert profiler._trigger(_req("s3cret")) == ("header", 0.0)
+    assert profiler._trigger(_req("s3cre")) is None
+    assert profiler._trigger(_req("ünicode")) is None
+    assert profiler._trigger(_req(None)) is None
+
+def test_no_admin_token_never_matches(monkeypatch):
+    monkeypatch.setattr(profiler, "ADMIN_TOKEN", "")
+    monkeypatch.setattr(profiler, "PROFILE_SAMPLE_RATE", 0)
+    monkeypatch.setattr(profiler, "PROFILE_SLOW_MS", 0)
+    assert profiler._trigger(_req("")) is None
+
+def _capture(monkeypatch, work):
+    p = profiler.Profiler(interval_ms=1)
+    monkeypatch.setattr(profiler, "profiler", p)
+    cap = p.begin("GET", "/t", "header")
+    token = profiler._current.set(cap)
+    try:
+        work()
+    finally:
+        profiler._current.reset(token)
+        p.end(cap, 0.0, 200, keep=True)
+    return cap
+
+def test_quote_fanout_frames_are_sampled(monkeypatch):
+    from src.services import capm
+    def slow_quote(t):
+        time.sleep(0.15); return 1.0
+    monkeypatch.setattr(capm, "get_live_price_yf", slow_quote)
+    cap = _capture(monkeypatch, lambda: capm.get_live_prices(["A.KS", "B.KS"]))
+    assert any("slow_quote" in s for s in cap.stacks)
+    assert not cap.threads          # 워커는 끝나면 캡처에서 빠진다
+
+def test_llm_pool_frames_are_sampled(monkeypatch):
+    from src.services import empathy, hyperclova_client
+    def slow_chat(messages, **kw):
+        time.sleep(0.15); return "네, 그러셨군요."
+    monkeypatch.setattr(hyperclova_client, "chat", slow_chat)
+    cap = _capture(monkeypatch, lambda: empathy.reply("프로파일 테스트용 고유 발화입니다", deadline=2.0))
+    assert any("slow_chat" in s for s in cap.stacks)
+
+def test_carry_without_capture_is_identity():
+    fn = lambda: None
+    assert profiler.carry(fn) is fn
@@ -0,0 +1,66 @@
+import time
+import pytest
+from src.services.bulkhead import BulkheadFull
+from src.services.providers import Source, TieredProvider
+
+def _provider(*sources, workers=4):
+    return TieredProvider("t", list(sources), negative_ttl=60, max_workers=workers)
+
+def _raise(exc):
+    def fn(key): raise exc
+    return fn
+
+def test_first_hit_wins():
+    p = _provider(Source("a", lambda k: 1.0, 1.0), Source("b", lambda k: 2.0, 1.0))
+    assert p.get("X") == 1.0
+
+def test_exception_plus_miss_is_negative_cached():
+    calls = []
+    p = _provider(Source("a", _raise(KeyError("lastPrice")), 1.0), Source("b", lambda k: calls.append(k), 1.0))
+    assert p.get("GONE") is None
+    assert p.get("GONE") is None
+    assert calls == ["GONE"] and p.stats()["negative_hits"] == 1
+
+@pytest.mark.parametrize("exc", [OSError("reset"), TimeoutError()])
+def test_transient_errors_not_cached(exc):
+    p = _provider(Source("a", _raise(exc), 1.0), Source("b", lambda k: None, 1.0))
+    assert p.get("X") is None
+    assert p.stats()["negative_cached"] == 0
+
+def test_budget_starts_when_call_runs():
+    # 풀(1개)이 0.3초 동안 막혀 있어도, 실행 후 0.4초 안에 끝나면 시간 초과가 아니다
+    src = Source("a", lambda k: (time.sleep(0.3), 7.0)[1], 0.4)
+    p = _provider(src, workers=1)
+    p._pool.submit(time.sleep, 0.3)
+    assert p.get("X") == 7.0
+    assert src.timeouts == 0
+
+def test_queued_past_budget_is_shed_not_run():
+    ran = []
+    src = Source("a", lambda k: ran.append(k) or 1.0, 0.1)
+    p = _provider(src, workers=1)
+    p._pool.submit(time.sleep, 0.3)
+    with pytest.raises(BulkheadFull):           # 어느 공급원도 실행하지 못함 = 과부하
+        p.get("X")
+    time.sleep(0.35)
+    assert ran == [] and src.shed == 1 and src.timeouts == 0
+    assert p.stats()["negative_cached"] == 0
+
+def test_abandoned_calls_are_capped():
+    src = Source("slow", lambda k: (time.sleep(0.4), 1.0)[1], 0.05)
+    p = _provider(src, workers=2)                # max_abandoned = 1
+    assert p.get("A") is None and src.timeouts == 1
+    assert p.abandoned == 1
+    t0 = time.perf_counter()
+    with pytest.raises(BulkheadFull):            # 새 호출을 보내지 않고 바로 과부하로 알림
+        p.get("B")
+    assert time.perf_counter() - t0 < 0.05 and src.shed == 1
+    assert p.stats()["negative_cached"] == 0
+    time.sleep(0.45)
+    assert p.abandoned == 0
+
+def test_bulkhead_rejection_is_raised_not_cached():
+    p = _provider(Source("a", _raise(BulkheadFull("quote: queue full")), 1.0), Source("b", lambda k: 1.0, 1.0))
+    with pytest.raises(BulkheadFull):
+        p.get("X")
+    assert p.stats()["negative_cached"] == 0
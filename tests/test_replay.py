@@ -0,0 +1,33 @@
+import asyncio
+import pytest
+from src import app as chat_app
+from src.cli import run_console
+from src.services import hyperclova_client, session as session_mod
+
+@pytest.fixture
+def replay_env(monkeypatch):
+    monkeypatch.setattr(hyperclova_client, "chat", run_console.make_stub_llm())
+    # replay() 가 끄는 전역 설정은 테스트 후 되돌린다
+    monkeypatch.setattr(session_mod, "TURN_LOG_ENABLED", session_mod.TURN_LOG_ENABLED)
+    monkeypatch.setattr(chat_app.prefetcher, "max_pending", chat_app.prefetcher.max_pending)
+
+def test_synth_pool_has_no_portfolio_intent():
+    for s in run_console.synth_scripts(50):
+        assert not any(chat_app.is_portfolio_intent(t) for t in s["turns"])
+
+def test_replay_is_deterministic_and_quiet(replay_env):
+    scripts = run_console.synth_scripts(20, turns=6)
+    report, recorded = asyncio.run(run_console.replay(scripts, concurrency=4))
+    assert report["scripts"] == 20 and report["turns"] == 120
+    assert report["errors"] == 0
+    assert session_mod.TURN_LOG_ENABLED is False and chat_app.prefetcher.max_pending == 0
+
+    # 기록한 관측값을 기준으로 다시 재생하면 불일치가 없어야 한다
+    again, _ = asyncio.run(run_console.replay(recorded, concurrency=4))
+    assert again["errors"] == 0 and again["emotion_mismatches"] == 0
+
+def test_guest_falling_back_to_name_prompt_is_an_error(replay_env):
+    report, recorded = asyncio.run(run_console.replay(
+        [{"id": "g", "turns": ["불안해요", "ISA 포트폴리오 보여줘", "후회가 커요"]}], concurrency=1))
+    assert report["errors"] == 1
+    assert recorded[0]["turns"][1]["error"] == "guest fell back to name prompt"
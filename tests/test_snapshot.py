@@ -0,0 +1,39 @@
+import datetime as dt
+import json
+import pytest
+from src.services.snapshot import read_snapshot
+
+@pytest.fixture
+def snap_engine(engine):
+    with engine.begin() as c:
+        c.exec_driver_sql("CREATE TABLE portfolio_snapshot (user_id INT PRIMARY KEY, user_name TEXT, priced_at TIMESTAMP, "
+                          "checked_at TIMESTAMP, years_left REAL, current_total REAL, forecast_total REAL, mix_rm_msg TEXT, "
+                          "overall_cur TEXT, overall_mat TEXT, report_prompts TEXT)")
+    return engine
+
+def _put(engine, priced_ago, checked_ago):
+    now = dt.datetime.utcnow()
+    at = lambda ago: None if ago is None else (now - dt.timedelta(seconds=ago)).isoformat(sep=" ")
+    with engine.begin() as c:
+        c.exec_driver_sql("DELETE FROM portfolio_snapshot")
+        c.exec_driver_sql("INSERT INTO portfolio_snapshot VALUES (1,'이현주',?,?,1.5,1e7,1.2e7,'ok',?,?,?)",
+                          (at(priced_ago), at(checked_ago), "[]", "[]", json.dumps({"current": "", "maturity": ""})))
+
+def test_fresh_by_checked_at_even_if_values_unchanged(snap_engine):
+    # 값은 한 시간 전에 마지막으로 바뀌었지만 시세는 방금 확인했다
+    _put(snap_engine, priced_ago=3600, checked_ago=5)
+    snap = read_snapshot(snap_engine, "이현주", max_age_sec=60)
+    assert snap is not None and snap["source"] == "snapshot"
+    # 응답의 priced_at 은 값이 바뀐 시각 그대로 (ETag/Last-Modified 용)
+    age = dt.datetime.utcnow() - dt.datetime.fromisoformat(snap["priced_at"].rstrip("Z"))
+    assert age > dt.timedelta(seconds=3000)
+
+def test_stale_when_not_checked_recently(snap_engine):
+    _put(snap_engine, priced_ago=120, checked_ago=120)
+    assert read_snapshot(snap_engine, "이현주", max_age_sec=60) is None
+    assert read_snapshot(snap_engine, "이현주", max_age_sec=300) is not None
+
+def test_rows_before_checked_at_column_fall_back_to_priced_at(snap_engine):
+    _put(snap_engine, priced_ago=5, checked_ago=None)
+    assert read_snapshot(snap_engine, "이현주", max_age_sec=60) is not None
+    assert read_snapshot(snap_engine, "김철수", max_age_sec=60) is None
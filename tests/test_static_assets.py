@@ -0,0 +1,80 @@
+import gzip
+import pytest
+from fastapi.testclient import TestClient
+from src import app as chat_app
+from src.services import static_assets
+from src.services.static_assets import AssetBundle, Asset, respond, IMMUTABLE, REVALIDATE
+
+CSS = b"body { color: #333; }\n" * 200
+
+class _FakeBrotli:
+    @staticmethod
+    def compress(body, quality=11):
+        return b"BR" + gzip.compress(body, mtime=0)[:-8]       # gzip 보다 항상 짧게
+
+@pytest.fixture
+def site(tmp_path, monkeypatch):
+    monkeypatch.setattr(static_assets, "brotli", _FakeBrotli)
+    static = tmp_path / "static"; static.mkdir()
+    (static / "chat.css").write_bytes(CSS)
+    (static / "logo.png").write_bytes(b"\x89PNG" + bytes(range(256)))
+    page = tmp_path / "chat.html"
+    page.write_text('<link href="/static/chat.css"><img src="/static/logo.png">' + "<p>안녕</p>" * 200, encoding="utf-8")
+    return static, page
+
+def test_fingerprinted_urls_are_rewritten(site):
+    static, page = site
+    b = AssetBundle(static, page)
+    css_url = b.urls["chat.css"]
+    assert css_url.startswith("/static/chat.") and css_url.endswith(".css") and css_url != "/static/chat.css"
+    html = b.page.body.decode()
+    assert css_url in html and b.urls["logo.png"] in html and "/static/chat.css" not in html
+    assert b.get(css_url.rsplit("/", 1)[1]).body == CSS
+    assert b.get(css_url.rsplit("/", 1)[1]).cache_control == IMMUTABLE and b.page.cache_control == REVALIDATE
+    # 내용이 바뀌면 URL 도 바뀐다
+    (static / "chat.css").write_bytes(CSS + b"a{}")
+    assert AssetBundle(static, page).urls["chat.css"] != css_url
+
+def test_binary_assets_are_not_precompressed(site):
+    b = AssetBundle(*site)
+    assert b.get(b.urls["logo.png"].rsplit("/", 1)[1]).encoded == {}
+
+def test_not_modified(site):
+    asset = AssetBundle(*site).page
+    r = respond(asset, asset.etag, "gzip")
+    assert r.status_code == 304 and r.body == b""
+    assert r.headers["etag"] == asset.etag and r.headers["cache-control"] == REVALIDATE
+    assert respond(asset, '"other"', None).status_code == 200
+
+@pytest.mark.parametrize("accept, expected", [
+    ("gzip, deflate, br", "br"),
+    ("gzip", "gzip"),
+    ("br;q=0, gzip", "gzip"),
+    ("br, gzip;q=0", "br"),
+    ("gzip;q=0", None),
+    ("br;q=0.0, gzip;q=0", None),
+    ("*", "br"),
+    ("identity", None),
+    (None, None),
+])
+def test_encoding_selection(site, accept, expected):
+    asset = Asset.build(CSS, "text/css; charset=utf-8", IMMUTABLE)
+    r = respond(asset, None, accept)
+    assert r.headers.get("content-encoding") == expected
+    assert r.body == (asset.encoded[expected] if expected else CSS)
+    assert r.headers["vary"] == "Accept-Encoding"
+
+def test_gzip_middleware_leaves_preencoded_alone(site, monkeypatch):
+    b = AssetBundle(*site)
+    monkeypatch.setattr(chat_app, "assets", b)
+    client = TestClient(chat_app.app)
+    url = b.urls["chat.css"]
+    r = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert r.headers["content-encoding"] == "gzip"
+    assert r.content == CSS                                    # 한 번만 압축됨 (이중 gzip 아님)
+    assert int(r.headers["content-length"]) == len(b.get(url.rsplit("/", 1)[1]).encoded["gzip"])
+    with client.stream("GET", url, headers={"Accept-Encoding": "br"}) as r:
+        assert r.headers["content-encoding"] == "br"
+        assert b"".join(r.iter_raw()) == b.get(url.rsplit("/", 1)[1]).encoded["br"]
+    page = client.get("/", headers={"Accept-Encoding": "gzip", "If-None-Match": b.page.etag})
+    assert page.status_code == 304
@@ -0,0 +1,86 @@
+import time
+import pytest
+from src.services.turn_log import TurnLog
+
+@pytest.fixture
+def db(engine):
+    with engine.begin() as c:
+        c.exec_driver_sql("CREATE TABLE conversation_turns (id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT, "
+                          "user_name TEXT, turn_no INT, role TEXT, content TEXT, anxiety REAL, loss_aversion REAL, created_at TEXT)")
+    return engine
+
+def _contents(engine) -> list[str]:
+    with engine.connect() as c:
+        return [r[0] for r in c.exec_driver_sql("SELECT content FROM conversation_turns ORDER BY id")]
+
+def _until(cond, timeout=2.0):
+    end = time.time() + timeout
+    while time.time() < end:
+        if cond(): return True
+        time.sleep(0.01)
+    return False
+
+def test_flushes_when_batch_fills(db):
+    log = TurnLog(lambda: db, batch_size=3, flush_sec=60)
+    for i in range(3):
+        log.record("s", "user", f"t{i}")
+    assert _until(lambda: log.written == 3)
+    assert _contents(db) == ["t0", "t1", "t2"]
+    log.close()
+
+def test_flushes_on_interval(db):
+    log = TurnLog(lambda: db, batch_size=100, flush_sec=0.05)
+    log.record("s", "user", "only")
+    assert _until(lambda: log.written == 1)
+    log.close()
+
+def test_buffer_overflow_drops_oldest(db):
+    log = TurnLog(lambda: db, batch_size=100, flush_sec=60, max_buffer=2)
+    for i in range(3):
+        log.record("s", "user", f"t{i}")
+    assert log.stats()["dropped"] == 1 and log.stats()["pending"] == 2
+    log.close()
+    assert _contents(db) == ["t1", "t2"]
+
+class _Flaky:
+    """첫 호출은 실패. 실패하는 동안 새 턴 두 건이 들어온다."""
+    def __init__(self, engine, log_ref):
+        self.engine, self.log_ref, self.calls = engine, log_ref, 0
+    def __call__(self):
+        self.calls += 1
+        if self.calls == 1:
+            self.log_ref[0].record("s", "user", "late0")
+            self.log_ref[0].record("s", "user", "late1")
+            raise ConnectionError("db down")
+        return self.engine
+
+def test_failed_batch_requeued_within_bound(db):
+    ref = []
+    log = TurnLog(_Flaky(db, ref), batch_size=100, flush_sec=60, max_buffer=4)
+    ref.append(log)
+    for i in range(4):
+        log.record("s", "user", f"t{i}")
+    assert log.flush() == 0
+    st = log.stats()
+    assert st["failed_batches"] == 1 and st["pending"] == 4 and st["dropped"] == 2
+    assert log.flush() == 4
+    assert _contents(db) == ["t2", "t3", "late0", "late1"]     # 순서 유지, 오래된 행부터 버림
+    log.close()
+
+def test_close_drains_everything(db):
+    log = TurnLog(lambda: db, batch_size=2, flush_sec=60)
+    for i in range(5):
+        log.record("s", "user", f"t{i}")
+    log.close(timeout=2.0)
+    assert log.stats()["pending"] == 0 and log.written == 5
+    assert _contents(db) == [f"t{i}" for i in range(5)]
+
+def test_close_gives_up_when_db_is_down():
+    def down():
+        raise ConnectionError("db down")
+    log = TurnLog(down, batch_size=100, flush_sec=60)
+    log.record("s", "user", "t0")
+    t0 = time.perf_counter()
+    log.close(timeout=2.0)
+    assert time.perf_counter() - t0 < 1.0
+    assert log.stats()["pending"] == 1 and log.failed_batches >= 1